@@ -0,0 +1,345 @@
+"""
+Offline benchmark: scrape a synthetic local Sakai and report time, round trips and memory
+
+Usage (from the repository root):
+    python -m bench.run --courses 5 --assignments 8 --students 120 --latency-ms 50
+    python -m bench.run --driver scraper --repeat 3 --json bench-results.jsonl
+
+The browser engine, page pool, wait mode and other settings are read from
+the usual CHECKMARKS_* variables, so two runs that differ only in one
+variable compare that setting on an identical workload.
+"""
+import argparse
+import json
+import os
+import statistics
+import sys
+import tempfile
+import threading
+import time
+import tracemalloc
+from queue import Queue, Empty
+from bench.sakai_stub import SakaiStubServer, Workload
+from browser.portal_scraper import PortalScraper
+from browser.wait_strategy import WaitStrategy
+from models.app_state import AppState
+from utils.settings import Settings
+
+try:
+    import resource
+except ImportError:  # Windows
+    resource = None
+
+
+USERNAME = "bench"
+PASSWORD = "bench"
+
+
+class RoundTripCounter:
+    """
+    Counts messages sent from Python to the Playwright driver
+
+    Every Playwright API call that reaches the browser is one or more
+    protocol messages through Channel._inner_send (send_no_reply for
+    fire-and-forget ones). This patches those private methods for the
+    duration of a run, which is fine for a benchmark but nothing else.
+    """
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self.total = 0
+        self.by_method = {}
+        self._originals = None
+
+    def _count(self, method):
+        with self._lock:
+            self.total += 1
+            self.by_method[method] = self.by_method.get(method, 0) + 1
+
+    def install(self):
+        from playwright._impl._connection import Channel
+        counter = self
+        inner_send = Channel._inner_send
+        send_no_reply = Channel.send_no_reply
+
+        async def counted_inner_send(channel, method, *args, **kwargs):
+            counter._count(method)
+            return await inner_send(channel, method, *args, **kwargs)
+
+        def counted_send_no_reply(channel, method, *args, **kwargs):
+            counter._count(method)
+            return send_no_reply(channel, method, *args, **kwargs)
+
+        self._originals = (inner_send, send_no_reply)
+        Channel._inner_send = counted_inner_send
+        Channel.send_no_reply = counted_send_no_reply
+
+    def uninstall(self):
+        if self._originals:
+            from playwright._impl._connection import Channel
+            Channel._inner_send, Channel.send_no_reply = self._originals
+            self._originals = None
+
+
+def run_scraper(settings, timeout):
+    """
+    Drive PortalScraper directly on one page: log in, then open every assignment of every course
+
+    Returns:
+        tuple: (login_seconds, missing_found, failures)
+    """
+    from playwright.sync_api import sync_playwright
+
+    playwright = sync_playwright().start()
+    browser = None
+    try:
+        browser = playwright.chromium.launch(headless=settings.headless)
+        page = browser.new_page()
+        page.set_default_timeout(timeout * 1000)
+        state = AppState()
+        # Batches and status messages are not shown anywhere, so they are dropped
+        scraper = PortalScraper(page, state, lambda delay, func, *args: None, WaitStrategy(settings.wait_mode))
+
+        start = time.perf_counter()
+        success, courses, _, error_type = scraper.login(USERNAME, PASSWORD, None)
+        login_seconds = time.perf_counter() - start
+        if not success:
+            raise RuntimeError(f"Login to the stub failed ({error_type})")
+
+        missing_found = 0
+        failures = 0
+        for course in courses:
+            state.current_course_index = course["index"]
+            success, assignments, error_message = scraper.fetch_assignments(course)
+            if not success:
+                print(f"ERROR: {course['name']}: {error_message}", file=sys.stderr)
+                failures += 1
+                continue
+            for assignment in assignments:
+                success, students_missing, error_message = scraper.process_assignment(assignment)
+                if success:
+                    missing_found += len(students_missing)
+                else:
+                    print(f"ERROR: {course['name']} / {assignment['name']}: {error_message}", file=sys.stderr)
+                    failures += 1
+        return login_seconds, missing_found, failures
+    finally:
+        if browser:
+            browser.close()
+        playwright.stop()
+
+
+def run_manager(settings, workload_type, timeout, accounts=1):
+    """
+    Drive BrowserManager (either engine, any page pool size) as the GUI does
+
+    Callbacks are pumped on this thread like the CLI does. "sweep" runs one
+    sweep over every course; "scan" queues a course scan per course at once,
+    so a page pool can work on several courses side by side. With more than
+    one account, each signs in to its own context of the same browser (see
+    BrowserManager.add_account) and runs the whole workload concurrently.
+
+    Returns:
+        tuple: (login_seconds, missing_found, failures); login_seconds is
+               the time until the last account was signed in
+    """
+    from browser.engine import create_browser_manager
+
+    callbacks = Queue()
+    ui_callback = lambda delay, func, *args: callbacks.put((func, args))
+    manager = create_browser_manager(AppState(), ui_callback, settings)
+    managers = [manager] + [manager.add_account(AppState()) for _ in range(accounts - 1)]
+    result = {"done": False, "login": None, "missing": 0, "failures": 0, "pending": accounts}
+    start = time.perf_counter()
+
+    def finish_one():
+        result["pending"] -= 1
+        if result["pending"] <= 0:
+            result["done"] = True
+
+    def on_login_success(account, courses):
+        result["login"] = time.perf_counter() - start
+        # This account's login is replaced by its own work items
+        if workload_type == "sweep":
+            account.queue_sweep(on_sweep_result, lambda summary: finish_one(), on_error, resume=False)
+            return
+        result["pending"] += len(courses) - 1
+        for course in courses:
+            account.queue_scan_course(course, on_course_scanned, on_error)
+
+    def on_login_error(error_type):
+        raise RuntimeError(f"Login to the stub failed ({error_type})")
+
+    def on_sweep_result(course_name, assignment_name, students_missing, error_message):
+        if error_message:
+            print(f"ERROR: {course_name} / {assignment_name}: {error_message}", file=sys.stderr)
+            result["failures"] += 1
+        result["missing"] += len(students_missing)
+
+    def on_course_scanned(matrix):
+        result["missing"] += matrix.missing_count()
+        result["failures"] += len(matrix.failures)
+        finish_one()
+
+    def on_error(error_message):
+        print(f"ERROR: {error_message}", file=sys.stderr)
+        result["failures"] += 1
+        finish_one()
+
+    for i, account in enumerate(managers):
+        # Every account signs in as a different stub user
+        account.queue_login(
+            USERNAME if i == 0 else f"{USERNAME}{i + 1}", PASSWORD,
+            lambda courses, account=account: on_login_success(account, courses),
+            on_login_error, lambda message: None
+        )
+    deadline = time.monotonic() + timeout
+    try:
+        while not result["done"]:
+            remaining = deadline - time.monotonic()
+            if remaining <= 0:
+                raise RuntimeError(f"Benchmark did not finish within {timeout} s")
+            try:
+                func, args = callbacks.get(timeout=remaining)
+            except Empty:
+                continue
+            func(*args)
+    finally:
+        # Also closes the added accounts
+        manager.shutdown()
+    return result["login"], result["missing"], result["failures"]
+
+
+def run_once(args, workload):
+    """Start a fresh stub, run one benchmark pass against it and collect the measurements"""
+    settings = Settings()
+    settings.headless = not args.show_browser
+    settings.prefetch = False  # read-ahead would add work the workload did not ask for
+    settings.export_formats = []
+    settings.multi_account = args.accounts > 1
+    settings.data_dir = tempfile.mkdtemp(prefix="checkmarks-bench-")
+
+    counter = RoundTripCounter()
+    login_url = PortalScraper.LOGIN_URL
+    with SakaiStubServer(workload, args.latency_ms, args.jitter_ms) as server:
+        PortalScraper.LOGIN_URL = server.url
+        counter.install()
+        if args.trace_memory:
+            tracemalloc.start()
+        start = time.perf_counter()
+        try:
+            if args.driver == "scraper":
+                login_seconds, missing_found, failures = run_scraper(settings, args.timeout)
+            else:
+                login_seconds, missing_found, failures = run_manager(
+                    settings, args.workload, args.timeout, args.accounts
+                )
+            wall_seconds = time.perf_counter() - start
+            heap_peak = tracemalloc.get_traced_memory()[1] if args.trace_memory else None
+        finally:
+            if args.trace_memory:
+                tracemalloc.stop()
+            counter.uninstall()
+            PortalScraper.LOGIN_URL = login_url
+
+    expected = workload.expected_missing() * (args.accounts if args.driver == "manager" else 1)
+    return {
+        "wall_s": round(wall_seconds, 3),
+        "login_s": round(login_seconds or 0, 3),
+        "http_requests": server.requests,
+        "round_trips": counter.total,
+        "top_round_trips": dict(sorted(counter.by_method.items(), key=lambda item: -item[1])[:5]),
+        "missing_found": missing_found,
+        "missing_expected": expected,
+        "correct": missing_found == expected and not failures,
+        "failures": failures,
+        "python_heap_peak_mb": round(heap_peak / 2 ** 20, 1) if heap_peak is not None else None,
+        "python_rss_peak_mb": _peak_rss_mb(resource.RUSAGE_SELF) if resource else None,
+        # Largest Playwright driver or browser process that has exited so far
+        "child_rss_peak_mb": _peak_rss_mb(resource.RUSAGE_CHILDREN) if resource else None,
+    }
+
+
+def _peak_rss_mb(who):
+    """Return ru_maxrss in MB (it is kilobytes on Linux and bytes on macOS)"""
+    peak = resource.getrusage(who).ru_maxrss
+    return round(peak / (2 ** 20 if sys.platform == "darwin" else 2 ** 10), 1)
+
+
+def summarize(runs):
+    """Fold repeated runs into the median wall time and the worst memory peak"""
+    summary = dict(runs[-1])
+    for key in ("wall_s", "login_s"):
+        values = [run[key] for run in runs]
+        summary[key] = round(statistics.median(values), 3)
+        summary[key.replace("_s", "_min_s")] = min(values)
+    summary["correct"] = all(run["correct"] for run in runs)
+    return summary
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(description="Benchmark the scraper against a local synthetic Sakai")
+    parser.add_argument("--courses", type=int, default=3)
+    parser.add_argument("--assignments", type=int, default=5, help="Assignments per course")
+    parser.add_argument("--students", type=int, default=40, help="Students per course")
+    parser.add_argument("--missing-ratio", type=float, default=0.3, help="Share of submissions left ungraded")
+    parser.add_argument("--seed", type=int, default=1)
+    parser.add_argument("--latency-ms", type=int, default=0, help="Delay added to every response")
+    parser.add_argument("--jitter-ms", type=int, default=0, help="Random extra delay of up to this much")
+    parser.add_argument("--driver", choices=("manager", "scraper"), default="manager",
+                        help="Run through BrowserManager (default) or PortalScraper on a single page")
+    parser.add_argument("--workload", choices=("sweep", "scan"), default="sweep",
+                        help="manager driver: one sweep, or one course scan per course queued at once")
+    parser.add_argument("--accounts", type=int, default=1,
+                        help="manager driver: accounts signed in side by side, each running the workload")
+    parser.add_argument("--repeat", type=int, default=1, help="Runs to take the median wall time of")
+    parser.add_argument("--timeout", type=int, default=600, help="Seconds before a run is abandoned")
+    parser.add_argument("--trace-memory", action="store_true",
+                        help="Also track the Python heap peak with tracemalloc (slows the run down)")
+    parser.add_argument("--show-browser", action="store_true")
+    parser.add_argument("--json", metavar="PATH", help="Append the result as a JSON line to PATH")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+    workload = Workload(args.courses, args.assignments, args.students, args.missing_ratio, args.seed)
+
+    runs = []
+    # The scraper's debug output would drown the results
+    with open(os.devnull, "w") as devnull:
+        for i in range(args.repeat):
+            stdout = sys.stdout
+            sys.stdout = devnull
+            try:
+                runs.append(run_once(args, workload))
+            finally:
+                sys.stdout = stdout
+            print(f"Run {i + 1}/{args.repeat}: {runs[-1]['wall_s']} s", file=sys.stderr)
+
+    result = {
+        "timestamp": time.strftime("%Y-%m-%dT%H:%M:%S"),
+        "workload": workload.describe(),
+        "latency_ms": args.latency_ms,
+        "jitter_ms": args.jitter_ms,
+        "driver": args.driver,
+        "mode": args.workload if args.driver == "manager" else "all",
+        "accounts": args.accounts if args.driver == "manager" else 1,
+        "settings": {
+            key: value for key, value in vars(Settings()).items()
+            if key in ("engine", "page_pool_size", "block_resources", "wait_mode", "rest_fast_path")
+        },
+        "repeat": args.repeat,
+        **summarize(runs)
+    }
+
+    for key, value in result.items():
+        print(f"{key}: {value}")
+    if args.json:
+        with open(args.json, "a", encoding="utf-8") as f:
+            f.write(json.dumps(result) + "\n")
+    return 0 if result["correct"] else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,471 @@
+"""Local stand-in for the Sakai pages the scraper navigates, with synthetic data"""
+import html
+import json
+import random
+import secrets
+import threading
+import time
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from urllib.parse import parse_qs, urlencode, urlparse
+
+
+# Grading statuses handed out to synthetic submissions; the first two are the
+# ones PortalScraper does not count as missing marks
+GRADED_STATUSES = ("Returned", "No Submission - Not Started")
+MISSING_STATUSES = ("Submitted", "Ungraded", "Submitted - 2 days late", "Resubmitted")
+
+PAGE_SIZES = (20, 50, 100, 200)
+
+
+class Workload:
+    """
+    Deterministic courses x assignments x students data set
+
+    The same parameters and seed always produce the same portal, so runs
+    before and after a change scrape identical pages.
+    """
+
+    def __init__(self, courses=3, assignments=5, students=40, missing_ratio=0.3, seed=1):
+        """
+        Args:
+            courses: Number of course sites
+            assignments: Assignments per course
+            students: Students enrolled in every course
+            missing_ratio: Share of submissions that are submitted but not graded
+            seed: Random seed for statuses
+        """
+        self.courses = courses
+        self.assignments = assignments
+        self.students = students
+        self.missing_ratio = missing_ratio
+        self.seed = seed
+
+    def course_name(self, course):
+        return f"BENCH {100 + course}: Synthetic Course {course + 1}"
+
+    def assignment_name(self, assignment):
+        return f"Assignment {assignment + 1}"
+
+    def student_name(self, student):
+        return f"Student {student + 1:04d}, Test ({25100000 + student})"
+
+    def statuses(self, course, assignment):
+        """Return the grading status of every student for one assignment"""
+        rng = random.Random(f"{self.seed}-{course}-{assignment}")
+        statuses = []
+        for _ in range(self.students):
+            if rng.random() < self.missing_ratio:
+                statuses.append(rng.choice(MISSING_STATUSES))
+            else:
+                statuses.append(rng.choice(GRADED_STATUSES))
+        return statuses
+
+    def missing_count(self, course, assignment):
+        """Return how many students the scraper should report as missing marks"""
+        return sum(status not in GRADED_STATUSES for status in self.statuses(course, assignment))
+
+    def expected_missing(self):
+        """Return the missing marks a complete scrape of the whole portal must find"""
+        return sum(
+            self.missing_count(course, assignment)
+            for course in range(self.courses) for assignment in range(self.assignments)
+        )
+
+    def describe(self):
+        return {
+            "courses": self.courses,
+            "assignments": self.assignments,
+            "students": self.students,
+            "missing_ratio": self.missing_ratio,
+            "seed": self.seed
+        }
+
+
+class SakaiStubServer:
+    """
+    Threaded HTTP server serving Sakai-shaped pages for a Workload
+
+    Pages follow the markup PortalScraper relies on: the eid/pw login form,
+    .link-container course tiles, the Assignments tool with asnActionLink
+    rows and Grade links, and table#submissionList with Sakai's page-size
+    select and next-page button. The /direct assignment endpoints used by
+    RestPortalScraper answer with JSON shaped like responses recorded from
+    Sakai, for the same data. Every response is delayed by latency_ms
+    (plus up to jitter_ms) to stand in for the real server's round trip.
+    """
+
+    def __init__(self, workload, latency_ms=0, jitter_ms=0, host="127.0.0.1", port=0, direct_api=True):
+        """
+        Args:
+            workload: Workload to serve
+            latency_ms: Delay added to every response
+            jitter_ms: Random extra delay of up to this much
+            host: Address to listen on
+            port: Port to listen on (0 = any free port)
+            direct_api: Serve the /direct assignment endpoints; when False
+                        they answer 404 like a server without them
+        """
+        self.workload = workload
+        self.latency_ms = latency_ms
+        self.jitter_ms = jitter_ms
+        self.direct_api = direct_api
+        self.sessions = {}  # session token -> username
+        self.requests = 0
+        self._lock = threading.Lock()
+        self._httpd = ThreadingHTTPServer((host, port), _make_handler(self))
+        self._httpd.daemon_threads = True
+        self._thread = None
+
+    @property
+    def url(self):
+        """Base URL of the stub portal, ending in a slash like PortalScraper.LOGIN_URL"""
+        host, port = self._httpd.server_address[:2]
+        return f"http://{host}:{port}/"
+
+    def start(self):
+        """Serve on a background thread"""
+        self._thread = threading.Thread(target=self._httpd.serve_forever, daemon=True, name="SakaiStub")
+        self._thread.start()
+        return self
+
+    def stop(self):
+        """Stop serving and close the socket"""
+        self._httpd.shutdown()
+        self._httpd.server_close()
+
+    def count_request(self):
+        with self._lock:
+            self.requests += 1
+
+    def delay(self):
+        """Sleep for the configured latency"""
+        delay_ms = self.latency_ms + (random.uniform(0, self.jitter_ms) if self.jitter_ms else 0)
+        if delay_ms:
+            time.sleep(delay_ms / 1000)
+
+    def __enter__(self):
+        return self.start()
+
+    def __exit__(self, exc_type, exc_value, exc_traceback):
+        self.stop()
+
+
+def _make_handler(server):
+    """Build the request handler class bound to one SakaiStubServer"""
+
+    class Handler(BaseHTTPRequestHandler):
+        protocol_version = "HTTP/1.1"
+
+        def log_message(self, format, *args):
+            # Keep benchmark output readable
+            pass
+
+        def do_GET(self):
+            self._dispatch()
+
+        def do_POST(self):
+            self._dispatch()
+
+        def _dispatch(self):
+            server.count_request()
+            server.delay()
+            parsed = urlparse(self.path)
+            params = {key: values[-1] for key, values in parse_qs(parsed.query).items()}
+            if self.command == "POST":
+                length = int(self.headers.get("Content-Length") or 0)
+                body = self.rfile.read(length).decode("utf-8")
+                params.update({key: values[-1] for key, values in parse_qs(body).items()})
+
+            path = parsed.path.rstrip("/") or "/"
+            if path == "/favicon.ico":
+                self._send(404, "text/plain", "")
+                return
+            if path == "/direct/session/current.json":
+                self._send(200, "application/json", json.dumps({"userEid": self._user() or ""}))
+                return
+            if path.startswith("/direct/assignment/"):
+                self._direct_assignment(path, params)
+                return
+            if path == "/" and self.command == "POST":
+                self._login(params)
+                return
+
+            user = self._user()
+            if user is None:
+                self._send(200, "text/html", _login_page())
+                return
+
+            parts = path.strip("/").split("/")
+            if path in ("/", "/portal"):
+                self._send(200, "text/html", _course_list_page(server.workload))
+            elif parts[:2] == ["portal", "site"] and len(parts) == 3:
+                self._send_course(parts[2], lambda course: _course_site_page(server.workload, course))
+            elif parts[:2] == ["portal", "site"] and parts[3:] == ["tool", "assignments"]:
+                self._send_course(parts[2], lambda course: _assignment_list_page(server.workload, course))
+            elif parts[:2] == ["portal", "site"] and parts[3:] == ["tool", "grade"]:
+                self._send_course(parts[2], lambda course: _grading_page(server.workload, course, params))
+            else:
+                self._send(404, "text/html", "<html><body>Not found</body></html>")
+
+        def _login(self, params):
+            """Accept any non-empty eid/pw except the password "wrong" (to exercise failed logins)"""
+            if not params.get("eid") or not params.get("pw") or params.get("pw") == "wrong":
+                self._send(200, "text/html", _login_page("Invalid login"))
+                return
+            token = secrets.token_hex(16)
+            server.sessions[token] = params["eid"]
+            self.send_response(302)
+            self.send_header("Location", "/portal")
+            self.send_header("Set-Cookie", f"JSESSIONID={token}; Path=/; HttpOnly")
+            self.send_header("Content-Length", "0")
+            self.end_headers()
+
+        def _direct_assignment(self, path, params):
+            """Answer /direct/assignment/site/<id>.json and /direct/assignment/gradable.json"""
+            if not server.direct_api:
+                self._send(404, "text/plain", "No entity provider for prefix assignment")
+                return
+            if self._user() is None:
+                # Sakai refuses /direct requests without a valid session cookie
+                self._send(403, "text/plain", "Forbidden: user must be logged in")
+                return
+
+            site_prefix = "/direct/assignment/site/"
+            if path.startswith(site_prefix) and path.endswith(".json"):
+                course = _course_from_site_id(path[len(site_prefix):-len(".json")], server.workload)
+                document = None if course is None else _direct_assignment_list(server.workload, course)
+            elif path == "/direct/assignment/gradable.json":
+                key = _parse_assignment_key(params.get("gradableId", ""), server.workload)
+                document = None if key is None else _direct_gradable(server.workload, *key)
+            else:
+                document = None
+            if document is None:
+                self._send(404, "text/plain", "Not found")
+            else:
+                self._send(200, "application/json", json.dumps(document))
+
+        def _user(self):
+            """Return the username of the request's session cookie, or None"""
+            for cookie in (self.headers.get("Cookie") or "").split(";"):
+                name, _, value = cookie.strip().partition("=")
+                if name == "JSESSIONID":
+                    return server.sessions.get(value)
+            return None
+
+        def _send_course(self, site_id, render):
+            """Render a course page, or 404 for an unknown site id"""
+            course = _course_from_site_id(site_id, server.workload)
+            if course is None:
+                self._send(404, "text/html", "<html><body>Site not found</body></html>")
+            else:
+                self._send(200, "text/html", render(course))
+
+        def _send(self, status, content_type, body):
+            data = body.encode("utf-8")
+            self.send_response(status)
+            self.send_header("Content-Type", f"{content_type}; charset=utf-8")
+            self.send_header("Content-Length", str(len(data)))
+            self.end_headers()
+            self.wfile.write(data)
+
+    return Handler
+
+
+def _site_id(course):
+    return f"bench-{course}"
+
+
+def _assignment_key(course, assignment):
+    """Site-independent assignment id, unique across courses like Sakai's"""
+    return f"bench-{course}-a{assignment}"
+
+
+def _parse_assignment_key(key, workload):
+    """Return (course, assignment) of an assignment id, or None"""
+    course_part, _, assignment_part = key.rpartition("-a")
+    course = _course_from_site_id(course_part, workload)
+    if course is None or not assignment_part.isdigit() or int(assignment_part) >= workload.assignments:
+        return None
+    return course, int(assignment_part)
+
+
+def _due_date(assignment):
+    return f"Jan {assignment % 28 + 1:02d}, 2026 11:55 pm"
+
+
+def _course_from_site_id(site_id, workload):
+    """Return the course number of a site id, or None"""
+    prefix, _, number = site_id.partition("-")
+    if prefix != "bench" or not number.isdigit() or int(number) >= workload.courses:
+        return None
+    return int(number)
+
+
+def _page(title, body):
+    return (f"<!DOCTYPE html><html><head><title>{html.escape(title)}</title></head>"
+            f"<body>{body}</body></html>")
+
+
+def _tool_title(title):
+    """Tool title bar the scraper reads to tell which tool is open"""
+    return f'<span class="Mrphs-toolTitleNav__text">{html.escape(title)}</span>'
+
+
+def _login_page(error=""):
+    message = f'<div class="alertMessage">{html.escape(error)}</div>' if error else ""
+    return _page("Sakai : Login", (
+        f'{message}<form method="post" action="/">'
+        '<input type="text" name="eid" id="eid">'
+        '<input type="password" name="pw" id="pw">'
+        '<input type="submit" name="submit" value="Log in">'
+        '</form>'
+    ))
+
+
+def _course_list_page(workload):
+    tiles = "".join(
+        f'<a href="/portal/site/{_site_id(course)}"><div class="link-container">'
+        f'{html.escape(workload.course_name(course))}</div></a>'
+        for course in range(workload.courses)
+    )
+    return _page("Sakai : Home", f'<div class="fav-sites">{tiles}</div>')
+
+
+def _course_site_page(workload, course):
+    return _page(workload.course_name(course), (
+        '<nav><ul>'
+        f'<li><a href="/portal/site/{_site_id(course)}/tool/assignments">Assignments</a></li>'
+        '<li><a href="#">Gradebook</a></li>'
+        '</ul></nav>'
+    ))
+
+
+def _assignment_list_page(workload, course):
+    rows = []
+    for assignment in range(workload.assignments):
+        assignment_id = f"/assignment/a/{_site_id(course)}/{_assignment_key(course, assignment)}"
+        grade_url = f"/portal/site/{_site_id(course)}/tool/grade?" + urlencode({"assignmentId": assignment_id})
+        # Sakai's "In/New" counter: submissions in / not graded yet
+        statuses = workload.statuses(course, assignment)
+        submitted = sum(status != "No Submission - Not Started" for status in statuses)
+        ungraded = sum(status in MISSING_STATUSES for status in statuses)
+        rows.append(
+            '<tr>'
+            f'<td headers="title"><strong><a name="asnActionLink" href="#">'
+            f'{html.escape(workload.assignment_name(assignment))}</a></strong>'
+            f'<div class="itemAction"><a href="{html.escape(grade_url)}">Grade</a> | <a href="#">Edit</a></div></td>'
+            f'<td headers="status">Open</td>'
+            f'<td headers="dueDate">{_due_date(assignment)}</td>'
+            f'<td headers="num_submissions">{submitted}/{ungraded}</td>'
+            '</tr>'
+        )
+    body = (
+        _tool_title("Assignments")
+        + '<form name="listAssignmentsForm"><table class="listHier">'
+        + "".join(rows)
+        + '</table></form>'
+    )
+    return _page(workload.course_name(course), body)
+
+
+def _grading_page(workload, course, params):
+    """Paginated table#submissionList; the pager state travels in the query string"""
+    assignment_id = params.get("assignmentId", "")
+    key = _parse_assignment_key(assignment_id.rsplit("/", 1)[-1], workload)
+    if key is None or key[0] != course:
+        return _page("Grade", "<p>Assignment not found</p>")
+    assignment = key[1]
+
+    page_size = int(params.get("selectPageSize") or PAGE_SIZES[0])
+    page = int(params.get("page") or 0)
+    if "eventSubmit_doList_next" in params:
+        page += 1
+    last_page = max(0, (workload.students - 1) // page_size)
+    page = min(page, last_page)
+
+    statuses = workload.statuses(course, assignment)
+    first = page * page_size
+    rows = "".join(
+        '<tr>'
+        f'<td headers="studentname">{html.escape(workload.student_name(student))}</td>'
+        f'<td headers="submitted">Jan 01, 2026 10:00 am</td>'
+        f'<td headers="status">{html.escape(statuses[student])}</td>'
+        f'<td headers="grade"></td>'
+        '</tr>'
+        for student in range(first, min(first + page_size, workload.students))
+    )
+
+    action = f"/portal/site/{_site_id(course)}/tool/grade"
+    options = "".join(
+        f'<option value="{size}"{" selected" if size == page_size else ""}>Show {size} items...</option>'
+        for size in PAGE_SIZES
+    )
+    disabled = " disabled" if page >= last_page else ""
+    pager = (
+        f'<form method="get" action="{action}" name="pageSizeForm">'
+        f'<input type="hidden" name="assignmentId" value="{html.escape(assignment_id)}">'
+        f'<select name="selectPageSize" onchange="this.form.submit()">{options}</select></form>'
+        f'<form method="get" action="{action}" name="pagerForm">'
+        f'<input type="hidden" name="assignmentId" value="{html.escape(assignment_id)}">'
+        f'<input type="hidden" name="selectPageSize" value="{page_size}">'
+        f'<input type="hidden" name="page" value="{page}">'
+        f'<input type="submit" name="eventSubmit_doList_next" value="&gt;"{disabled}></form>'
+    )
+    body = (
+        f'<ul class="navIntraTool"><li class="firstToolBarItem"><span>'
+        f'<a href="/portal/site/{_site_id(course)}/tool/assignments">Assignment List</a></span></li></ul>'
+        + _tool_title("Assignments - Grading")
+        + pager
+        + f'<table id="submissionList"><tr><th id="studentname">Student</th><th id="status">Status</th></tr>{rows}</table>'
+    )
+    return _page(workload.assignment_name(assignment), body)
+
+
+def _direct_assignment_list(workload, course):
+    """/direct/assignment/site/<id>.json, with the fields of a recorded Sakai response"""
+    items = []
+    for assignment in range(workload.assignments):
+        key = _assignment_key(course, assignment)
+        items.append({
+            "entityReference": f"/assignment/{key}",
+            "entityURL": f"/direct/assignment/{key}",
+            "entityId": key,
+            "entityTitle": workload.assignment_name(assignment),
+            "id": key,
+            "title": workload.assignment_name(assignment),
+            "context": _site_id(course),
+            "draft": False,
+            "status": "OPEN_STATUS",
+            "gradeScale": "SCORE_GRADE_TYPE",
+            "dueTime": {"display": _due_date(assignment), "epochSecond": 1767311700 + assignment * 86400},
+            "dueTimeString": _due_date(assignment),
+        })
+    # Drafts are listed to instructors but not on the Assignments page
+    items.append({
+        "entityId": f"bench-{course}-draft",
+        "id": f"bench-{course}-draft",
+        "title": "Unpublished Draft",
+        "context": _site_id(course),
+        "draft": True,
+        "status": "DRAFT_STATUS",
+    })
+    return {"entityPrefix": "assignment", "assignment_collection": items}
+
+
+def _direct_gradable(workload, course, assignment):
+    """/direct/assignment/gradable.json?gradableId=<id>, one submission per student"""
+    key = _assignment_key(course, assignment)
+    submissions = []
+    for student, status in enumerate(workload.statuses(course, assignment)):
+        submissions.append({
+            "id": f"{key}-s{student}",
+            "status": status,
+            "graded": status == "Returned",
+            "submitted": status != "No Submission - Not Started",
+            "submitters": [{
+                "id": str(25100000 + student),
+                "displayName": f"Test Student {student + 1:04d}",
+                "sortName": workload.student_name(student),
+            }],
+        })
+    return {"id": key, "title": workload.assignment_name(assignment), "submissions": submissions}
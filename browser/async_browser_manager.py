@@ -0,0 +1,298 @@
+"""Browser management on an asyncio event loop with the async Playwright API"""
+import asyncio
+import threading
+import time
+import traceback
+import sys
+from browser.async_portal_scraper import AsyncPortalScraper
+from browser.browser_manager import BrowserManager
+from browser.resource_filter import ResourceFilter
+from browser.portal_scraper import PortalScraper
+from utils import startup_timer
+
+
+class AsyncBrowserManager(BrowserManager):
+    """
+    BrowserManager whose worker thread runs an asyncio event loop
+
+    The queue_* API and result delivery through ui_callback are inherited
+    unchanged. Instead of handling one operation at a time, the loop runs
+    every queued operation as its own task on a free page of a pool. Each
+    pool page has a browser context and Sakai session of its own, all in
+    one browser process.
+
+    Accounts added with add_account are served by the same event loop and
+    Playwright connection, each in its own contexts of the one browser.
+    """
+
+    HOSTS_ACCOUNTS = True
+
+    def start_browser_worker(self):
+        """Start the event loop thread (or, for an added account, its waiter thread) if not already running"""
+        if self.browser_thread is None or not self.browser_thread.is_alive():
+            self._clear_startup_error()
+            target = self._run_event_loop if self.primary is None else self._run_account
+            self.browser_thread = threading.Thread(target=target, args=(self.browser_queue,), daemon=True)
+            with self._pool_lock:
+                self._worker_threads = [self.browser_thread]
+            self.browser_thread.start()
+
+    def _run_event_loop(self, operation_queue):
+        """Worker thread entry point: run the async engine until shutdown"""
+        try:
+            print(f"[DEBUG] async browser engine started in thread: {threading.current_thread().name}")
+            asyncio.run(self._async_worker(operation_queue))
+        except Exception as e:
+            print(f"ERROR in async browser engine: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            sys.stderr.flush()
+            if not self.ready.is_set():
+                self._fail_startup(f"{type(e).__name__}: {e}", operation_queue)
+
+    def _run_account(self, operation_queue):
+        """
+        Added account's thread: serve the account on the primary manager's event loop
+
+        The thread only waits for the account's coroutine, so shutdown() and
+        reset() stop an account the same way they stop a primary manager.
+        """
+        try:
+            if not self.primary.wait_until_ready(self.ACCOUNT_ATTACH_TIMEOUT):
+                raise RuntimeError(f"The shared browser did not start: {self.primary.startup_error or 'timed out'}")
+            self.resource_filter = self.primary.resource_filter
+            asyncio.run_coroutine_threadsafe(
+                self._serve_context(self.primary._browser, operation_queue), self.primary._loop
+            ).result()
+        except Exception as e:
+            print(f"ERROR in async browser engine (account): {type(e).__name__}: {e}")
+            traceback.print_exc()
+            sys.stderr.flush()
+            if not self.ready.is_set():
+                self._fail_startup(f"{type(e).__name__}: {e}", operation_queue)
+
+    async def _async_worker(self, operation_queue):
+        """Launch the browser and serve this manager's context until shutdown"""
+        # Imported here so the threaded engine never loads the async API
+        # and the login window paints before Playwright is loaded
+        with startup_timer.timer.importing("playwright.async_api"):
+            from playwright.async_api import async_playwright
+
+        if self.settings.rest_fast_path:
+            print("Warning: CHECKMARKS_REST_FAST_PATH is not supported by the async engine; scraping pages")
+
+        playwright = None
+        browser = None
+        try:
+            playwright = await async_playwright().start()
+            browser = await playwright.chromium.launch(headless=self.settings.headless)
+            # Added accounts open their contexts in this browser from this loop
+            self._browser = browser
+            self._loop = asyncio.get_running_loop()
+            if self.settings.block_resources:
+                self.resource_filter = ResourceFilter(PortalScraper.LOGIN_URL, self.settings.allowed_hosts)
+            await self._serve_context(browser, operation_queue)
+
+        except Exception as e:
+            print(f"ERROR in async browser engine: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            sys.stderr.flush()
+            if not self.ready.is_set():
+                self._fail_startup(f"{type(e).__name__}: {e}", operation_queue)
+        finally:
+            if self.resource_filter:
+                print(f"[DEBUG] Resource filter: {self.resource_filter.stats()}")
+            print(f"[DEBUG] Wait timings: {self.waits.stats()}")
+            if browser:
+                try:
+                    await browser.close()
+                except:
+                    pass
+            if playwright:
+                try:
+                    await playwright.stop()
+                except:
+                    pass
+
+    async def _serve_context(self, browser, operation_queue):
+        """Open this manager's pool pages in browser and dispatch queued operations to the free ones"""
+        contexts = []
+        tasks = set()
+        try:
+            # Every page gets a context, and so a Sakai session, of its own:
+            # Sakai keeps pager and tool state per session
+            free_scrapers = asyncio.Queue()
+            for _ in range(self.settings.page_pool_size):
+                context = await browser.new_context()
+                contexts.append(context)
+                if self.resource_filter:
+                    await self.resource_filter.attach_async(context)
+                page = await context.new_page()
+                free_scrapers.put_nowait(AsyncPortalScraper(page, self.state_manager, self.ui_callback, self.waits, self.tracer))
+            with self._pool_lock:
+                self._pool_size = free_scrapers.qsize()
+            
+            # Open the login page while the user is still typing
+            scraper = await free_scrapers.get()
+            await scraper.open_login_page()
+            free_scrapers.put_nowait(scraper)
+            self.ready.set()
+
+            loop = asyncio.get_running_loop()
+            while True:
+                # Wait for a free page first: until one is free, queued
+                # operations stay in the scheduler, where newer requests can
+                # still supersede or overtake them
+                scraper = await free_scrapers.get()
+                # The thread-safe queue is read in an executor so the loop keeps running tasks
+                operation = await loop.run_in_executor(None, operation_queue.get)
+                if operation is None:  # Shutdown signal
+                    free_scrapers.put_nowait(scraper)
+                    break
+
+                if operation.get('type') == 'login':
+                    # Login changes who every page is signed in as: run it on its own
+                    if tasks:
+                        await asyncio.wait(tasks)
+                    await self._run_operation_async(operation, scraper, free_scrapers, operation_queue)
+                    if self.state_manager.browser_ready:
+                        await self._sign_in_pool(operation, scraper, free_scrapers)
+                    continue
+
+                task = asyncio.create_task(
+                    self._run_operation_async(operation, scraper, free_scrapers, operation_queue)
+                )
+                tasks.add(task)
+                task.add_done_callback(tasks.discard)
+
+        finally:
+            for task in tasks:
+                task.cancel()
+            for context in contexts:
+                try:
+                    await context.close()
+                except:
+                    pass
+            with self._pool_lock:
+                self._pool_size = 0
+
+    async def _sign_in_pool(self, login, logged_in, free_scrapers):
+        """
+        Sign the other pool pages into sessions of their own after a successful login
+
+        Runs while no operation is in flight, so every page is in free_scrapers.
+        Pages that cannot sign in are left out of the pool.
+        """
+        others = []
+        while not free_scrapers.empty():
+            scraper = free_scrapers.get_nowait()
+            if scraper is not logged_in:
+                others.append(scraper)
+        free_scrapers.put_nowait(logged_in)
+
+        results = await asyncio.gather(*(scraper.sign_in(login['username'], login['password']) for scraper in others))
+        for scraper, signed_in in zip(others, results):
+            if signed_in:
+                free_scrapers.put_nowait(scraper)
+            else:
+                print("Warning: Pool page could not sign in; continuing with fewer pages")
+        with self._pool_lock:
+            self._pool_size = free_scrapers.qsize()
+
+    async def _run_operation_async(self, operation, scraper, free_scrapers, operation_queue):
+        """Run one operation on a page, then hand the page back to the pool"""
+        with self._pool_lock:
+            self._busy_pages += 1
+        try:
+            op_type = operation.get('type')
+            self._trace_queue_wait(operation)
+
+            with self.tracer.span(op_type, "operation"):
+                if op_type == 'login':
+                    await self._handle_login_async(operation, scraper)
+                elif op_type == 'fetch_assignments':
+                    success, assignments, error_message = await scraper.fetch_assignments(operation['course'])
+                    self._deliver(operation, success, assignments, error_message)
+                elif op_type == 'process_assignment':
+                    await self._handle_process_assignment_async(operation, scraper)
+                elif op_type == 'scan_course':
+                    await self._handle_scan_course_async(operation, scraper)
+                elif op_type == 'sweep':
+                    await self._handle_sweep_async(operation, scraper)
+                elif op_type == 'prefetch':
+                    await self._handle_prefetch_async(operation, scraper)
+        except Exception as e:
+            print(f"ERROR in async browser engine processing operation: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            sys.stderr.flush()
+        finally:
+            with self._pool_lock:
+                self._busy_pages -= 1
+            free_scrapers.put_nowait(scraper)
+            operation_queue.task_done(operation)
+            if self.settings.page_pool_size > 1:
+                print(f"[DEBUG] Page pool: {self.pool_stats()}")
+
+    async def _handle_prefetch_async(self, operation, scraper):
+        """Run the next prefetch job and store its result in the result cache"""
+        job = self.prefetcher.next_job()
+        history = self._scan_history()
+        if job is None or history is None or not self._prefetch_needed(job, history):
+            return
+        self._store_prefetch(job, history, await scraper.prefetch(job, history, self._prefetch_should_stop))
+
+    async def _handle_login_async(self, operation, scraper):
+        """Handle login operation"""
+        username = operation['username']
+        status_callback = operation['status_callback']
+
+        success = False
+        saved_session = self._saved_session_for(operation)
+        if saved_session:
+            success, courses, course_list_url, error_type = await scraper.resume_session(
+                username, saved_session, status_callback
+            )
+        if not success:
+            success, courses, course_list_url, error_type = await scraper.login(
+                username, operation['password'], status_callback
+            )
+
+        storage_state = None
+        if success and operation.get('remember_session', False):
+            storage_state = await scraper.page.context.storage_state()
+        self._finish_login(operation, success, courses, error_type, storage_state)
+
+    async def _handle_process_assignment_async(self, operation, scraper):
+        """Handle process assignment operation"""
+        success, students_missing, error_message = await scraper.process_assignment(
+            operation['assignment'], self._batch_callback(operation)
+        )
+        self._deliver(operation, success, students_missing, error_message)
+
+    async def _handle_scan_course_async(self, operation, scraper):
+        """Handle scan course operation"""
+        exporter = self._open_exporter(f"scan-{operation['course']['name']}-{time.strftime('%Y%m%d-%H%M%S')}")
+        try:
+            success, matrix, error_message = await scraper.scan_course(
+                operation['course'], operation.get('on_progress'), self._scan_history(),
+                operation.get('assignment_names'), exporter
+            )
+        finally:
+            if exporter:
+                exporter.close()
+        if exporter:
+            matrix.reports = exporter.paths
+        self._deliver(operation, success, matrix, error_message)
+
+    async def _handle_sweep_async(self, operation, scraper):
+        """Handle sweep operation"""
+        checkpoint, courses, deadline = self._prepare_sweep(operation)
+        exporter = self._open_exporter("sweep", append='continuation' in operation or checkpoint.is_resuming())
+        try:
+            success, summary, error_message = await scraper.sweep(
+                courses, checkpoint, operation['on_result'], deadline, self.sweep_cancel_event,
+                self._scan_history(), exporter, self._sweep_should_pause
+            )
+        finally:
+            if exporter:
+                exporter.close()
+        self._finish_sweep(operation, success, summary, error_message, exporter, (checkpoint, courses, deadline))
@@ -0,0 +1,496 @@
+"""Portal scraping logic on the async Playwright API"""
+import time
+import traceback
+from browser import dom_scripts
+from browser.portal_scraper import (
+    PortalScraper, Preempted, filter_assignments, filter_missing_students, find_grade_link, merge_submission_rows,
+    parse_assignment_rows
+)
+from browser.wait_strategy import WaitStrategy
+from models.missing_marks_matrix import MissingMarksMatrix
+from utils.tracing import Tracer
+
+
+class AsyncPortalScraper:
+    """
+    Coroutine version of PortalScraper for the asyncio browser engine
+
+    Navigation follows PortalScraper step for step; selectors, the in-page
+    scripts and result parsing are shared with it, and URLs and selectors are
+    read from PortalScraper so both engines always target the same portal.
+    """
+
+    def __init__(self, page, state_manager, ui_callback, waits=None, tracer=None):
+        """
+        Initialize scraper
+
+        Args:
+            page: Async Playwright page object
+            state_manager: Object with browser_lock, courses, assignments, etc.
+            ui_callback: Function to call for UI updates (safe_after wrapper)
+            waits: WaitStrategy shared with the other pages
+            tracer: Optional Tracer receiving a span per navigation step and
+                    in-page extraction
+        """
+        self.page = page
+        self.state_manager = state_manager
+        self.ui_callback = ui_callback
+        self.waits = waits or WaitStrategy()
+        self.tracer = tracer or Tracer(enabled=False)
+        self.table_stats = {"tables": 0, "pages": 0, "rows": 0, "duplicates": 0}
+        self._should_stop = None  # set while a prefetch runs
+
+    async def open_login_page(self):
+        """Navigate to the login form ahead of time (see PortalScraper.open_login_page)"""
+        try:
+            with self.tracer.span("goto login page"):
+                await self.page.goto(PortalScraper.LOGIN_URL, timeout=30000)
+        except Exception as e:
+            print(f"Warning: Could not open login page in advance: {type(e).__name__}: {e}")
+
+    async def _on_login_page(self):
+        """Return True if the page already shows the login form"""
+        return self.page.url.startswith(PortalScraper.LOGIN_URL) and \
+            await self.page.query_selector('input[name="eid"]') is not None
+
+    async def login(self, username, password, status_callback):
+        """
+        Perform login and fetch courses
+
+        Args:
+            username: Login username
+            password: Login password
+            status_callback: Function to update login status messages
+
+        Returns:
+            tuple: (success: bool, courses: list, course_list_url: str, error_type: str)
+        """
+        try:
+            print("[DEBUG] _do_login: Opening browser...")
+            self.ui_callback(0, status_callback, "Connecting to server...")
+
+            if not await self._on_login_page():
+                with self.tracer.span("goto login page"):
+                    await self.page.goto(PortalScraper.LOGIN_URL, timeout=30000)
+
+            print("[DEBUG] _do_login: Entering credentials...")
+            self.ui_callback(0, status_callback, "Entering credentials...")
+            await self._submit_login(username, password)
+
+            print("[DEBUG] _do_login: Login successful! Fetching courses...")
+            self.ui_callback(0, status_callback, "Fetching courses...")
+
+            courses, course_list_url = await self._read_course_list(username)
+            return True, courses, course_list_url, None
+
+        except Exception as e:
+            print(f"ERROR in login: {type(e).__name__}: {e}")
+            traceback.print_exc()
+
+            # Determine error type
+            error_msg = str(e).lower()
+            if "timeout" in error_msg or "network" in error_msg or "navigation" in error_msg or "net::" in error_msg or "err_name_not_resolved" in error_msg:
+                error_type = "connection"
+            else:
+                error_type = "credentials"
+
+            return False, [], "", error_type
+
+    async def sign_in(self, username, password):
+        """Log this page into a session of its own (see PortalScraper.sign_in)"""
+        try:
+            if not await self._on_login_page():
+                with self.tracer.span("goto login page"):
+                    await self.page.goto(PortalScraper.LOGIN_URL, timeout=30000)
+            await self._submit_login(username, password)
+            return True
+        except Exception as e:
+            print(f"ERROR in sign_in: {type(e).__name__}: {e}")
+            return False
+
+    async def _submit_login(self, username, password):
+        """Fill in and submit the login form, raising if Sakai rejects it"""
+        with self.tracer.span("submit login"):
+            await self.page.fill('input[name="eid"]', username)
+            await self.page.fill('input[name="pw"]', password)
+            await self.page.click('input[type="submit"]')
+        await self.waits.wait_async(self.page, "login_result")
+
+        # Check if login was successful by verifying login form fields are gone
+        eid_input = await self.page.query_selector('input[name="eid"]')
+        pw_input = await self.page.query_selector('input[name="pw"]')
+
+        if eid_input is not None or pw_input is not None:
+            # Login fields still exist - login failed
+            raise Exception("Login failed: Invalid credentials")
+
+    async def resume_session(self, username, storage_state, status_callback):
+        """Restore a saved browser session (see PortalScraper.resume_session)"""
+        try:
+            print("[DEBUG] resume_session: Checking saved session...")
+            self.ui_callback(0, status_callback, "Restoring session...")
+
+            context = self.page.context
+            await context.add_cookies(storage_state.get("cookies", []))
+
+            response = await self.page.request.get(
+                PortalScraper.LOGIN_URL + PortalScraper.SESSION_CHECK_PATH, timeout=10000
+            )
+            session = await response.json() if response.ok else {}
+            if (session.get("userEid") or "").lower() != username.lower():
+                print("[DEBUG] resume_session: Saved session has expired")
+                await context.clear_cookies()
+                return False, [], "", "expired"
+
+            with self.tracer.span("goto login page"):
+                await self.page.goto(PortalScraper.LOGIN_URL, timeout=30000)
+            await self.waits.wait_async(self.page, "course_list")
+
+            print("[DEBUG] resume_session: Session restored! Fetching courses...")
+            self.ui_callback(0, status_callback, "Fetching courses...")
+
+            courses, course_list_url = await self._read_course_list(username)
+            return True, courses, course_list_url, None
+
+        except Exception as e:
+            print(f"[DEBUG] resume_session failed: {type(e).__name__}: {e}")
+            try:
+                await self.page.context.clear_cookies()
+            except Exception:
+                pass
+            return False, [], "", "expired"
+
+    async def _read_course_list(self, username):
+        """Read the courses from the logged-in portal page and store them in state"""
+        courses = []
+        with self.tracer.span("extract course list", "extract"):
+            links = await self.page.evaluate(dom_scripts.COURSE_LINKS)
+        for link in links:
+            name = link["name"].strip()
+            if name:
+                courses.append({"name": name, "index": len(courses), "url": link["href"]})
+
+        course_list_url = self.page.url
+
+        with self.state_manager.browser_lock:
+            self.state_manager.browser_ready = True
+            self.state_manager.username = username
+            self.state_manager.courses = courses
+            self.state_manager.course_list_url = course_list_url
+            self.state_manager.assignments_tool_urls = {}
+
+        return courses, course_list_url
+
+    async def fetch_assignments(self, selected_course):
+        """Fetch assignments for a selected course (see PortalScraper.fetch_assignments)"""
+        try:
+            print(f"[DEBUG] fetch_assignments started")
+
+            # The GUI stores the list itself, and only if the result is still wanted
+            assignments = await self._load_assignment_list(selected_course["index"])
+            return True, assignments, None
+
+        except Exception as e:
+            print(f"ERROR in fetch_assignments: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            return False, [], str(e)
+
+    async def process_assignment(self, selected_assignment, on_batch=None):
+        """Find students with missing grades (see PortalScraper.process_assignment)"""
+        try:
+            print(f"[DEBUG] process_assignment started")
+
+            with self.state_manager.browser_lock:
+                current_course_index = self.state_manager.current_course_index
+            students_missing = await self._find_students_missing(selected_assignment, current_course_index, on_batch)
+
+            return True, students_missing, None
+
+        except Exception as e:
+            print(f"ERROR in process_assignment: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            return False, [], str(e)
+
+    async def scan_course(self, selected_course, on_progress=None, history=None, assignment_names=None,
+                          exporter=None):
+        """Process every assignment of a course in one run (see PortalScraper.scan_course)"""
+        matrix = MissingMarksMatrix(selected_course["name"])
+        try:
+            print(f"[DEBUG] scan_course started")
+
+            course_index = selected_course["index"]
+            assignments = filter_assignments(await self._load_assignment_list(course_index), assignment_names)
+
+            for done, assignment in enumerate(assignments, start=1):
+                try:
+                    students_missing, reused = await self._check_assignment(selected_course, assignment, history)
+                    matrix.add_assignment(assignment["name"], students_missing, reused)
+                    if exporter:
+                        exporter.write_assignment(selected_course["name"], assignment["name"], students_missing)
+                except Exception as e:
+                    print(f"ERROR in scan_course ({assignment['name']}): {type(e).__name__}: {e}")
+                    traceback.print_exc()
+                    matrix.add_failure(assignment["name"], str(e))
+                    if exporter:
+                        exporter.write_assignment(selected_course["name"], assignment["name"], [], str(e))
+
+                if on_progress:
+                    self.ui_callback(0, on_progress, done, len(assignments), assignment["name"])
+
+            return True, matrix, None
+
+        except Exception as e:
+            print(f"ERROR in scan_course: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            return False, matrix, str(e)
+
+    async def sweep(self, courses, checkpoint, on_result, deadline=None, cancel_event=None, history=None,
+                    exporter=None, should_pause=None):
+        """Check every assignment of every course, streaming each result (see PortalScraper.sweep)"""
+        summary = {"checked": 0, "unchanged": 0, "skipped": 0, "failed": 0, "stopped": False, "paused": None}
+        try:
+            print(f"[DEBUG] sweep started over {len(courses)} course(s)")
+
+            for position, course in enumerate(courses):
+                try:
+                    assignments = await self._load_assignment_list(course["index"])
+                except Exception as e:
+                    print(f"ERROR in sweep ({course['name']}): {type(e).__name__}: {e}")
+                    traceback.print_exc()
+                    summary["failed"] += 1
+                    if exporter:
+                        exporter.write_assignment(course["name"], None, [], str(e))
+                    self.ui_callback(0, on_result, course["name"], None, [], str(e))
+                    continue
+
+                for assignment in assignments:
+                    if checkpoint.is_done(course["name"], assignment["assignment_id"]):
+                        if checkpoint.done_earlier(course["name"], assignment["assignment_id"]):
+                            summary["skipped"] += 1
+                        continue
+
+                    if (cancel_event and cancel_event.is_set()) or (deadline and time.monotonic() > deadline):
+                        summary["stopped"] = True
+                        return True, summary, None
+
+                    if should_pause and should_pause():
+                        summary["paused"] = position
+                        return True, summary, None
+
+                    try:
+                        students_missing, reused = await self._check_assignment(course, assignment, history)
+                    except Exception as e:
+                        print(f"ERROR in sweep ({course['name']} / {assignment['name']}): {type(e).__name__}: {e}")
+                        traceback.print_exc()
+                        summary["failed"] += 1
+                        if exporter:
+                            exporter.write_assignment(course["name"], assignment["name"], [], str(e))
+                        self.ui_callback(0, on_result, course["name"], assignment["name"], [], str(e))
+                        continue
+
+                    summary["checked"] += 1
+                    if reused:
+                        summary["unchanged"] += 1
+                    # Written before the checkpoint, so a resumed sweep never
+                    # skips an assignment missing from the report
+                    if exporter:
+                        exporter.write_assignment(course["name"], assignment["name"], students_missing)
+                    checkpoint.mark_done(course["name"], assignment["assignment_id"])
+                    self.ui_callback(0, on_result, course["name"], assignment["name"], students_missing, None)
+
+            return True, summary, None
+
+        except Exception as e:
+            print(f"ERROR in sweep: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            return False, summary, str(e)
+
+    async def prefetch(self, job, history=None, should_stop=None):
+        """Read the data of a prefetch job without touching the shared state (see PortalScraper.prefetch)"""
+        self._should_stop = should_stop
+        try:
+            course = job["course"]
+            if "assignment" in job:
+                return (await self._check_assignment(course, job["assignment"], history))[0]
+            return await self._load_assignment_list(course["index"])
+        except Preempted:
+            print("[DEBUG] Prefetch abandoned for a waiting operation")
+            return None
+        finally:
+            self._should_stop = None
+
+    def _before_page_load(self):
+        """Abandon a running prefetch here if a user operation is waiting for the page"""
+        if self._should_stop and self._should_stop():
+            raise Preempted()
+
+    async def _check_assignment(self, course, assignment, history):
+        """Return (students_missing, reused), reusing history when the counters have not moved"""
+        if history:
+            students_missing = history.unchanged(course, assignment)
+            if students_missing is not None:
+                print(f"[DEBUG] {assignment['name']}: counters unchanged, reusing stored result")
+                return students_missing, True
+
+        students_missing = await self._find_students_missing(assignment, course["index"])
+        if history:
+            history.record(course, assignment, students_missing)
+        return students_missing, False
+
+    async def _load_assignment_list(self, course_index):
+        """Open a course's Assignments tool and read every assignment row in one in-page pass"""
+        await self._open_assignments_tool(course_index)
+        with self.tracer.span("extract assignment rows", "extract"):
+            raw_rows = await self.page.evaluate(dom_scripts.ASSIGNMENT_ROWS)
+        return parse_assignment_rows(raw_rows)
+
+    async def _find_students_missing(self, selected_assignment, course_index, on_batch=None):
+        """Open an assignment's grading page and return the students missing marks"""
+        grade_url = selected_assignment.get("grade_url")
+        if not (grade_url and await self._goto_deep_link(grade_url, "grading_table")):
+            await self._open_grading_page_by_clicks(selected_assignment, course_index)
+
+        rows = await self.read_all_submission_rows(on_batch)
+        return filter_missing_students(rows)
+
+    async def _goto_deep_link(self, url, step):
+        """Load a previously captured URL directly; False if it did not show the step's page"""
+        try:
+            print(f"[DEBUG] Deep-linking to {url}")
+            with self.tracer.span("goto deep link", step=step):
+                await self.page.goto(url)
+            await self.waits.wait_async(self.page, step, fallback=False)
+            return True
+        except Exception as e:
+            print(f"[DEBUG] Deep link failed, falling back to navigation: {type(e).__name__}: {e}")
+            return False
+
+    async def _open_assignments_tool(self, course_index):
+        """Show the assignment list of a course (see PortalScraper._open_assignments_tool)"""
+        with self.state_manager.browser_lock:
+            tool_url = self.state_manager.assignments_tool_urls.get(course_index)
+            courses = self.state_manager.courses
+            course_list_url = self.state_manager.course_list_url
+        course = courses[course_index] if course_index is not None and course_index < len(courses) else {}
+
+        if tool_url and await self._goto_deep_link(tool_url, "assignment_list"):
+            return
+
+        site_url = course.get("url")
+        if not (site_url and await self._goto_deep_link(site_url, "course_site")):
+            if course_list_url not in self.page.url:
+                with self.tracer.span("goto course list"):
+                    await self.page.goto(course_list_url)
+            await self.waits.wait_async(self.page, "course_list")
+
+            course_elements = await self.page.query_selector_all(".link-container")
+            if course_index is not None and course_index < len(course_elements):
+                with self.tracer.span("click course"):
+                    await course_elements[course_index].click()
+                await self.waits.wait_async(self.page, "course_site")
+            else:
+                raise Exception(f"Course element at index {course_index} not found")
+
+        self._before_page_load()
+        assignment_div = self.page.get_by_text("Assignments", exact=True)
+        await assignment_div.wait_for(state="visible")
+        with self.tracer.span("click assignments tool"):
+            await assignment_div.click()
+        await self.waits.wait_async(self.page, "assignment_list")
+
+        with self.state_manager.browser_lock:
+            self.state_manager.assignments_tool_urls[course_index] = self.page.url
+
+    async def _open_grading_page_by_clicks(self, selected_assignment, course_index):
+        """Reach the grading page of an assignment through the Assignments tool"""
+        submission_table = await self.page.query_selector(PortalScraper.GRADING_TABLE_SELECTOR)
+        if submission_table:
+            print("[DEBUG] On submission page, navigating back to assignments")
+            btn_assgn = await self.page.query_selector('li.firstToolBarItem span a')
+            if btn_assgn:
+                with self.tracer.span("click back to assignments"):
+                    await btn_assgn.click()
+                await self.waits.wait_async(self.page, "assignment_list")
+
+        assignment_span = await self.page.query_selector('span.Mrphs-toolTitleNav__text')
+        is_on_assignments_page = assignment_span and "Assignments" in await assignment_span.inner_text()
+
+        if not is_on_assignments_page:
+            print("[DEBUG] Not on assignments page, navigating...")
+            await self._open_assignments_tool(course_index)
+
+        grade_links = self.page.locator(PortalScraper.GRADE_LINK_SELECTOR)
+        link_index = find_grade_link(await grade_links.evaluate_all(dom_scripts.GRADE_LINK_HREFS), selected_assignment)
+        if link_index is None:
+            raise Exception(f"Grade link for {selected_assignment['name']} not found")
+        self._before_page_load()
+        with self.tracer.span("click grade link"):
+            await grade_links.nth(link_index).click()
+        await self.waits.wait_async(self.page, "grading_table")
+
+    async def read_submission_rows(self):
+        """Read every row of the grading table in one in-page evaluation"""
+        with self.tracer.span("extract submission rows", "extract"):
+            rows = await self.page.evaluate(dom_scripts.SUBMISSION_ROWS)
+        return [{key: text.strip() for key, text in row.items()} for row in rows]
+
+    async def read_all_submission_rows(self, on_batch=None):
+        """Read the whole grading table across every pager page (see PortalScraper.read_all_submission_rows)"""
+        merged = {}
+        pages = 1
+        added, duplicates = await self._read_table_page(merged, on_batch)
+        self._before_page_load()
+        if await self._use_largest_page_size():
+            pages += 1
+            added, skipped = await self._read_table_page(merged, on_batch)
+            duplicates += skipped
+
+        while added and pages < PortalScraper.MAX_TABLE_PAGES:
+            self._before_page_load()
+            if not await self._next_table_page():
+                break
+            pages += 1
+            added, skipped = await self._read_table_page(merged, on_batch)
+            duplicates += skipped
+
+        self.table_stats["tables"] += 1
+        self.table_stats["pages"] += pages
+        self.table_stats["rows"] += len(merged)
+        self.table_stats["duplicates"] += duplicates
+        print(f"[DEBUG] Grading table: {pages} page(s), {len(merged)} student(s), {duplicates} duplicate row(s)")
+        return list(merged.values())
+
+    async def _read_table_page(self, merged, on_batch):
+        """Merge the grading table page on screen into merged; returns (added, duplicates)"""
+        new_rows, duplicates = merge_submission_rows(merged, await self.read_submission_rows())
+        batch = filter_missing_students(new_rows)
+        if on_batch and batch:
+            self.ui_callback(0, on_batch, batch)
+        return len(new_rows), duplicates
+
+    async def _use_largest_page_size(self):
+        """Switch the grading table to the largest page size the pager offers; True if it changed"""
+        choice = await self.page.evaluate(dom_scripts.PAGE_SIZE_CHOICE)
+        if not choice or choice["selected"] == choice["largest"]:
+            return False
+        try:
+            print(f"[DEBUG] Showing {choice['largest']} rows per grading page")
+            with self.tracer.span("select page size"):
+                async with self.page.expect_navigation(timeout=15000):
+                    await self.page.select_option(PortalScraper.PAGE_SIZE_SELECTOR, choice["largest"])
+            await self.waits.wait_async(self.page, "grading_table")
+            return True
+        except Exception as e:
+            print(f"Warning: Could not change grading page size: {type(e).__name__}: {e}")
+            return False
+
+    async def _next_table_page(self):
+        """Follow the pager's next button; False if this is the last page"""
+        next_button = await self.page.query_selector(PortalScraper.NEXT_PAGE_SELECTOR)
+        if next_button is None:
+            return False
+        with self.tracer.span("click next page"):
+            async with self.page.expect_navigation():
+                await next_button.click()
+        await self.waits.wait_async(self.page, "grading_table")
+        return True
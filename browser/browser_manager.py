@@ -1,41 +1,192 @@
 """Browser management with threading and queue-based operations"""
+import os
+import re
 import threading
 import time
 import traceback
 import sys
-from queue import Queue, Empty
-from playwright.sync_api import sync_playwright
+from queue import Empty
+from urllib.parse import urlparse
+from browser.operation_scheduler import OperationScheduler
 from browser.portal_scraper import PortalScraper
+from browser.prefetcher import Prefetcher
+from browser.resource_filter import ResourceFilter
+from browser.wait_strategy import WaitStrategy
+from models.sweep_checkpoint import SweepCheckpoint
+from utils.credential_manager import CredentialManager
+from utils.report_exporter import ReportExporter
+from utils.result_cache import ScanHistory, course_key
+from utils.settings import Settings
+from utils.tracing import Tracer
+from utils import startup_timer
 
 
 class BrowserManager:
     """Manages browser thread and queues Playwright operations"""
     
-    def __init__(self, state_manager, ui_callback):
+    ACCOUNT_ATTACH_TIMEOUT = 120  # seconds an added account waits for the shared browser
+    
+    # Added accounts live in contexts of this manager's Playwright-launched
+    # browser, which sync Playwright only lets the browser thread use, so
+    # only the async engine (one event loop for every context) hosts them
+    HOSTS_ACCOUNTS = False
+    
+    def __init__(self, state_manager, ui_callback, settings=None, result_cache=None, primary=None):
         """
         Initialize browser manager
         
         Args:
             state_manager: Object with browser_lock, browser, page, etc.
             ui_callback: Function to safely schedule UI updates (safe_after wrapper)
+            settings: Settings instance (defaults to one read from the environment)
+            result_cache: Optional ResultCache that scans and sweeps check
+                          submission counters against
+            primary: Manager whose Chromium process this one opens its
+                     browser context in instead of launching its own
+                     (set by add_account)
         """
         self.state_manager = state_manager
         self.ui_callback = ui_callback
+        self.settings = settings or Settings()
+        self.result_cache = result_cache
+        self.primary = primary
         
         self.playwright = None
         self.browser_thread = None
-        self.browser_queue = Queue()
+        self.browser_queue = OperationScheduler()
         self.scraper = None
+        self.credential_manager = CredentialManager()
+        self.resource_filter = None
+        if primary is None:
+            self.tracer = Tracer(enabled=self.settings.trace)
+            self.waits = WaitStrategy(self.settings.wait_mode, tracer=self.tracer)
+        else:
+            # One trace and one set of wait timings for the whole browser
+            self.tracer = primary.tracer
+            self.waits = primary.waits
+        self.sweep_cancel_event = threading.Event()
+        self.ready = threading.Event()  # set once the browser is up and on the login page
+        self.startup_error = None  # why the browser failed to start, once ready is set
+        self.prefetcher = Prefetcher(self.settings.prefetch_courses, self.settings.prefetch_assignments)
+        
+        # Page pool bookkeeping (threads, live pages, pages running an operation)
+        self._pool_lock = threading.Lock()
+        self._worker_threads = []
+        self._pool_size = 0
+        self._busy_pages = 0
+        self._accounts = []  # managers added with add_account
     
     def start_browser_worker(self):
         """Start the browser worker thread if not already running"""
         if self.browser_thread is None or not self.browser_thread.is_alive():
-            self.browser_thread = threading.Thread(target=self._browser_worker, daemon=True)
+            self._clear_startup_error()
+            self.browser_thread = threading.Thread(
+                target=self._browser_worker, args=(self.browser_queue,), daemon=True
+            )
+            with self._pool_lock:
+                self._worker_threads = [self.browser_thread]
             self.browser_thread.start()
-            # Give thread time to initialize
-            time.sleep(0.5)
     
-    def queue_login(self, username, password, on_success, on_error, status_callback):
+    def wait_until_ready(self, timeout=None):
+        """
+        Block until the browser has launched and opened the login page
+        
+        Returns:
+            bool: True if the browser is ready, False on timeout or if it
+                  failed to start (see startup_error)
+        """
+        return self.ready.wait(timeout) and self.startup_error is None
+    
+    def _clear_startup_error(self):
+        """Forget a failed start before the worker is started again"""
+        if self.startup_error is not None:
+            self.startup_error = None
+            self.ready.clear()
+    
+    def _fail_startup(self, error_message, operation_queue):
+        """
+        Report that the browser could not start instead of leaving callers waiting
+        
+        Wakes wait_until_ready() and fails every queued operation: logins
+        with the "connection" error type, everything else with error_message.
+        """
+        self.startup_error = error_message
+        self.ready.set()
+        while True:
+            try:
+                operation = operation_queue.get_nowait()
+            except Empty:
+                return
+            if operation is None:
+                continue
+            if operation.get('type') == 'login':
+                operation_queue.complete(operation)
+                self.ui_callback(0, operation['on_error'], "connection")
+            elif operation.get('type') == 'prefetch':
+                operation_queue.task_done(operation)
+            else:
+                self._deliver(operation, False, None, f"Browser did not start: {error_message}")
+    
+    def add_account(self, state_manager, ui_callback=None):
+        """
+        Add another account that signs in next to this one in the same browser
+        
+        The account gets its own browser context (cookies and session), its
+        own operation queue and its own worker, so its operations run
+        alongside this manager's while Chromium, the result cache and the
+        trace are shared. Log it in and queue work on the returned manager
+        exactly as on this one.
+        
+        Args:
+            state_manager: AppState of the account
+            ui_callback: UI scheduler for the account's callbacks (defaults to this manager's)
+            
+        Returns:
+            BrowserManager: The account's manager (same engine as this one)
+            
+        Raises:
+            RuntimeError: If settings.multi_account is off or this engine
+                          cannot host accounts (see HOSTS_ACCOUNTS)
+        """
+        if self.primary is not None:
+            return self.primary.add_account(state_manager, ui_callback)
+        if not self.settings.multi_account:
+            raise RuntimeError("Set CHECKMARKS_MULTI_ACCOUNT=1 to sign in several accounts at once")
+        if not self.HOSTS_ACCOUNTS:
+            raise RuntimeError("Only the async engine can sign in several accounts at once")
+        
+        account = type(self)(
+            state_manager, ui_callback or self.ui_callback, self.settings, self.result_cache, primary=self
+        )
+        with self._pool_lock:
+            self._accounts.append(account)
+        return account
+    
+    def remove_account(self, account):
+        """
+        Sign an added account out by closing its browser context
+        
+        The browser and every other account keep running, unlike reset().
+        """
+        with self._pool_lock:
+            if account in self._accounts:
+                self._accounts.remove(account)
+        account.shutdown()
+    
+    def accounts(self):
+        """Return the managers added with add_account that are still open"""
+        with self._pool_lock:
+            return list(self._accounts)
+    
+    def _close_accounts(self):
+        """Shut down every added account before the browser they live in goes away"""
+        with self._pool_lock:
+            accounts = self._accounts
+            self._accounts = []
+        for account in accounts:
+            account.shutdown()
+    
+    def queue_login(self, username, password, on_success, on_error, status_callback, remember_session=False):
         """
         Queue a login operation
         
@@ -45,6 +196,8 @@ class BrowserManager:
             on_success: Callback(courses) for successful login
             on_error: Callback(error_type) for login error
             status_callback: Callback(message) for status updates
+            remember_session: Reuse a saved browser session if it is still valid,
+                              and save the session after logging in
         """
         self.start_browser_worker()
         
@@ -52,6 +205,7 @@ class BrowserManager:
             'type': 'login',
             'username': username,
             'password': password,
+            'remember_session': remember_session,
             'on_success': on_success,
             'on_error': on_error,
             'status_callback': status_callback
@@ -73,32 +227,154 @@ class BrowserManager:
             'on_error': on_error
         })
     
-    def queue_process_assignment(self, selected_assignment, on_success, on_error):
+    def queue_process_assignment(self, selected_assignment, on_success, on_error, on_batch=None):
         """
         Queue a process assignment operation
         
         Args:
             selected_assignment: Assignment dict with index
-            on_success: Callback(students_missing) for success
+            on_success: Callback(students_missing) for success, with the full list
             on_error: Callback(error_message) for error
+            on_batch: Optional callback(students_missing) for each grading page
+                      as soon as it is read, before on_success
         """
         self.browser_queue.put({
             'type': 'process_assignment',
             'assignment': selected_assignment,
             'on_success': on_success,
+            'on_error': on_error,
+            'on_batch': on_batch
+        })
+    
+    def queue_scan_course(self, selected_course, on_success, on_error, on_progress=None, assignment_names=None):
+        """
+        Queue a scan of every assignment in a course
+        
+        Args:
+            selected_course: Course dict with index and name
+            on_success: Callback(matrix) with a MissingMarksMatrix
+            on_error: Callback(error_message) for error
+            on_progress: Optional callback(done, total, assignment_name)
+            assignment_names: Optional list of names; only assignments whose
+                              name contains one of them (ignoring case) are checked
+        """
+        self.browser_queue.put({
+            'type': 'scan_course',
+            'course': selected_course,
+            'assignment_names': assignment_names,
+            'on_success': on_success,
+            'on_error': on_error,
+            'on_progress': on_progress
+        })
+    
+    def queue_sweep(self, on_result, on_complete, on_error, resume=True):
+        """
+        Queue a sweep over every assignment of every course
+        
+        Args:
+            on_result: Callback(course_name, assignment_name, students_missing, error_message)
+                       for each finished assignment, as soon as it is finished
+            on_complete: Callback(summary) once the sweep ends (see PortalScraper.sweep)
+            on_error: Callback(error_message) for error
+            resume: Skip assignments finished by an earlier, interrupted sweep
+        """
+        self.sweep_cancel_event.clear()
+        self.browser_queue.put({
+            'type': 'sweep',
+            'resume': resume,
+            'on_result': on_result,
+            'on_success': on_complete,
             'on_error': on_error
         })
     
-    def _browser_worker(self):
-        """Single browser worker thread that handles all Playwright operations"""
+    def cancel_sweep(self):
+        """Stop a running sweep after the assignment it is working on"""
+        self.sweep_cancel_event.set()
+    
+    def sweep_checkpoint_path(self):
+        """Return the checkpoint file used by sweeps of the logged-in user"""
+        with self.state_manager.browser_lock:
+            username = self.state_manager.username or "default"
+        return os.path.join(self.settings.data_dir, f"sweep-{username}.jsonl")
+    
+    def prefetch_courses(self, courses, usage):
+        """
+        Read ahead the assignment lists of the most-used courses while idle
+        
+        Args:
+            courses: Course dicts as returned by login
+            usage: Dict of course key -> number of times the course was opened
+        """
+        if self._prefetch_enabled():
+            self._queue_prefetch(self.prefetcher.plan_courses(courses, usage))
+    
+    def prefetch_assignments(self, course, assignments):
+        """Read ahead the grading tables of the assignments the user is likely to open next"""
+        if self._prefetch_enabled():
+            self._queue_prefetch(self.prefetcher.plan_assignments(course, assignments))
+    
+    def prefetch_stats(self):
+        """Report prefetch hits, misses and jobs (see Prefetcher.stats)"""
+        return self.prefetcher.stats()
+    
+    def _queue_prefetch(self, count):
+        """
+        Queue one lowest-priority operation per planned prefetch job
+        
+        Each operation runs whichever job is next in the Prefetcher when a
+        worker gets to it, so operations left over from a dropped plan do nothing.
+        """
+        for _ in range(count):
+            self.browser_queue.put({'type': 'prefetch'})
+    
+    def _prefetch_enabled(self):
+        """Prefetched data lands in the result cache, so prefetching needs one"""
+        return self.settings.prefetch and self.result_cache is not None
+    
+    def pool_stats(self):
+        """
+        Report page pool utilisation
+        
+        Returns:
+            dict: "size" (live pages), "busy" (pages running an operation)
+                  and "queued" (operations waiting for a free page)
+        """
+        with self._pool_lock:
+            return {
+                'size': self._pool_size,
+                'busy': self._busy_pages,
+                'queued': self.browser_queue.qsize()
+            }
+    
+    def queue_stats(self):
+        """Report queued, running, superseded and coalesced operations (see OperationScheduler.stats)"""
+        return self.browser_queue.stats()
+    
+    def wait_stats(self):
+        """Report how long each navigation step has been waiting (see WaitStrategy.stats)"""
+        return self.waits.stats()
+    
+    def resource_stats(self):
+        """Report requests blocked and let through in this run, or None if filtering is off"""
+        return self.resource_filter.stats() if self.resource_filter else None
+    
+    def _browser_worker(self, operation_queue):
+        """Primary browser worker thread: launches Chromium and handles login"""
         browser = None
         try:
             print(f"[DEBUG] browser_worker started in thread: {threading.current_thread().name}")
             
-            # Initialize playwright in this thread
+            # Initialize playwright in this thread (imported here so the
+            # login window can paint before Playwright is loaded)
+            with startup_timer.timer.importing("playwright.sync_api"):
+                from playwright.sync_api import sync_playwright
             self.playwright = sync_playwright().start()
-            browser = self.playwright.chromium.launch(headless=False)
-            page = browser.new_page()
+            browser = self.playwright.chromium.launch(headless=self.settings.headless)
+            context = browser.new_context()
+            if self.settings.block_resources:
+                self.resource_filter = ResourceFilter(PortalScraper.LOGIN_URL, self.settings.allowed_hosts)
+                self.resource_filter.attach(context)
+            page = context.new_page()
             
             # Store browser/page in this thread's context
             with self.state_manager.browser_lock:
@@ -106,42 +382,26 @@ class BrowserManager:
                 self.state_manager.page = page
             
             # Create scraper instance
-            self.scraper = PortalScraper(page, self.state_manager, self.ui_callback)
+            self.scraper = self._create_scraper(page)
+            self.scraper.open_login_page()
+            self.ready.set()
             
-            # Process operations from queue
-            while True:
-                try:
-                    operation = self.browser_queue.get(timeout=1.0)
-                    if operation is None:  # Shutdown signal
-                        break
-                    
-                    op_type = operation.get('type')
-                    
-                    if op_type == 'login':
-                        self._handle_login(operation, page)
-                    elif op_type == 'fetch_assignments':
-                        self._handle_fetch_assignments(operation, page)
-                    elif op_type == 'process_assignment':
-                        self._handle_process_assignment(operation, page)
-                    
-                    self.browser_queue.task_done()
-                except Empty:
-                    # Queue timeout - continue loop to check for shutdown
-                    continue
-                except Exception as e:
-                    print(f"ERROR in browser_worker processing operation: {type(e).__name__}: {e}")
-                    traceback.print_exc()
-                    sys.stderr.flush()
-                    try:
-                        self.browser_queue.task_done()
-                    except:
-                        pass
+            def after_operation(operation):
+                if operation.get('type') == 'login' and self.state_manager.browser_ready:
+                    self._start_page_pool(operation, operation_queue)
+            
+            self._worker_loop(operation_queue, self.scraper, after_operation)
                     
         except Exception as e:
             print(f"ERROR in browser_worker: {type(e).__name__}: {e}")
             traceback.print_exc()
             sys.stderr.flush()
+            if not self.ready.is_set():
+                self._fail_startup(f"{type(e).__name__}: {e}", operation_queue)
         finally:
+            if self.resource_filter:
+                print(f"[DEBUG] Resource filter: {self.resource_filter.stats()}")
+            print(f"[DEBUG] Wait timings: {self.waits.stats()}")
             if browser:
                 try:
                     browser.close()
@@ -153,62 +413,425 @@ class BrowserManager:
                 except:
                     pass
     
-    def _handle_login(self, operation, page):
+    def _create_scraper(self, page):
+        """Create the scraper for one page, using the /direct fast path if enabled"""
+        if self.settings.rest_fast_path:
+            # Off by default; imported here so startup does not load http.client
+            from browser.rest_backend import RestPortalScraper
+            return RestPortalScraper(page, self.state_manager, self.ui_callback, self.waits, tracer=self.tracer)
+        return PortalScraper(page, self.state_manager, self.ui_callback, self.waits, self.tracer)
+    
+    def _start_page_pool(self, login, operation_queue):
+        """Open the extra pool pages after a successful login operation"""
+        with self._pool_lock:
+            missing = self.settings.page_pool_size - len(self._worker_threads)
+        if missing <= 0:
+            return
+        
+        for _ in range(missing):
+            thread = threading.Thread(
+                target=self._page_worker, args=(operation_queue, login['username'], login['password']), daemon=True
+            )
+            with self._pool_lock:
+                self._worker_threads.append(thread)
+            thread.start()
+    
+    def _page_worker(self, operation_queue, username, password):
+        """
+        Pool worker thread driving one extra page in a Sakai session of its own
+        
+        Sakai keeps pager and tool state per session, so every pool page
+        signs in separately rather than sharing the first page's cookies.
+        Sync Playwright objects are bound to the thread that created them,
+        so the page lives in a browser launched by this thread (the async
+        engine keeps all pool pages in one browser).
+        """
+        playwright = None
+        browser = None
+        try:
+            print(f"[DEBUG] page_worker started in thread: {threading.current_thread().name}")
+            
+            from playwright.sync_api import sync_playwright
+            playwright = sync_playwright().start()
+            browser = playwright.chromium.launch(headless=self.settings.headless)
+            context = browser.new_context()
+            if self.resource_filter:
+                self.resource_filter.attach(context)
+            page = context.new_page()
+            
+            scraper = self._create_scraper(page)
+            if not scraper.sign_in(username, password):
+                print("Warning: Pool page could not sign in; continuing with fewer pages")
+                return
+            self._worker_loop(operation_queue, scraper)
+            
+        except Exception as e:
+            print(f"ERROR in page_worker: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            sys.stderr.flush()
+        finally:
+            if browser:
+                try:
+                    browser.close()
+                except:
+                    pass
+            if playwright:
+                try:
+                    playwright.stop()
+                except:
+                    pass
+    
+    def _worker_loop(self, operation_queue, scraper, after_operation=None):
+        """Process operations from the queue with one page until shutdown"""
+        with self._pool_lock:
+            self._pool_size += 1
+        try:
+            while True:
+                operation = None
+                try:
+                    # Blocks until there is work; shutdown arrives as None
+                    operation = operation_queue.get()
+                    if operation is None:  # Shutdown signal
+                        break
+                    
+                    self._run_operation(operation, scraper)
+                    if after_operation:
+                        after_operation(operation)
+                    
+                    operation_queue.task_done(operation)
+                except Exception as e:
+                    print(f"ERROR in browser_worker processing operation: {type(e).__name__}: {e}")
+                    traceback.print_exc()
+                    sys.stderr.flush()
+                    try:
+                        operation_queue.task_done(operation)
+                    except:
+                        pass
+        finally:
+            with self._pool_lock:
+                self._pool_size -= 1
+    
+    def _handle_prefetch(self, operation, scraper):
+        """Run the next prefetch job and store its result in the result cache"""
+        job = self.prefetcher.next_job()
+        history = self._scan_history()
+        if job is None or history is None or not self._prefetch_needed(job, history):
+            return
+        self._store_prefetch(job, history, scraper.prefetch(job, history, self._prefetch_should_stop))
+    
+    def _prefetch_needed(self, job, history):
+        """Return False if the job's assignment list is already fresh in the cache"""
+        if "assignment" in job:
+            return True  # unchanged counters are answered from history without a page load
+        cached = self.result_cache.get(history.user, "assignments", course_key(job["course"]))
+        if cached and cached[1]:
+            self.prefetcher.mark_done(job)
+            return False
+        return True
+    
+    def _prefetch_should_stop(self):
+        """Return True if any other operation is waiting for the page a prefetch holds"""
+        return self.browser_queue.has_waiting_before(OperationScheduler.PRIORITIES['prefetch'])
+    
+    def _store_prefetch(self, job, history, result):
+        """Cache a prefetched assignment list (grading results are recorded by the scraper)"""
+        if result is None:
+            # Abandoned for a user operation: try again once the queue is idle
+            self.prefetcher.put_back(job)
+            self._queue_prefetch(1)
+            return
+        if "assignment" not in job:
+            self.result_cache.put(history.user, "assignments", result, course_key(job["course"]))
+        self.prefetcher.mark_done(job)
+        print(f"[DEBUG] Prefetch: {self.prefetcher.stats()}")
+    
+    def _run_operation(self, operation, scraper):
+        """Dispatch one queued operation to its handler"""
+        with self._pool_lock:
+            self._busy_pages += 1
+        try:
+            op_type = operation.get('type')
+            self._trace_queue_wait(operation)
+            
+            with self.tracer.span(op_type, "operation"):
+                if op_type == 'login':
+                    self._handle_login(operation, scraper)
+                elif op_type == 'fetch_assignments':
+                    self._handle_fetch_assignments(operation, scraper)
+                elif op_type == 'process_assignment':
+                    self._handle_process_assignment(operation, scraper)
+                elif op_type == 'scan_course':
+                    self._handle_scan_course(operation, scraper)
+                elif op_type == 'sweep':
+                    self._handle_sweep(operation, scraper)
+                elif op_type == 'prefetch':
+                    self._handle_prefetch(operation, scraper)
+        finally:
+            with self._pool_lock:
+                self._busy_pages -= 1
+            if self.settings.page_pool_size > 1:
+                print(f"[DEBUG] Page pool: {self.pool_stats()}")
+    
+    def _handle_login(self, operation, scraper):
         """Handle login operation"""
         username = operation['username']
-        password = operation['password']
-        on_success = operation['on_success']
-        on_error = operation['on_error']
         status_callback = operation['status_callback']
         
-        success, courses, course_list_url, error_type = self.scraper.login(
-            username, password, status_callback
-        )
+        success = False
+        saved_session = self._saved_session_for(operation)
+        if saved_session:
+            success, courses, course_list_url, error_type = scraper.resume_session(
+                username, saved_session, status_callback
+            )
+        if not success:
+            success, courses, course_list_url, error_type = scraper.login(
+                username, operation['password'], status_callback
+            )
         
+        storage_state = None
+        if success and operation.get('remember_session', False):
+            storage_state = scraper.page.context.storage_state()
+        self._finish_login(operation, success, courses, error_type, storage_state)
+    
+    def _saved_session_for(self, operation):
+        """Return the saved browser session to try before the login form, if any"""
+        if not operation.get('remember_session', False):
+            return None
+        return self.credential_manager.load_session(operation['username'])
+    
+    def _finish_login(self, operation, success, courses, error_type, storage_state):
+        """Save or forget the session after a login attempt and report the result"""
+        username = operation['username']
         if success:
-            self.ui_callback(0, on_success, courses)
+            # A session that could not be saved must not leave an older one behind
+            saved = storage_state is not None and self.credential_manager.save_session(
+                username, storage_state, urlparse(PortalScraper.LOGIN_URL).hostname
+            )
+            if not saved:
+                self.credential_manager.clear_session(username)
+            self.ui_callback(0, operation['on_success'], courses)
         else:
-            self.ui_callback(0, on_error, error_type)
+            self.ui_callback(0, operation['on_error'], error_type)
     
-    def _handle_fetch_assignments(self, operation, page):
+    def _handle_fetch_assignments(self, operation, scraper):
         """Handle fetch assignments operation"""
-        selected_course = operation['course']
-        on_success = operation['on_success']
-        on_error = operation['on_error']
+        success, assignments, error_message = scraper.fetch_assignments(operation['course'])
+        self._deliver(operation, success, assignments, error_message)
+    
+    def _handle_process_assignment(self, operation, scraper):
+        """Handle process assignment operation"""
+        success, students_missing, error_message = scraper.process_assignment(
+            operation['assignment'], self._batch_callback(operation)
+        )
         
-        success, assignments, error_message = self.scraper.fetch_assignments(selected_course)
+        # The GUI keeps the students list of the assignment it shows; this
+        # result may belong to one the user has already left
+        self._deliver(operation, success, students_missing, error_message)
+    
+    def _handle_scan_course(self, operation, scraper):
+        """Handle scan course operation"""
+        exporter = self._open_exporter(f"scan-{operation['course']['name']}-{time.strftime('%Y%m%d-%H%M%S')}")
+        try:
+            success, matrix, error_message = scraper.scan_course(
+                operation['course'], operation.get('on_progress'), self._scan_history(),
+                operation.get('assignment_names'), exporter
+            )
+        finally:
+            if exporter:
+                exporter.close()
+        if exporter:
+            matrix.reports = exporter.paths
+        self._deliver(operation, success, matrix, error_message)
+    
+    def _handle_sweep(self, operation, scraper):
+        """Handle sweep operation"""
+        checkpoint, courses, deadline = self._prepare_sweep(operation)
+        # A resumed or continued sweep adds to the report of the interrupted one
+        exporter = self._open_exporter("sweep", append='continuation' in operation or checkpoint.is_resuming())
+        try:
+            success, summary, error_message = scraper.sweep(
+                courses, checkpoint, operation['on_result'], deadline, self.sweep_cancel_event,
+                self._scan_history(), exporter, self._sweep_should_pause
+            )
+        finally:
+            if exporter:
+                exporter.close()
+        self._finish_sweep(operation, success, summary, error_message, exporter, (checkpoint, courses, deadline))
+    
+    def _open_exporter(self, name, append=False):
+        """
+        Open the report files of a scan or sweep in settings.export_dir
         
-        if success:
-            self.ui_callback(0, on_success, assignments)
-        else:
-            self.ui_callback(0, on_error, error_message)
+        Args:
+            name: Report name; the username is appended
+            append: Continue an existing report instead of replacing it
+            
+        Returns:
+            ReportExporter, or None if the export is turned off or cannot be opened
+        """
+        if not self.settings.export_formats:
+            return None
+        with self.state_manager.browser_lock:
+            username = self.state_manager.username or "default"
+        file_name = re.sub(r"[^\w.-]+", "_", f"{name}-{username}")
+        try:
+            return ReportExporter(os.path.join(self.settings.export_dir, file_name), self.settings.export_formats, append)
+        except (OSError, ValueError) as e:
+            print(f"Warning: Report export disabled: {type(e).__name__}: {e}")
+            return None
     
-    def _handle_process_assignment(self, operation, page):
-        """Handle process assignment operation"""
-        selected_assignment = operation['assignment']
-        on_success = operation['on_success']
-        on_error = operation['on_error']
+    def _prepare_sweep(self, operation):
+        """Return (checkpoint, courses, deadline) for a queued sweep or the continuation of a paused one"""
+        if 'continuation' in operation:
+            return operation['continuation']['sweep']
         
-        success, students_missing, error_message = self.scraper.process_assignment(selected_assignment)
+        checkpoint = SweepCheckpoint(self.sweep_checkpoint_path())
+        if not operation['resume']:
+            checkpoint.clear()
+        with self.state_manager.browser_lock:
+            courses = list(self.state_manager.courses)
         
-        if success:
-            with self.state_manager.browser_lock:
-                self.state_manager.students_missing = students_missing
-            self.ui_callback(0, on_success, students_missing)
-        else:
-            self.ui_callback(0, on_error, error_message)
+        deadline = None
+        if self.settings.sweep_time_limit:
+            deadline = time.monotonic() + self.settings.sweep_time_limit
+        return checkpoint, courses, deadline
+    
+    def _sweep_should_pause(self):
+        """Return True if a login, click or scan is waiting for the page a sweep holds"""
+        return self.browser_queue.has_waiting_before(OperationScheduler.PRIORITIES['sweep'])
+    
+    def _finish_sweep(self, operation, success, summary, error_message, exporter, sweep):
+        """
+        Deliver a sweep's summary, or queue the rest of a paused sweep behind the waiting operations
+        
+        A sweep can run for hours on the only page of the pool, so it steps
+        aside between assignments whenever a user operation is waiting and
+        continues, with the same callbacks, once that has run.
+        
+        Args:
+            operation: The sweep operation (or continuation) that ran
+            success, summary, error_message: Result of PortalScraper.sweep
+            exporter: ReportExporter the sweep wrote to, or None
+            sweep: (checkpoint, courses, deadline) the sweep ran with
+        """
+        continuation = operation.get('continuation')
+        if continuation:
+            for key in ("checked", "unchanged", "skipped", "failed"):
+                summary[key] += continuation['summary'][key]
+        summary['reports'] = exporter.paths if exporter else []
+        
+        checkpoint, courses, deadline = sweep
+        if success and summary['paused'] is not None:
+            remaining = courses[summary['paused']:]
+            print(f"[DEBUG] Sweep paused for waiting operations, continuing at {remaining[0]['name']}")
+            # Completed first: a sweep still running would absorb the continuation
+            for on_success, on_error in self.browser_queue.complete(operation):
+                self.browser_queue.put({
+                    'type': 'sweep',
+                    'resume': True,
+                    'on_result': operation['on_result'],
+                    'on_success': on_success,
+                    'on_error': on_error,
+                    'continuation': {'sweep': (checkpoint, remaining, deadline), 'summary': summary}
+                })
+            return
+        
+        if success and not summary['stopped']:
+            checkpoint.clear()
+        self._deliver(operation, success, summary, error_message)
+    
+    def _batch_callback(self, operation):
+        """Wrap an operation's on_batch so batches stop once it is superseded"""
+        on_batch = operation.get('on_batch')
+        if on_batch is None:
+            return None
+        
+        def deliver_batch(batch):
+            if not operation.get('superseded'):
+                on_batch(batch)
+        return deliver_batch
+    
+    def _scan_history(self):
+        """Return the logged-in user's ScanHistory, or None when there is no result cache"""
+        if self.result_cache is None:
+            return None
+        with self.state_manager.browser_lock:
+            username = self.state_manager.username
+        return ScanHistory(self.result_cache, username, self.settings.history_max_age)
+    
+    def _deliver(self, operation, success, result, error_message):
+        """
+        Schedule the success or error callbacks of everyone waiting for the operation
+        
+        A superseded operation has no waiters left, so its result is dropped.
+        """
+        waiters = self.browser_queue.complete(operation)
+        if not waiters:
+            print(f"[DEBUG] Dropping result of superseded {operation.get('type')}")
+        for on_success, on_error in waiters:
+            if success:
+                self.ui_callback(0, self._traced_callback(operation, on_success), result)
+            else:
+                self.ui_callback(0, self._traced_callback(operation, on_error), error_message)
+    
+    def _trace_queue_wait(self, operation):
+        """Record how long an operation waited in the queue before a page picked it up"""
+        started = time.perf_counter()
+        self.tracer.add(f"queue wait {operation.get('type')}", operation.get('queued_at', started), started, "queue")
+    
+    def _traced_callback(self, operation, callback):
+        """Wrap a result callback so the delay until the UI runs it is recorded"""
+        if not self.tracer.enabled or callback is None:
+            return callback
+        scheduled = time.perf_counter()
+        name = f"ui callback {operation.get('type')}"
+        
+        def traced(*args):
+            self.tracer.add(name, scheduled, time.perf_counter(), "ui")
+            return callback(*args)
+        return traced
+    
+    def trace_summary(self):
+        """Report p50/p95 per traced step (see Tracer.summary); empty when tracing is off"""
+        return self.tracer.summary()
+    
+    def export_trace(self):
+        """
+        Log the trace summary and write the spans as a Chrome trace
+        
+        Returns:
+            str: Path of the trace file, or None if tracing is off or it could not be written
+        """
+        if not self.tracer.enabled:
+            return None
+        print(self.tracer.format_summary())
+        path = os.path.join(self.settings.data_dir, "traces", f"trace-{time.strftime('%Y%m%d-%H%M%S')}.json")
+        try:
+            self.tracer.export_chrome(path)
+        except OSError as e:
+            print(f"Error writing trace: {type(e).__name__}: {e}")
+            return None
+        print(f"[DEBUG] Trace written to {path}")
+        return path
     
     def shutdown(self):
-        """Signal browser worker to shutdown"""
+        """Signal browser workers (and those of added accounts) to shutdown"""
+        self._close_accounts()
+        self.sweep_cancel_event.set()
+        with self._pool_lock:
+            worker_threads = list(self._worker_threads)
+        
         if self.browser_queue:
             try:
-                self.browser_queue.put(None)  # Shutdown signal
+                for _ in worker_threads:
+                    self.browser_queue.put(None)  # Shutdown signal
             except:
                 pass
         
-        # Wait for browser thread to finish (with timeout)
-        if self.browser_thread and self.browser_thread.is_alive():
-            self.browser_thread.join(timeout=2.0)
+        # Wait for pool pages, then the browser thread, to finish (with timeout)
+        for thread in reversed(worker_threads):
+            if thread.is_alive():
+                thread.join(timeout=2.0)
         
         # Fallback cleanup
         if hasattr(self.state_manager, 'browser') and self.state_manager.browser:
@@ -229,23 +852,42 @@ class BrowserManager:
             self.state_manager.page = None
     
     def reset(self):
-        """Reset browser manager for new session"""
-        old_thread = self.browser_thread
+        """
+        Reset browser manager for new session
+        
+        This restarts the browser, so added accounts are closed as well; use
+        remove_account to sign out a single added account.
+        """
+        with self._pool_lock:
+            old_accounts = self._accounts
+            self._accounts = []
+        self.prefetcher.clear()
+        self.sweep_cancel_event.set()
+        self.sweep_cancel_event = threading.Event()
+        self.ready = threading.Event()
+        self.startup_error = None
+        with self._pool_lock:
+            old_threads = list(self._worker_threads)
+            self._worker_threads = []
         old_queue = self.browser_queue
         
         # Create new queue
-        self.browser_queue = Queue()
+        self.browser_queue = OperationScheduler()
         self.browser_thread = None
         
-        # Cleanup old thread in background
+        # Cleanup old threads in background
         def cleanup_async():
+            for account in old_accounts:
+                account.shutdown()
             if old_queue:
                 try:
-                    old_queue.put(None)  # Shutdown signal
+                    for _ in old_threads:
+                        old_queue.put(None)  # Shutdown signal
                 except:
                     pass
-            if old_thread and old_thread.is_alive():
-                old_thread.join(timeout=2.0)
+            for old_thread in reversed(old_threads):
+                if old_thread.is_alive():
+                    old_thread.join(timeout=2.0)
             if hasattr(self.state_manager, 'browser') and self.state_manager.browser:
                 try:
                     self.state_manager.browser.close()
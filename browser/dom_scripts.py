@@ -0,0 +1,104 @@
+"""In-page JavaScript evaluated by the scraper in a single Playwright round trip"""
+
+# Every row of table#submissionList as a {headers attribute: innerText} dict.
+# Mirrors the per-row query_selector/inner_text loop: only the first cell for
+# each header is kept and rows without any header cells are dropped.
+SUBMISSION_ROWS = """
+() => {
+    const table = document.querySelector('table#submissionList');
+    if (!table) {
+        return [];
+    }
+    const rows = [];
+    for (const row of table.querySelectorAll('tr')) {
+        const cells = {};
+        for (const td of row.querySelectorAll('td[headers]')) {
+            const key = td.getAttribute('headers');
+            if (!(key in cells)) {
+                cells[key] = td.innerText;
+            }
+        }
+        if (Object.keys(cells).length > 0) {
+            rows.push(cells);
+        }
+    }
+    return rows;
+}
+"""
+
+# One entry per Assignments-tool cell holding an asnActionLink: the assignment
+# name, the href of its "Grade" link (matched like the old
+# normalize-space(text())="Grade" XPath) and the text of every cell in the
+# surrounding row keyed by its headers attribute.
+ASSIGNMENT_ROWS = """
+() => {
+    const normalize = (text) => text.replace(/\\s+/g, ' ').trim();
+    const ownText = (el) => Array.from(el.childNodes)
+        .filter((node) => node.nodeType === Node.TEXT_NODE)
+        .map((node) => node.textContent)
+        .join('');
+    const result = [];
+    for (const td of document.querySelectorAll('td')) {
+        const anchor = td.querySelector(':scope > strong > a[name="asnActionLink"]');
+        if (!anchor) {
+            continue;
+        }
+        let gradeHref = null;
+        for (const el of td.querySelectorAll('*')) {
+            if (normalize(ownText(el)) === 'Grade') {
+                const link = el.closest('a');
+                gradeHref = link ? link.href : '';
+                break;
+            }
+        }
+        const columns = {};
+        const row = td.closest('tr');
+        if (row) {
+            for (const cell of row.querySelectorAll('td[headers]')) {
+                const key = cell.getAttribute('headers');
+                if (!(key in columns)) {
+                    columns[key] = cell.innerText;
+                }
+            }
+        }
+        result.push({name: anchor.innerText, grade_href: gradeHref, columns: columns});
+    }
+    return result;
+}
+"""
+
+# href of the link around each element matched by PortalScraper.GRADE_LINK_SELECTOR,
+# resolved like ASSIGNMENT_ROWS resolves grade_href
+GRADE_LINK_HREFS = """
+(elements) => elements.map((el) => {
+    const link = el.closest('a');
+    return link ? link.href : '';
+})
+"""
+
+# Name and site URL of every course tile on the course list page
+COURSE_LINKS = """
+() => Array.from(document.querySelectorAll('.link-container'), (el) => {
+    const link = el.closest('a[href]') || el.querySelector('a[href]');
+    return {name: el.innerText, href: link ? link.href : null};
+})
+"""
+
+# Current and largest page size offered by the pager of the grading table,
+# or null when the table is not paginated
+PAGE_SIZE_CHOICE = """
+() => {
+    const select = document.querySelector('select[name="selectPageSize"]');
+    if (!select) {
+        return null;
+    }
+    let largest = null;
+    for (const option of select.options) {
+        const size = parseInt(option.value, 10);
+        if (!isNaN(size) && (largest === null || size > parseInt(largest, 10))) {
+            largest = option.value;
+        }
+    }
+    return largest === null ? null : {selected: select.value, largest: largest};
+}
+"""
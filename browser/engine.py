@@ -0,0 +1,28 @@
+"""Selects the browser engine configured in Settings"""
+from browser.browser_manager import BrowserManager
+from utils.settings import Settings
+
+
+def create_browser_manager(state_manager, ui_callback, settings=None, result_cache=None):
+    """
+    Create the browser manager for the configured engine
+    
+    Args:
+        state_manager: Object with browser_lock, browser, page, etc.
+        ui_callback: Function to safely schedule UI updates (safe_after wrapper)
+        settings: Settings instance (defaults to one read from the environment)
+        result_cache: Optional ResultCache passed on to the manager
+        
+    Returns:
+        BrowserManager: The threaded engine, or AsyncBrowserManager when
+                        settings.engine is "async" or several accounts are
+                        to share the browser (settings.multi_account)
+    """
+    settings = settings or Settings()
+    if settings.multi_account and settings.engine != "async":
+        print("[DEBUG] CHECKMARKS_MULTI_ACCOUNT needs the async engine; using it")
+    if settings.engine == "async" or settings.multi_account:
+        # Imported lazily so the default engine never loads the async scraper
+        from browser.async_browser_manager import AsyncBrowserManager
+        return AsyncBrowserManager(state_manager, ui_callback, settings, result_cache)
+    return BrowserManager(state_manager, ui_callback, settings, result_cache)
@@ -0,0 +1,195 @@
+"""Priority queue of browser operations with latest-wins and de-duplication"""
+import heapq
+import itertools
+import threading
+import time
+from queue import Empty
+from utils.result_cache import course_key
+
+
+class OperationScheduler:
+    """
+    Drop-in replacement for the FIFO operation Queue of BrowserManager
+
+    - Operations run in priority order (lower first), FIFO within a priority.
+    - A new fetch_assignments or process_assignment supersedes every queued
+      or running one of the same type: queued ones are dropped and running
+      ones lose their callbacks, so only the latest click reaches the GUI.
+    - An operation identical to one already queued or running is not queued
+      again; its callbacks are attached to the existing one instead.
+
+    Callbacks live in operation['waiters'] as (on_success, on_error) pairs
+    and are handed out once by complete().
+    """
+
+    # Lower runs first; None (shutdown) goes before everything and idle-time
+    # prefetch after everything
+    PRIORITIES = {
+        'login': 0,
+        'fetch_assignments': 1,
+        'process_assignment': 1,
+        'scan_course': 2,
+        'sweep': 3,
+        'prefetch': 4,
+    }
+    BACKGROUND_PRIORITY = 3
+    SHUTDOWN_PRIORITY = -1
+
+    # Operation types where only the latest request matters
+    LATEST_WINS = ('fetch_assignments', 'process_assignment')
+
+    def __init__(self):
+        self._cond = threading.Condition()
+        self._heap = []  # (priority, sequence, operation)
+        self._sequence = itertools.count()
+        self._queued = []  # operations in the heap that have not been dropped
+        self._running = []
+        self.superseded = 0
+        self.coalesced = 0
+
+    def put(self, operation, block=True, timeout=None):
+        """Queue an operation (None asks one worker to shut down)"""
+        with self._cond:
+            if operation is None:
+                heapq.heappush(self._heap, (self.SHUTDOWN_PRIORITY, next(self._sequence), None))
+                self._cond.notify()
+                return
+
+            operation['waiters'] = [(operation.get('on_success'), operation.get('on_error'))]
+            operation['queued_at'] = time.perf_counter()
+            op_type = operation.get('type')
+            key = operation_key(operation)
+
+            if op_type in self.LATEST_WINS:
+                self._supersede(op_type, key)
+
+            if key is not None:
+                for other in self._queued + self._running:
+                    if other.get('type') == op_type and operation_key(other) == key:
+                        other['waiters'].extend(operation['waiters'])
+                        other['superseded'] = False
+                        self.coalesced += 1
+                        print(f"[DEBUG] Coalesced {op_type} into an identical request")
+                        return
+
+            priority = operation.get('priority', self.PRIORITIES.get(op_type, self.BACKGROUND_PRIORITY))
+            heapq.heappush(self._heap, (priority, next(self._sequence), operation))
+            self._queued.append(operation)
+            self._cond.notify()
+
+    def _supersede(self, op_type, key):
+        """Drop queued and silence running operations of op_type for anything but key"""
+        for other in list(self._queued):
+            if other.get('type') == op_type and operation_key(other) != key:
+                _remove(self._queued, other)
+                other['superseded'] = True
+                self.superseded += 1
+        for other in self._running:
+            if other.get('type') == op_type and operation_key(other) != key and other['waiters']:
+                other['waiters'] = []
+                other['superseded'] = True
+                self.superseded += 1
+
+    def get(self, block=True, timeout=None):
+        """
+        Take the highest-priority operation
+
+        Raises:
+            Empty: If nothing is queued (immediately when block is False,
+                   otherwise once timeout seconds have passed)
+        """
+        deadline = None if timeout is None else time.monotonic() + timeout
+        with self._cond:
+            while True:
+                while self._heap:
+                    _, _, operation = heapq.heappop(self._heap)
+                    if operation is None:
+                        return None
+                    if operation.get('superseded'):
+                        continue
+                    _remove(self._queued, operation)
+                    self._running.append(operation)
+                    return operation
+
+                if not block:
+                    raise Empty
+                if deadline is None:
+                    self._cond.wait()
+                else:
+                    remaining = deadline - time.monotonic()
+                    if remaining <= 0:
+                        raise Empty
+                    self._cond.wait(remaining)
+
+    def get_nowait(self):
+        """Take the highest-priority operation without waiting"""
+        return self.get(block=False)
+
+    def complete(self, operation):
+        """
+        Mark an operation finished and return the callbacks still waiting for it
+
+        Returns:
+            list: (on_success, on_error) pairs; empty if it was superseded
+        """
+        with self._cond:
+            _remove(self._running, operation)
+            waiters = operation.get('waiters', [])
+            operation['waiters'] = []
+            return waiters
+
+    def task_done(self, operation=None):
+        """Forget a finished operation (a no-op for None, kept for Queue compatibility)"""
+        if operation is not None:
+            with self._cond:
+                _remove(self._running, operation)
+
+    def has_waiting_before(self, priority):
+        """Return True if an operation that runs before priority is waiting (shutdown aside)"""
+        with self._cond:
+            return any(
+                queued_priority < priority
+                for queued_priority, _, operation in self._heap
+                if operation is not None and not operation.get('superseded')
+            )
+
+    def qsize(self):
+        """Return the number of operations waiting to run"""
+        with self._cond:
+            return len(self._queued)
+
+    def empty(self):
+        """Return True if no operation is waiting"""
+        return self.qsize() == 0
+
+    def stats(self):
+        """Report queued and running operations and how many requests were superseded or coalesced"""
+        with self._cond:
+            return {
+                'queued': len(self._queued),
+                'running': len(self._running),
+                'superseded': self.superseded,
+                'coalesced': self.coalesced
+            }
+
+
+def operation_key(operation):
+    """Return what an operation asks for, or None if it is never de-duplicated"""
+    op_type = operation.get('type')
+    if op_type == 'fetch_assignments':
+        return course_key(operation['course'])
+    if op_type == 'scan_course':
+        return course_key(operation['course']), tuple(operation.get('assignment_names') or ())
+    if op_type == 'process_assignment':
+        return operation['assignment']['assignment_id']
+    if op_type == 'sweep':
+        return 'sweep'
+    return None
+
+
+def _remove(operations, operation):
+    """Remove operation from a list by identity (distinct requests may compare equal)"""
+    for i, other in enumerate(operations):
+        if other is operation:
+            del operations[i]
+            return
@@ -1,6 +1,27 @@
 """Portal scraping logic using Playwright"""
+import re
 import time
 import traceback
+from urllib.parse import parse_qs, urlparse
+from browser import dom_scripts
+from browser.wait_strategy import WaitStrategy
+from models.missing_marks_matrix import MissingMarksMatrix
+from utils.tracing import Tracer
+
+
+# Header ids Sakai uses for the due date and "In/New" submission counter columns;
+# "In/New" reads e.g. "12/3": 12 submissions in, 3 of them not graded yet
+DUE_DATE_HEADERS = ("dueDate", "due_date", "due")
+SUBMISSION_COUNT_HEADERS = ("num_submissions", "submissions", "numSubmissions")
+
+_COUNTS_PATTERN = re.compile(r"^(\d+)\s*/\s*(\d+)$")
+
+# Sakai prints the student id in brackets after the name, e.g. "Khan, Ali (25100123)"
+_STUDENT_ID_PATTERN = re.compile(r"\(([^()]+)\)\s*$")
+
+
+class Preempted(Exception):
+    """Raised between page loads when a prefetch gives way to a waiting user operation"""
 
 
 class PortalScraper:
@@ -8,7 +29,22 @@ class PortalScraper:
     
     LOGIN_URL = "https://lms.lums.edu.pk/"
     
-    def __init__(self, page, state_manager, ui_callback):
+    # Sakai entity endpoint describing the current session (relative to LOGIN_URL)
+    SESSION_CHECK_PATH = "direct/session/current.json"
+    
+    # Statuses that do not count as missing marks
+    GRADED_OR_EMPTY_STATUSES = ("Returned", "No Submission - Not Started")
+    
+    # Selectors identifying the pages the scraper navigates between
+    GRADING_TABLE_SELECTOR = "table#submissionList"
+    GRADE_LINK_SELECTOR = 'td:has(> strong > a[name="asnActionLink"]) >> xpath=.//*[normalize-space(text())="Grade"]'
+    
+    # Pager of the grading table; a page that adds no new students also ends the walk
+    PAGE_SIZE_SELECTOR = 'select[name="selectPageSize"]'
+    NEXT_PAGE_SELECTOR = 'input[name="eventSubmit_doList_next"]:not([disabled])'
+    MAX_TABLE_PAGES = 200
+    
+    def __init__(self, page, state_manager, ui_callback, waits=None, tracer=None):
         """
         Initialize scraper
         
@@ -16,10 +52,38 @@ class PortalScraper:
             page: Playwright page object
             state_manager: Object with browser_lock, courses, assignments, etc.
             ui_callback: Function to call for UI updates (safe_after wrapper)
+            waits: WaitStrategy deciding how each navigation step waits for its
+                   page (shared between scrapers so timings are pooled)
+            tracer: Optional Tracer receiving a span per navigation step and
+                    in-page extraction
         """
         self.page = page
         self.state_manager = state_manager
         self.ui_callback = ui_callback
+        self.waits = waits or WaitStrategy()
+        self.tracer = tracer or Tracer(enabled=False)
+        
+        # Running totals of grading tables read by this scraper
+        self.table_stats = {"tables": 0, "pages": 0, "rows": 0, "duplicates": 0}
+        
+        # Set while a prefetch runs (see prefetch and _before_page_load)
+        self._should_stop = None
+    
+    def open_login_page(self):
+        """
+        Navigate to the login form ahead of time so login can fill it straight away
+        
+        Failures are only logged; login navigates again if the form is not there.
+        """
+        try:
+            with self.tracer.span("goto login page"):
+                self.page.goto(self.LOGIN_URL, timeout=30000)
+        except Exception as e:
+            print(f"Warning: Could not open login page in advance: {type(e).__name__}: {e}")
+    
+    def _on_login_page(self):
+        """Return True if the page already shows the login form"""
+        return self.page.url.startswith(self.LOGIN_URL) and self.page.query_selector('input[name="eid"]') is not None
     
     def login(self, username, password, status_callback):
         """
@@ -37,45 +101,18 @@ class PortalScraper:
             print("[DEBUG] _do_login: Opening browser...")
             self.ui_callback(0, status_callback, "Connecting to server...")
             
-            self.page.goto(self.LOGIN_URL, timeout=30000)
+            if not self._on_login_page():
+                with self.tracer.span("goto login page"):
+                    self.page.goto(self.LOGIN_URL, timeout=30000)
 
             print("[DEBUG] _do_login: Entering credentials...")
             self.ui_callback(0, status_callback, "Entering credentials...")
-            
-            self.page.fill('input[name="eid"]', username)
-            self.page.fill('input[name="pw"]', password)
-            self.page.click('input[type="submit"]')
-            self.page.wait_for_load_state("networkidle")
-
-            # Check if login was successful by verifying login form fields are gone
-            eid_input = self.page.query_selector('input[name="eid"]')
-            pw_input = self.page.query_selector('input[name="pw"]')
-            
-            if eid_input is not None or pw_input is not None:
-                # Login fields still exist - login failed
-                raise Exception("Login failed: Invalid credentials")
+            self._submit_login(username, password)
 
             print("[DEBUG] _do_login: Login successful! Fetching courses...")
             self.ui_callback(0, status_callback, "Fetching courses...")
-            time.sleep(0.5)
-            
-            # Fetch courses
-            course_elements = self.page.query_selector_all(".link-container")
-            courses = []
-            for element in course_elements:
-                name = element.inner_text().strip()
-                if name:
-                    courses.append({"name": name, "index": len(courses)})
-            
-            # Store course list URL
-            course_list_url = self.page.url
-            
-            # Update state
-            with self.state_manager.browser_lock:
-                self.state_manager.browser_ready = True
-                self.state_manager.courses = courses
-                self.state_manager.course_list_url = course_list_url
             
+            courses, course_list_url = self._read_course_list(username)
             return True, courses, course_list_url, None
             
         except Exception as e:
@@ -91,6 +128,115 @@ class PortalScraper:
             
             return False, [], "", error_type
     
+    def sign_in(self, username, password):
+        """
+        Log this page into a Sakai session of its own, leaving the shared state alone
+        
+        Pool pages each sign in like this after the first login, because
+        Sakai keeps pager and tool state per session and pages sharing a
+        session would move each other's grading tables.
+        
+        Returns:
+            bool: True if the login form was accepted
+        """
+        try:
+            if not self._on_login_page():
+                with self.tracer.span("goto login page"):
+                    self.page.goto(self.LOGIN_URL, timeout=30000)
+            self._submit_login(username, password)
+            return True
+        except Exception as e:
+            print(f"ERROR in sign_in: {type(e).__name__}: {e}")
+            return False
+    
+    def _submit_login(self, username, password):
+        """Fill in and submit the login form, raising if Sakai rejects it"""
+        with self.tracer.span("submit login"):
+            self.page.fill('input[name="eid"]', username)
+            self.page.fill('input[name="pw"]', password)
+            self.page.click('input[type="submit"]')
+        self.waits.wait(self.page, "login_result")
+
+        # Check if login was successful by verifying login form fields are gone
+        eid_input = self.page.query_selector('input[name="eid"]')
+        pw_input = self.page.query_selector('input[name="pw"]')
+        
+        if eid_input is not None or pw_input is not None:
+            # Login fields still exist - login failed
+            raise Exception("Login failed: Invalid credentials")
+    
+    def resume_session(self, username, storage_state, status_callback):
+        """
+        Log in by restoring a saved browser session instead of the login form
+        
+        The saved cookies are validated with a single request to Sakai's
+        current-session endpoint before any page is rendered.
+        
+        Args:
+            username: Username the session was saved for
+            storage_state: Playwright storage state saved after an earlier login
+            status_callback: Function to update login status messages
+            
+        Returns:
+            tuple: (success: bool, courses: list, course_list_url: str, error_type: str)
+                   success is False when the session has expired
+        """
+        try:
+            print("[DEBUG] resume_session: Checking saved session...")
+            self.ui_callback(0, status_callback, "Restoring session...")
+            
+            context = self.page.context
+            context.add_cookies(storage_state.get("cookies", []))
+            
+            response = self.page.request.get(self.LOGIN_URL + self.SESSION_CHECK_PATH, timeout=10000)
+            session = response.json() if response.ok else {}
+            if (session.get("userEid") or "").lower() != username.lower():
+                print("[DEBUG] resume_session: Saved session has expired")
+                context.clear_cookies()
+                return False, [], "", "expired"
+            
+            with self.tracer.span("goto login page"):
+                self.page.goto(self.LOGIN_URL, timeout=30000)
+            self.waits.wait(self.page, "course_list")
+            
+            print("[DEBUG] resume_session: Session restored! Fetching courses...")
+            self.ui_callback(0, status_callback, "Fetching courses...")
+            
+            courses, course_list_url = self._read_course_list(username)
+            return True, courses, course_list_url, None
+            
+        except Exception as e:
+            print(f"[DEBUG] resume_session failed: {type(e).__name__}: {e}")
+            try:
+                self.page.context.clear_cookies()
+            except Exception:
+                pass
+            return False, [], "", "expired"
+    
+    def _read_course_list(self, username):
+        """Read the courses from the logged-in portal page and store them in state"""
+        # Fetch courses along with their site URLs for deep-linking later
+        courses = []
+        with self.tracer.span("extract course list", "extract"):
+            links = self.page.evaluate(dom_scripts.COURSE_LINKS)
+        for link in links:
+            name = link["name"].strip()
+            if name:
+                courses.append({"name": name, "index": len(courses), "url": link["href"]})
+        
+        # Store course list URL
+        course_list_url = self.page.url
+        
+        # Update state
+        with self.state_manager.browser_lock:
+            self.state_manager.browser_ready = True
+            self.state_manager.username = username
+            self.state_manager.courses = courses
+            self.state_manager.course_list_url = course_list_url
+            self.state_manager.assignments_tool_urls = {}
+        
+        return courses, course_list_url
+    
     def fetch_assignments(self, selected_course):
         """
         Fetch assignments for a selected course
@@ -104,56 +250,8 @@ class PortalScraper:
         try:
             print(f"[DEBUG] fetch_assignments started")
             
-            # Navigate back to course list if we're not already there
-            current_url = self.page.url
-            with self.state_manager.browser_lock:
-                course_list_url = self.state_manager.course_list_url
-            
-            if course_list_url not in current_url:
-                self.page.goto(course_list_url)
-            self.page.wait_for_load_state("networkidle")
-
-            # Re-fetch course elements
-            course_elements = self.page.query_selector_all(".link-container")
-            course_index = selected_course["index"]
-            
-            if course_index < len(course_elements):
-                course_elements[course_index].click()
-                self.page.wait_for_load_state("networkidle")
-            else:
-                raise Exception(f"Course element at index {course_index} not found")
-            
-            # Click on Assignments section
-            assignment_div = self.page.get_by_text("Assignments", exact=True)
-            assignment_div.wait_for(state="visible")
-            assignment_div.click()
-            self.page.wait_for_load_state("networkidle")
-                    
-            # Fetch assignment elements
-            row_elems = self.page.query_selector_all('td:has(> strong > a[name="asnActionLink"])')
-            assignment_elements = []
-            grades_elements = []
-                    
-            for td in row_elems:
-                anchors = td.query_selector_all('strong > a[name="asnActionLink"]')
-                grades = td.query_selector_all('xpath=.//*[normalize-space(text())="Grade"]')
-                assignment_elements.extend(anchors)
-                grades_elements.extend(grades)
-            
-            assignments = []
-            for i, element in enumerate(assignment_elements):
-                name = element.inner_text().strip()
-                if name and i < len(grades_elements):
-                    assignments.append({
-                        "name": name,
-                        "index": len(assignments),
-                        "grade_element_index": i
-                    })
-            
-            # Store assignments
-            with self.state_manager.browser_lock:
-                self.state_manager.assignments = assignments
-            
+            # The GUI stores the list itself, and only if the result is still wanted
+            assignments = self._load_assignment_list(selected_course["index"])
             return True, assignments, None
             
         except Exception as e:
@@ -161,12 +259,15 @@ class PortalScraper:
             traceback.print_exc()
             return False, [], str(e)
     
-    def process_assignment(self, selected_assignment):
+    def process_assignment(self, selected_assignment, on_batch=None):
         """
         Process an assignment and find students with missing grades
         
         Args:
             selected_assignment: Dict with assignment info including "index"
+                                 and, when known, "grade_url"
+            on_batch: Optional callback(students_missing) scheduled through
+                      ui_callback for each grading page as soon as it is read
             
         Returns:
             tuple: (success: bool, students_missing: list, error_message: str)
@@ -174,77 +275,586 @@ class PortalScraper:
         try:
             print(f"[DEBUG] process_assignment started")
             
-            # Check if we're on a submission page (from a previous assignment)
-            submission_table = self.page.query_selector("table#submissionList")
-            if submission_table:
-                # We're on a submission page, need to go back to assignments
-                print("[DEBUG] On submission page, navigating back to assignments")
-                btn_assgn = self.page.query_selector('li.firstToolBarItem span a')
-                if btn_assgn:
-                    btn_assgn.click()
-                    self.page.wait_for_load_state("networkidle")
-            
-            # Ensure we're on the assignments page
-            assignment_span = self.page.query_selector('span.Mrphs-toolTitleNav__text')
-            is_on_assignments_page = assignment_span and "Assignments" in assignment_span.inner_text()
-            
-            if not is_on_assignments_page:
-                # Not on assignments page, need to navigate back
-                print("[DEBUG] Not on assignments page, navigating...")
-                with self.state_manager.browser_lock:
-                    current_course_index = self.state_manager.current_course_index
-                    course_list_url = self.state_manager.course_list_url
-                
-                current_url = self.page.url
-                if course_list_url not in current_url:
-                    self.page.goto(course_list_url)
-                    self.page.wait_for_load_state("networkidle")
-                
-                course_elements = self.page.query_selector_all(".link-container")
-                if current_course_index is not None and current_course_index < len(course_elements):
-                    course_elements[current_course_index].click()
-                    self.page.wait_for_load_state("networkidle")
+            with self.state_manager.browser_lock:
+                current_course_index = self.state_manager.current_course_index
+            students_missing = self._find_students_missing(selected_assignment, current_course_index, on_batch)
+            
+            return True, students_missing, None
+            
+        except Exception as e:
+            print(f"ERROR in process_assignment: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            return False, [], str(e)
+    
+    def scan_course(self, selected_course, on_progress=None, history=None, assignment_names=None,
+                    exporter=None):
+        """
+        Process every assignment of a course in one run
+        
+        The assignment list is read once and each grading page is then opened
+        within the same course site, instead of starting again from the course
+        list for every assignment. An assignment that fails is recorded in the
+        matrix and the scan moves on to the next one.
+        
+        Args:
+            selected_course: Dict with course info including "index" and "name"
+            on_progress: Optional callback(done, total, assignment_name),
+                         scheduled through ui_callback after each assignment
+            history: Optional ScanHistory; assignments whose In/New
+                     counters have not moved since the last check reuse
+                     its stored result
+            assignment_names: Optional list of names; only assignments whose
+                              name contains one of them (ignoring case) are checked
+            exporter: Optional ReportExporter each assignment's result is written to
+            
+        Returns:
+            tuple: (success: bool, matrix: MissingMarksMatrix, error_message: str)
+        """
+        matrix = MissingMarksMatrix(selected_course["name"])
+        try:
+            print(f"[DEBUG] scan_course started")
+            
+            course_index = selected_course["index"]
+            assignments = filter_assignments(self._load_assignment_list(course_index), assignment_names)
+            
+            for done, assignment in enumerate(assignments, start=1):
+                try:
+                    students_missing, reused = self._check_assignment(selected_course, assignment, history)
+                    matrix.add_assignment(assignment["name"], students_missing, reused)
+                    if exporter:
+                        exporter.write_assignment(selected_course["name"], assignment["name"], students_missing)
+                except Exception as e:
+                    print(f"ERROR in scan_course ({assignment['name']}): {type(e).__name__}: {e}")
+                    traceback.print_exc()
+                    matrix.add_failure(assignment["name"], str(e))
+                    if exporter:
+                        exporter.write_assignment(selected_course["name"], assignment["name"], [], str(e))
                 
-                assignment_div = self.page.get_by_text("Assignments", exact=True)
-                assignment_div.wait_for(state="visible")
-                assignment_div.click()
-                self.page.wait_for_load_state("networkidle")
-
-            # Re-fetch assignment grade elements (handles may be stale)
-            row_elems = self.page.query_selector_all('td:has(> strong > a[name="asnActionLink"])')
-            grades_elements = []
-            for td in row_elems:
-                grades = td.query_selector_all('xpath=.//*[normalize-space(text())="Grade"]')
-                grades_elements.extend(grades)
-            
-            # Click on Grade button for the selected assignment
-            assignment_index = selected_assignment["index"]
-            if assignment_index < len(grades_elements):
-                grades_elements[assignment_index].click()
-                self.page.wait_for_load_state("networkidle")
-            else:
-                raise Exception(f"Grade element at index {assignment_index} not found")
+                if on_progress:
+                    self.ui_callback(0, on_progress, done, len(assignments), assignment["name"])
+            
+            return True, matrix, None
             
-            # Find students without marks
-            table = self.page.query_selector("table#submissionList")
-            rows = table.query_selector_all("tr") if table else []
+        except Exception as e:
+            print(f"ERROR in scan_course: {type(e).__name__}: {e}")
+            traceback.print_exc()
+            return False, matrix, str(e)
+    
+    def sweep(self, courses, checkpoint, on_result, deadline=None, cancel_event=None, history=None,
+              exporter=None, should_pause=None):
+        """
+        Check every assignment of every course, streaming each result
         
-            students_missing = []
-            for row in rows:
-                status_elem = row.query_selector('td[headers="status"]')
-                student_elem = row.query_selector('td[headers="studentname"]')
+        Nothing is accumulated here: every finished assignment is handed to
+        on_result through ui_callback and recorded in the checkpoint, so an
+        interrupted sweep picks up where it stopped.
+        
+        Args:
+            courses: Course dicts (as returned by login) to walk through
+            checkpoint: SweepCheckpoint of assignments already finished
+            on_result: Callback(course_name, assignment_name, students_missing, error_message)
+                       scheduled once per assignment (error_message is None on success)
+            deadline: Optional time.monotonic() value after which the sweep stops
+            cancel_event: Optional threading.Event that stops the sweep when set
+            history: Optional ScanHistory; assignments whose In/New
+                     counters have not moved since the last check reuse
+                     its stored result
+            exporter: Optional ReportExporter each assignment's result is written to
+            should_pause: Optional callable asked between assignments; when it
+                          returns True the sweep steps aside for other work
+            
+        Returns:
+            tuple: (success: bool, summary: dict, error_message: str)
+                   summary counts "checked", "skipped" and "failed" assignments,
+                   "unchanged" counts the checked ones answered from history,
+                   "stopped" is set when the deadline or a cancel ended it early,
+                   and "paused" is the position in courses to continue from
+                   when should_pause ended it early (None otherwise)
+        """
+        summary = {"checked": 0, "unchanged": 0, "skipped": 0, "failed": 0, "stopped": False, "paused": None}
+        try:
+            print(f"[DEBUG] sweep started over {len(courses)} course(s)")
+            
+            for position, course in enumerate(courses):
+                try:
+                    assignments = self._load_assignment_list(course["index"])
+                except Exception as e:
+                    print(f"ERROR in sweep ({course['name']}): {type(e).__name__}: {e}")
+                    traceback.print_exc()
+                    summary["failed"] += 1
+                    if exporter:
+                        exporter.write_assignment(course["name"], None, [], str(e))
+                    self.ui_callback(0, on_result, course["name"], None, [], str(e))
+                    continue
                 
-                if status_elem and student_elem:
-                    status = status_elem.inner_text().strip()
-                    student_name = student_elem.inner_text().strip()
+                for assignment in assignments:
+                    if checkpoint.is_done(course["name"], assignment["assignment_id"]):
+                        # Assignments this sweep finished before pausing are already counted
+                        if checkpoint.done_earlier(course["name"], assignment["assignment_id"]):
+                            summary["skipped"] += 1
+                        continue
                     
-                    # Logic: If status is not "Returned" and not "No Submission - Not Started"
-                    if status and status != "Returned" and status != "No Submission - Not Started":
-                        students_missing.append({"name": student_name, "status": status})
+                    if (cancel_event and cancel_event.is_set()) or (deadline and time.monotonic() > deadline):
+                        summary["stopped"] = True
+                        return True, summary, None
+                    
+                    if should_pause and should_pause():
+                        summary["paused"] = position
+                        return True, summary, None
+                    
+                    try:
+                        students_missing, reused = self._check_assignment(course, assignment, history)
+                    except Exception as e:
+                        print(f"ERROR in sweep ({course['name']} / {assignment['name']}): {type(e).__name__}: {e}")
+                        traceback.print_exc()
+                        summary["failed"] += 1
+                        if exporter:
+                            exporter.write_assignment(course["name"], assignment["name"], [], str(e))
+                        self.ui_callback(0, on_result, course["name"], assignment["name"], [], str(e))
+                        continue
+                    
+                    summary["checked"] += 1
+                    if reused:
+                        summary["unchanged"] += 1
+                    # Written before the checkpoint, so a resumed sweep never
+                    # skips an assignment missing from the report
+                    if exporter:
+                        exporter.write_assignment(course["name"], assignment["name"], students_missing)
+                    checkpoint.mark_done(course["name"], assignment["assignment_id"])
+                    self.ui_callback(0, on_result, course["name"], assignment["name"], students_missing, None)
             
-            return True, students_missing, None
+            return True, summary, None
             
         except Exception as e:
-            print(f"ERROR in process_assignment: {type(e).__name__}: {e}")
+            print(f"ERROR in sweep: {type(e).__name__}: {e}")
             traceback.print_exc()
-            return False, [], str(e)
+            return False, summary, str(e)
+    
+    def prefetch(self, job, history=None, should_stop=None):
+        """
+        Read the data of a prefetch job without touching the shared state
+        
+        Args:
+            job: Prefetcher job with "course" and, for a grading table, "assignment"
+            history: Optional ScanHistory the grading result is recorded in
+            should_stop: Optional callable asked before each page load after
+                         the first; when it returns True the job is abandoned
+            
+        Returns:
+            list: The course's assignments, or the assignment's students
+                  missing marks; None if the job was abandoned
+        """
+        self._should_stop = should_stop
+        try:
+            course = job["course"]
+            if "assignment" in job:
+                return self._check_assignment(course, job["assignment"], history)[0]
+            return self._load_assignment_list(course["index"])
+        except Preempted:
+            print("[DEBUG] Prefetch abandoned for a waiting operation")
+            return None
+        finally:
+            self._should_stop = None
+    
+    def _before_page_load(self):
+        """Abandon a running prefetch here if a user operation is waiting for the page"""
+        if self._should_stop and self._should_stop():
+            raise Preempted()
+    
+    def _check_assignment(self, course, assignment, history):
+        """
+        Return an assignment's students missing marks, reusing history when its counters have not moved
+        
+        Returns:
+            tuple: (students_missing: list, reused: bool)
+        """
+        if history:
+            students_missing = history.unchanged(course, assignment)
+            if students_missing is not None:
+                print(f"[DEBUG] {assignment['name']}: counters unchanged, reusing stored result")
+                return students_missing, True
+        
+        students_missing = self._find_students_missing(assignment, course["index"])
+        if history:
+            history.record(course, assignment, students_missing)
+        return students_missing, False
+    
+    def _load_assignment_list(self, course_index):
+        """Open a course's Assignments tool and read every assignment row in one in-page pass"""
+        self._open_assignments_tool(course_index)
+        with self.tracer.span("extract assignment rows", "extract"):
+            raw_rows = self.page.evaluate(dom_scripts.ASSIGNMENT_ROWS)
+        return parse_assignment_rows(raw_rows)
+    
+    def _find_students_missing(self, selected_assignment, course_index, on_batch=None):
+        """Open an assignment's grading page and return the students missing marks"""
+        grade_url = selected_assignment.get("grade_url")
+        if not (grade_url and self._goto_deep_link(grade_url, "grading_table")):
+            self._open_grading_page_by_clicks(selected_assignment, course_index)
+        
+        # Find students without marks
+        rows = self.read_all_submission_rows(on_batch)
+        return filter_missing_students(rows)
+    
+    def _goto_deep_link(self, url, step):
+        """
+        Load a previously captured URL directly
+        
+        Args:
+            url: Page URL captured on an earlier visit
+            step: WaitStrategy step whose selector must appear for the page to count as loaded
+            
+        Returns:
+            bool: True if the page loaded and is ready for step
+        """
+        try:
+            print(f"[DEBUG] Deep-linking to {url}")
+            with self.tracer.span("goto deep link", step=step):
+                self.page.goto(url)
+            self.waits.wait(self.page, step, fallback=False)
+            return True
+        except Exception as e:
+            print(f"[DEBUG] Deep link failed, falling back to navigation: {type(e).__name__}: {e}")
+            return False
+    
+    def _open_assignments_tool(self, course_index):
+        """
+        Show the assignment list of a course
+        
+        Uses the Assignments tool URL captured on a previous visit, then the
+        course site URL, and only then clicks through the course list.
+        
+        Args:
+            course_index: Index of the course in state_manager.courses
+        """
+        with self.state_manager.browser_lock:
+            tool_url = self.state_manager.assignments_tool_urls.get(course_index)
+            courses = self.state_manager.courses
+            course_list_url = self.state_manager.course_list_url
+        course = courses[course_index] if course_index is not None and course_index < len(courses) else {}
+        
+        if tool_url and self._goto_deep_link(tool_url, "assignment_list"):
+            return
+        
+        site_url = course.get("url")
+        if not (site_url and self._goto_deep_link(site_url, "course_site")):
+            # Navigate back to course list if we're not already there
+            if course_list_url not in self.page.url:
+                with self.tracer.span("goto course list"):
+                    self.page.goto(course_list_url)
+            self.waits.wait(self.page, "course_list")
+            
+            # Re-fetch course elements
+            course_elements = self.page.query_selector_all(".link-container")
+            if course_index is not None and course_index < len(course_elements):
+                with self.tracer.span("click course"):
+                    course_elements[course_index].click()
+                self.waits.wait(self.page, "course_site")
+            else:
+                raise Exception(f"Course element at index {course_index} not found")
+        
+        # Click on Assignments section
+        self._before_page_load()
+        assignment_div = self.page.get_by_text("Assignments", exact=True)
+        assignment_div.wait_for(state="visible")
+        with self.tracer.span("click assignments tool"):
+            assignment_div.click()
+        self.waits.wait(self.page, "assignment_list")
+        
+        # Remember the tool URL so the next visit is a single page load
+        with self.state_manager.browser_lock:
+            self.state_manager.assignments_tool_urls[course_index] = self.page.url
+    
+    def _open_grading_page_by_clicks(self, selected_assignment, course_index):
+        """Reach the grading page of an assignment through the Assignments tool"""
+        # Check if we're on a submission page (from a previous assignment)
+        submission_table = self.page.query_selector(self.GRADING_TABLE_SELECTOR)
+        if submission_table:
+            # We're on a submission page, need to go back to assignments
+            print("[DEBUG] On submission page, navigating back to assignments")
+            btn_assgn = self.page.query_selector('li.firstToolBarItem span a')
+            if btn_assgn:
+                with self.tracer.span("click back to assignments"):
+                    btn_assgn.click()
+                self.waits.wait(self.page, "assignment_list")
+        
+        # Ensure we're on the assignments page
+        assignment_span = self.page.query_selector('span.Mrphs-toolTitleNav__text')
+        is_on_assignments_page = assignment_span and "Assignments" in assignment_span.inner_text()
+        
+        if not is_on_assignments_page:
+            # Not on assignments page, need to navigate back
+            print("[DEBUG] Not on assignments page, navigating...")
+            self._open_assignments_tool(course_index)
+        
+        # Click on Grade button for the selected assignment
+        grade_links = self.page.locator(self.GRADE_LINK_SELECTOR)
+        link_index = find_grade_link(grade_links.evaluate_all(dom_scripts.GRADE_LINK_HREFS), selected_assignment)
+        if link_index is None:
+            raise Exception(f"Grade link for {selected_assignment['name']} not found")
+        self._before_page_load()
+        with self.tracer.span("click grade link"):
+            grade_links.nth(link_index).click()
+        self.waits.wait(self.page, "grading_table")
+    
+    def read_submission_rows(self):
+        """
+        Read every row of the grading table on the current page
+        
+        The whole table is read by a single in-page evaluation rather than
+        one query per cell from Python.
+        
+        Returns:
+            list: One dict per row mapping each cell's "headers" attribute
+                  (e.g. "studentname", "status") to its text
+        """
+        with self.tracer.span("extract submission rows", "extract"):
+            rows = self.page.evaluate(dom_scripts.SUBMISSION_ROWS)
+        return [{key: text.strip() for key, text in row.items()} for row in rows]
+    
+    def read_all_submission_rows(self, on_batch=None):
+        """
+        Read the whole grading table, across every page of Sakai's pager
+        
+        The page that is already open is read first, so its students can be
+        streamed straight away. The table is then switched to the largest
+        page size on offer, so most sections fit on one more page, and any
+        further pages are followed with the pager's next button. Rows are
+        merged by student id.
+        
+        Args:
+            on_batch: Optional callback(students_missing) scheduled through
+                      ui_callback with the new students missing marks of each page
+            
+        Returns:
+            list: Rows as returned by read_submission_rows, one per student
+        """
+        merged = {}
+        pages = 1
+        added, duplicates = self._read_table_page(merged, on_batch)
+        self._before_page_load()
+        if self._use_largest_page_size():
+            # The larger page starts again from the first student
+            pages += 1
+            added, skipped = self._read_table_page(merged, on_batch)
+            duplicates += skipped
+        
+        while added and pages < self.MAX_TABLE_PAGES:
+            self._before_page_load()
+            if not self._next_table_page():
+                break
+            pages += 1
+            added, skipped = self._read_table_page(merged, on_batch)
+            duplicates += skipped
+        
+        self._record_table_stats(pages, len(merged), duplicates)
+        return list(merged.values())
+    
+    def _read_table_page(self, merged, on_batch):
+        """
+        Merge the grading table page on screen into merged and stream its new students
+        
+        Returns:
+            tuple: (added: int, duplicates: int)
+        """
+        new_rows, duplicates = merge_submission_rows(merged, self.read_submission_rows())
+        batch = filter_missing_students(new_rows)
+        if on_batch and batch:
+            self.ui_callback(0, on_batch, batch)
+        return len(new_rows), duplicates
+    
+    def _use_largest_page_size(self):
+        """Switch the grading table to the largest page size the pager offers; True if it changed"""
+        choice = self.page.evaluate(dom_scripts.PAGE_SIZE_CHOICE)
+        if not choice or choice["selected"] == choice["largest"]:
+            return False
+        try:
+            print(f"[DEBUG] Showing {choice['largest']} rows per grading page")
+            with self.tracer.span("select page size"):
+                with self.page.expect_navigation(timeout=15000):
+                    self.page.select_option(self.PAGE_SIZE_SELECTOR, choice["largest"])
+            self.waits.wait(self.page, "grading_table")
+            return True
+        except Exception as e:
+            # The pager walk still reaches every row, just in more pages
+            print(f"Warning: Could not change grading page size: {type(e).__name__}: {e}")
+            return False
+    
+    def _next_table_page(self):
+        """Follow the pager's next button; False if this is the last page"""
+        next_button = self.page.query_selector(self.NEXT_PAGE_SELECTOR)
+        if next_button is None:
+            return False
+        with self.tracer.span("click next page"):
+            with self.page.expect_navigation():
+                next_button.click()
+        self.waits.wait(self.page, "grading_table")
+        return True
+    
+    def _record_table_stats(self, pages, rows, duplicates):
+        """Add one grading table to the running pagination totals"""
+        self.table_stats["tables"] += 1
+        self.table_stats["pages"] += pages
+        self.table_stats["rows"] += rows
+        self.table_stats["duplicates"] += duplicates
+        print(f"[DEBUG] Grading table: {pages} page(s), {rows} student(s), {duplicates} duplicate row(s)")
+
+
+def parse_assignment_rows(raw_rows):
+    """
+    Turn the raw Assignments-tool rows into assignment dicts
+    
+    Only rows that carry a "Grade" link are kept, so "index" and
+    "grade_element_index" match the position of the Grade link on the page.
+    
+    Args:
+        raw_rows: Result of evaluating dom_scripts.ASSIGNMENT_ROWS
+        
+    Returns:
+        list: Dicts with name, index, grade_element_index, assignment_id,
+              grade_url, due_date, submitted and ungraded
+    """
+    assignments = []
+    grade_index = 0
+    for raw in raw_rows:
+        grade_href = raw.get("grade_href")
+        if grade_href is None:
+            continue
+        
+        name = raw["name"].strip()
+        columns = {key: text.strip() for key, text in raw.get("columns", {}).items()}
+        if name:
+            submitted, ungraded = _parse_submission_counts(columns)
+            assignments.append({
+                "name": name,
+                "index": len(assignments),
+                "grade_element_index": grade_index,
+                "assignment_id": _assignment_id_from_url(grade_href) or name,
+                "grade_url": grade_href if grade_href.startswith("http") else None,
+                "due_date": _first_column(columns, DUE_DATE_HEADERS),
+                "submitted": submitted,
+                "ungraded": ungraded
+            })
+        grade_index += 1
+    return assignments
+
+
+def find_grade_link(hrefs, assignment):
+    """
+    Find the position of an assignment's Grade link on the Assignments page
+    
+    The link is matched by its URL when the assignment has one, and
+    otherwise by "grade_element_index". "index" counts only named rows and
+    is not a position on the page.
+    
+    Args:
+        hrefs: href of every Grade link, as returned by dom_scripts.GRADE_LINK_HREFS
+        assignment: Assignment dict from parse_assignment_rows
+        
+    Returns:
+        int or None: Position in hrefs, or None if the link is not on the page
+    """
+    grade_url = assignment.get("grade_url")
+    if grade_url:
+        return hrefs.index(grade_url) if grade_url in hrefs else None
+    position = assignment.get("grade_element_index")
+    if position is not None and position < len(hrefs):
+        return position
+    return None
+
+
+def filter_assignments(assignments, names):
+    """Keep the assignments whose name contains one of names (ignoring case); all if names is empty"""
+    if not names:
+        return assignments
+    needles = [name.lower() for name in names]
+    return [assignment for assignment in assignments if any(needle in assignment["name"].lower() for needle in needles)]
+
+
+def _first_column(columns, headers):
+    """Return the text of the first of headers present in columns, or None"""
+    for header in headers:
+        if columns.get(header):
+            return columns[header]
+    return None
+
+
+def _parse_submission_counts(columns):
+    """Return (submitted, ungraded) from the row's "In/New" cell, or (None, None) without one"""
+    match = _COUNTS_PATTERN.match(_first_column(columns, SUBMISSION_COUNT_HEADERS) or "")
+    if not match:
+        return None, None
+    return int(match.group(1)), int(match.group(2))
+
+
+def _assignment_id_from_url(url):
+    """
+    Extract Sakai's assignment id from a Grade link, falling back to the URL
+    
+    Grade links carry the full reference (/assignment/a/<site>/<id>); only
+    the id is kept so assignments read from the page and from /direct
+    (see rest_backend) share one key in caches, histories and checkpoints.
+    """
+    if not url:
+        return None
+    query = parse_qs(urlparse(url).query)
+    for key in ("assignmentId", "assignmentReference"):
+        if query.get(key):
+            return assignment_id(query[key][0])
+    return url
+
+
+def assignment_id(reference):
+    """Return the last segment of an assignment reference such as /assignment/a/<site>/<id>"""
+    return reference.rstrip("/").rsplit("/", 1)[-1]
+
+
+def student_id(row):
+    """Return the student id from a grading table row's name cell, or the name itself"""
+    name = row.get("studentname")
+    if not name:
+        return None
+    match = _STUDENT_ID_PATTERN.search(name)
+    return match.group(1).strip() if match else name
+
+
+def merge_submission_rows(merged, rows):
+    """
+    Add grading table rows to merged (student id -> row), keeping the first row per student
+    
+    Returns:
+        tuple: (new_rows: list, duplicates: int)
+    """
+    new_rows = []
+    duplicates = 0
+    for row in rows:
+        key = student_id(row)
+        if key is None:
+            continue
+        if key in merged:
+            duplicates += 1
+        else:
+            merged[key] = row
+            new_rows.append(row)
+    return new_rows, duplicates
+
+
+def filter_missing_students(rows):
+    """
+    Pick the students whose submission has not been graded yet
+    
+    Args:
+        rows: Grading table rows as returned by PortalScraper.read_submission_rows
+        
+    Returns:
+        list: Dicts with "name" and "status" for every student missing marks
+    """
+    students_missing = []
+    for row in rows:
+        if "status" not in row or "studentname" not in row:
+            continue
+        status = row["status"]
+        # Logic: If status is not "Returned" and not "No Submission - Not Started"
+        if status and status not in PortalScraper.GRADED_OR_EMPTY_STATUSES:
+            students_missing.append({"name": row["studentname"], "status": status})
+    return students_missing
@@ -0,0 +1,155 @@
+"""Idle-time prefetching of the courses and assignments the user is likely to open next"""
+import threading
+import time
+from collections import deque
+from datetime import datetime
+from utils.result_cache import course_key
+
+
+# Due date formats seen in the Assignments tool, tried in order
+DUE_DATE_FORMATS = ("%b %d, %Y %I:%M %p", "%d-%b-%Y %I:%M %p", "%Y-%m-%d %H:%M", "%d/%m/%Y %H:%M")
+
+
+class Prefetcher:
+    """
+    Queue of low-priority read-ahead jobs with hit and miss counters
+
+    BrowserManager queues one lowest-priority "prefetch" operation per job,
+    so a job only starts when no other operation is waiting. A running job
+    checks the queue again before each page load and is abandoned and put
+    back when something is waiting, so a click waits for at most the page
+    load already in progress. A job is a dict with "course" and, for grading
+    tables, "assignment".
+    """
+
+    def __init__(self, max_courses=3, max_assignments=3):
+        """
+        Initialize prefetcher
+
+        Args:
+            max_courses: How many of the most-used courses to read ahead after login
+            max_assignments: How many assignments to read ahead when a course is opened
+        """
+        self.max_courses = max_courses
+        self.max_assignments = max_assignments
+        self._lock = threading.Lock()
+        self._jobs = deque()
+        self._done = set()  # keys of data fetched ahead and not yet asked for
+        self.hits = 0
+        self.misses = 0
+        self.prefetched = 0
+
+    def plan_courses(self, courses, usage):
+        """
+        Queue the assignment lists of the most-used courses
+
+        Args:
+            courses: Course dicts as returned by login
+            usage: Dict of course key -> number of times the course was opened
+
+        Returns:
+            int: Number of jobs queued
+        """
+        used = [course for course in courses if usage.get(course_key(course))]
+        used.sort(key=lambda course: -usage[course_key(course)])
+        queued = 0
+        with self._lock:
+            for course in used[:self.max_courses]:
+                if _job_key(course) not in self._done:
+                    self._jobs.append({"course": course})
+                    queued += 1
+        return queued
+
+    def plan_assignments(self, course, assignments):
+        """
+        Queue the grading tables of a course's assignments due closest to now
+
+        Grading-table jobs of a previously opened course are dropped, since
+        the user has moved on from it.
+        
+        Returns:
+            int: Number of jobs queued
+        """
+        now = time.time()
+
+        def distance(assignment):
+            due = _due_timestamp(assignment.get("due_date"))
+            # Unknown due dates go last, in page order
+            return (due is None, abs(now - due) if due is not None else assignment["index"])
+
+        likely = sorted(assignments, key=distance)[:self.max_assignments]
+        queued = 0
+        with self._lock:
+            self._jobs = deque(job for job in self._jobs if "assignment" not in job)
+            for assignment in likely:
+                if _job_key(course, assignment) not in self._done:
+                    self._jobs.append({"course": course, "assignment": assignment})
+                    queued += 1
+        return queued
+
+    def next_job(self):
+        """Take the next job, or return None if there is nothing to prefetch"""
+        with self._lock:
+            return self._jobs.popleft() if self._jobs else None
+
+    def put_back(self, job):
+        """Return an abandoned job to the front of the queue"""
+        with self._lock:
+            self._jobs.appendleft(job)
+
+    def mark_done(self, job):
+        """Record that a job's data is now in the result cache"""
+        with self._lock:
+            self._done.add(_job_key(job["course"], job.get("assignment")))
+            self.prefetched += 1
+
+    def note_request(self, course, assignment=None):
+        """
+        Count a user request as a hit if its data was fetched ahead, else as a miss
+
+        Returns:
+            bool: True on a hit
+        """
+        key = _job_key(course, assignment)
+        with self._lock:
+            if key in self._done:
+                self._done.discard(key)
+                self.hits += 1
+                return True
+            self.misses += 1
+            return False
+
+    def clear(self):
+        """Drop every pending job and fetched key (e.g. on sign-out)"""
+        with self._lock:
+            self._jobs.clear()
+            self._done.clear()
+
+    def stats(self):
+        """Report hits, misses, jobs completed and jobs still waiting"""
+        with self._lock:
+            return {
+                "hits": self.hits,
+                "misses": self.misses,
+                "prefetched": self.prefetched,
+                "pending": len(self._jobs)
+            }
+
+
+def _job_key(course, assignment=None):
+    """Return the key identifying the data a job fetches"""
+    if assignment is None:
+        return ("assignments", course_key(course))
+    return ("students_missing", course_key(course), assignment["assignment_id"])
+
+
+def _due_timestamp(text):
+    """Parse an Assignments-tool due date into a timestamp, or None if it is not recognised"""
+    if not text:
+        return None
+    for date_format in DUE_DATE_FORMATS:
+        try:
+            return datetime.strptime(text.strip(), date_format).timestamp()
+        except ValueError:
+            continue
+    return None
@@ -0,0 +1,102 @@
+"""Request interception that keeps only what the scraper needs"""
+import threading
+from urllib.parse import urlparse
+
+
+class ResourceFilter:
+    """Aborts images, media, fonts and third-party requests and counts what was skipped"""
+    
+    BLOCKED_RESOURCE_TYPES = ("image", "media", "font")
+    
+    def __init__(self, lms_url, allowed_hosts=(), blocked_resource_types=None):
+        """
+        Initialize resource filter
+        
+        Args:
+            lms_url: Portal URL; requests to its host (and subdomains) are first-party
+            allowed_hosts: Extra host names that must never be blocked (e.g. an SSO server)
+            blocked_resource_types: Playwright resource types to abort
+                                    (defaults to BLOCKED_RESOURCE_TYPES)
+        """
+        self.lms_host = urlparse(lms_url).hostname
+        self.allowed_hosts = tuple(allowed_hosts)
+        self.blocked_resource_types = tuple(blocked_resource_types or self.BLOCKED_RESOURCE_TYPES)
+        
+        self._lock = threading.Lock()
+        self.blocked_requests = {}  # resource type -> count
+        self.allowed_requests = 0
+        self.allowed_bytes = 0
+    
+    def attach(self, context):
+        """Route every request of a browser context through this filter"""
+        context.route("**/*", self._handle_route)
+        context.on("response", self._on_response)
+    
+    async def attach_async(self, context):
+        """Route every request of an async-API browser context through this filter"""
+        await context.route("**/*", self._handle_route_async)
+        context.on("response", self._on_response)
+    
+    def _is_first_party(self, url):
+        """Return True if url belongs to the LMS or an explicitly allowed host"""
+        host = urlparse(url).hostname or ""
+        for allowed in (self.lms_host,) + self.allowed_hosts:
+            if allowed and (host == allowed or host.endswith("." + allowed)):
+                return True
+        return False
+    
+    def should_block(self, resource_type, url):
+        """Decide whether a request can be skipped without affecting the scraped DOM text"""
+        if url.startswith("data:"):
+            return False
+        if resource_type in self.blocked_resource_types:
+            return True
+        return resource_type != "document" and not self._is_first_party(url)
+    
+    def _handle_route(self, route):
+        """Playwright route handler: abort or continue a request"""
+        if self._count_if_blocked(route.request):
+            route.abort()
+        else:
+            route.continue_()
+    
+    async def _handle_route_async(self, route):
+        """Async Playwright route handler: abort or continue a request"""
+        if self._count_if_blocked(route.request):
+            await route.abort()
+        else:
+            await route.continue_()
+    
+    def _count_if_blocked(self, request):
+        """Return True (and count it) if request should be aborted"""
+        if not self.should_block(request.resource_type, request.url):
+            return False
+        with self._lock:
+            self.blocked_requests[request.resource_type] = self.blocked_requests.get(request.resource_type, 0) + 1
+        return True
+    
+    def _on_response(self, response):
+        """Count the requests that were let through and their declared sizes"""
+        try:
+            size = int(response.headers.get("content-length", 0))
+        except ValueError:
+            size = 0
+        with self._lock:
+            self.allowed_requests += 1
+            self.allowed_bytes += size
+    
+    def stats(self):
+        """
+        Report what the filter did during this run
+        
+        Returns:
+            dict: "blocked" (total), "blocked_by_type", "allowed" and
+                  "allowed_bytes" (sum of Content-Length of allowed responses)
+        """
+        with self._lock:
+            return {
+                'blocked': sum(self.blocked_requests.values()),
+                'blocked_by_type': dict(self.blocked_requests),
+                'allowed': self.allowed_requests,
+                'allowed_bytes': self.allowed_bytes
+            }
@@ -0,0 +1,263 @@
+"""HTTP-only fast path using Sakai's /direct REST endpoints"""
+import http.client
+import json
+import re
+import threading
+from urllib.parse import quote, urlencode, urlparse
+from browser.portal_scraper import PortalScraper, assignment_id, filter_missing_students
+
+
+class RestUnavailable(Exception):
+    """Raised when a /direct endpoint cannot answer and DOM scraping must be used"""
+
+    def __init__(self, message, status=None):
+        super().__init__(message)
+        self.status = status  # HTTP status, or None for transport/format errors
+
+
+class SakaiRestClient:
+    """Keep-alive HTTP client for Sakai's /direct JSON, one connection per thread"""
+
+    def __init__(self, base_url, timeout=10):
+        """
+        Initialize REST client
+
+        Args:
+            base_url: Portal URL, e.g. https://lms.lums.edu.pk/
+            timeout: Socket timeout in seconds
+        """
+        parsed = urlparse(base_url)
+        self.scheme = parsed.scheme
+        self.host = parsed.hostname
+        self.port = parsed.port
+        self.base_path = parsed.path.rstrip("/")
+        self.timeout = timeout
+        self.cookie_header = ""
+        self._local = threading.local()
+
+    def set_cookies(self, cookies):
+        """Use the given Playwright cookies (list of dicts) for every request"""
+        self.cookie_header = "; ".join(f"{cookie['name']}={cookie['value']}" for cookie in cookies)
+
+    def _connection(self):
+        """Return this thread's open connection, creating it if needed"""
+        conn = getattr(self._local, "conn", None)
+        if conn is None:
+            conn_class = http.client.HTTPSConnection if self.scheme == "https" else http.client.HTTPConnection
+            conn = conn_class(self.host, self.port, timeout=self.timeout)
+            self._local.conn = conn
+        return conn
+
+    def _drop_connection(self):
+        """Close this thread's connection so the next request opens a fresh one"""
+        conn = getattr(self._local, "conn", None)
+        if conn is not None:
+            conn.close()
+            self._local.conn = None
+
+    def get_json(self, path, params=None):
+        """
+        GET a /direct document
+
+        Args:
+            path: Path below the portal root, e.g. "direct/site.json"
+            params: Optional query parameters
+
+        Returns:
+            dict or list: Decoded JSON body
+
+        Raises:
+            RestUnavailable: On any transport error, non-200 status or non-JSON body
+        """
+        url = f"{self.base_path}/{path}"
+        if params:
+            url += "?" + urlencode(params)
+        headers = {"Cookie": self.cookie_header, "Accept": "application/json"}
+
+        # A kept-alive connection may have been closed by the server; retry once on a new one
+        for attempt in range(2):
+            try:
+                conn = self._connection()
+                conn.request("GET", url, headers=headers)
+                response = conn.getresponse()
+                body = response.read()
+                break
+            except (http.client.HTTPException, OSError) as e:
+                self._drop_connection()
+                if attempt == 1:
+                    raise RestUnavailable(f"GET {url} failed: {type(e).__name__}: {e}")
+
+        if response.status != 200:
+            raise RestUnavailable(f"GET {url} returned HTTP {response.status}", response.status)
+        try:
+            return json.loads(body)
+        except ValueError:
+            raise RestUnavailable(f"GET {url} did not return JSON")
+
+    def close(self):
+        """Close this thread's connection"""
+        self._drop_connection()
+
+
+class RestPortalScraper(PortalScraper):
+    """
+    PortalScraper that reads assignment lists and submissions from /direct JSON
+
+    Login still happens in the browser; its cookies are then borrowed for
+    plain HTTP requests. Every call that cannot be answered over HTTP falls
+    back to the DOM scraping of PortalScraper.
+    """
+
+    ASSIGNMENTS_PATH = "direct/assignment/site/{site_id}.json"
+    SUBMISSIONS_PATH = "direct/assignment/gradable.json"
+
+    _SITE_ID_PATTERN = re.compile(r"/site/([^/?#]+)")
+
+    def __init__(self, page, state_manager, ui_callback, waits=None, client=None, tracer=None):
+        """
+        Initialize REST scraper
+
+        Args:
+            page: Playwright page object (used for login, cookies and fallback)
+            state_manager: Object with browser_lock, courses, assignments, etc.
+            ui_callback: Function to call for UI updates (safe_after wrapper)
+            waits: WaitStrategy shared with the DOM scraper
+            client: SakaiRestClient to use (defaults to one for LOGIN_URL)
+            tracer: Optional Tracer shared with the DOM scraper
+        """
+        super().__init__(page, state_manager, ui_callback, waits, tracer)
+        self.client = client or SakaiRestClient(self.LOGIN_URL)
+        self._cookies_loaded = False
+        self._missing_endpoints = set()  # endpoints that answered 404 on this server
+
+    def _refresh_cookies(self):
+        """Copy the browser context's current cookies into the HTTP client"""
+        self.client.set_cookies(self.page.context.cookies(self.LOGIN_URL))
+        self._cookies_loaded = True
+
+    def _get_json(self, endpoint, path, params=None):
+        """GET a /direct document, re-reading browser cookies once if the session looks stale"""
+        if endpoint in self._missing_endpoints:
+            raise RestUnavailable(f"{endpoint} is not available on this server")
+        if not self._cookies_loaded:
+            self._refresh_cookies()
+        try:
+            with self.tracer.span(f"rest {endpoint}"):
+                try:
+                    return self.client.get_json(path, params)
+                except RestUnavailable as e:
+                    if e.status not in (401, 403):
+                        raise
+                    self._refresh_cookies()
+                    return self.client.get_json(path, params)
+        except RestUnavailable as e:
+            if e.status == 404:
+                self._missing_endpoints.add(endpoint)
+            raise
+
+    def _site_id(self, course_index):
+        """Return the Sakai site id of a course from its captured site URL"""
+        with self.state_manager.browser_lock:
+            courses = self.state_manager.courses
+        course = courses[course_index] if course_index is not None and course_index < len(courses) else {}
+        match = self._SITE_ID_PATTERN.search(course.get("url") or "")
+        if not match:
+            raise RestUnavailable(f"No site id known for course {course_index}")
+        return match.group(1)
+
+    def _load_assignment_list(self, course_index):
+        """Read a course's assignments from /direct, falling back to the Assignments tool"""
+        try:
+            site_id = quote(self._site_id(course_index), safe="")
+            data = self._get_json(self.ASSIGNMENTS_PATH, self.ASSIGNMENTS_PATH.format(site_id=site_id))
+            return parse_rest_assignments(data)
+        except RestUnavailable as e:
+            print(f"[DEBUG] REST assignment list unavailable, using DOM: {e}")
+            return super()._load_assignment_list(course_index)
+
+    def _find_students_missing(self, selected_assignment, course_index, on_batch=None):
+        """Read an assignment's submissions from /direct, falling back to the grading page"""
+        try:
+            gradable_id = selected_assignment["assignment_id"]
+            data = self._get_json(self.SUBMISSIONS_PATH, self.SUBMISSIONS_PATH, {"gradableId": gradable_id})
+            return filter_missing_students(parse_rest_submissions(data))
+        except RestUnavailable as e:
+            print(f"[DEBUG] REST submissions unavailable, using DOM: {e}")
+
+        if selected_assignment.get("source") == "rest":
+            # REST order is not the page order, so match the assignment on the page by id
+            selected_assignment = self._match_dom_assignment(selected_assignment, course_index)
+        return super()._find_students_missing(selected_assignment, course_index, on_batch)
+
+    def _match_dom_assignment(self, rest_assignment, course_index):
+        """Find the Assignments-tool row for an assignment listed by /direct"""
+        dom_assignments = super()._load_assignment_list(course_index)
+        for assignment in dom_assignments:
+            if assignment_id(assignment["assignment_id"]) == assignment_id(rest_assignment["assignment_id"]):
+                return assignment
+        for assignment in dom_assignments:
+            if assignment["name"] == rest_assignment["name"]:
+                return assignment
+        raise Exception(f"Assignment {rest_assignment['name']} not found on the Assignments page")
+
+
+def parse_rest_assignments(data):
+    """
+    Turn /direct/assignment/site/{id}.json into assignment dicts
+
+    Args:
+        data: Decoded JSON with an "assignment_collection" list
+
+    Returns:
+        list: Dicts shaped like parse_assignment_rows output, with "source": "rest"
+
+    Raises:
+        RestUnavailable: If the document does not have the expected shape
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("assignment_collection"), list):
+        raise RestUnavailable("Unexpected assignment list document")
+
+    assignments = []
+    for item in data["assignment_collection"]:
+        name = (item.get("title") or "").strip()
+        if not name or item.get("draft"):
+            continue
+        due_time = item.get("dueTime")
+        due = item.get("dueTimeString") or (due_time.get("display") if isinstance(due_time, dict) else None)
+        assignments.append({
+            "name": name,
+            "index": len(assignments),
+            "grade_element_index": None,
+            "assignment_id": assignment_id(item["id"]) if item.get("id") else name,
+            "grade_url": None,
+            "due_date": due,
+            "submitted": None,
+            "ungraded": None,
+            "source": "rest"
+        })
+    return assignments
+
+
+def parse_rest_submissions(data):
+    """
+    Turn /direct/assignment/gradable.json into grading table rows
+
+    Args:
+        data: Decoded JSON with a "submissions" list
+
+    Returns:
+        list: Dicts with "studentname" and "status", like PortalScraper.read_submission_rows
+
+    Raises:
+        RestUnavailable: If the document does not have the expected shape
+    """
+    if not isinstance(data, dict) or not isinstance(data.get("submissions"), list):
+        raise RestUnavailable("Unexpected submissions document")
+
+    rows = []
+    for submission in data["submissions"]:
+        status = (submission.get("status") or "").strip()
+        for submitter in submission.get("submitters") or []:
+            name = submitter.get("sortName") or submitter.get("displayName") or submitter.get("id") or ""
+            rows.append({"studentname": name.strip(), "status": status})
+    return rows
@@ -0,0 +1,130 @@
+"""Per-step readiness waits for the portal pages"""
+import threading
+import time
+from collections import deque
+
+
+class WaitStrategy:
+    """Waits for the element each navigation step needs and records how long it took"""
+    
+    # step -> (selector that marks the page as ready, timeout budget in ms)
+    STEPS = {
+        "login_result": ('.link-container, input[name="eid"]', 30000),
+        "course_list": (".link-container", 15000),
+        "course_site": ('text="Assignments"', 15000),
+        "assignment_list": ('a[name="asnActionLink"], form[name="listAssignmentsForm"]', 15000),
+        "grading_table": ("table#submissionList", 20000),
+    }
+    
+    # Wait modes: "selector" waits for the step's selector and falls back to
+    # networkidle if it does not show up in time; "networkidle" always waits
+    # for the network to go quiet, as the scraper originally did
+    MODES = ("selector", "networkidle")
+    
+    def __init__(self, mode="selector", history=200, tracer=None):
+        """
+        Initialize wait strategy
+        
+        Args:
+            mode: One of MODES
+            history: Number of recent waits kept per step for the timing stats
+            tracer: Optional Tracer that also gets a span per wait
+        """
+        if mode not in self.MODES:
+            print(f"Warning: Unknown wait mode {mode!r}, using 'selector'")
+            mode = "selector"
+        self.mode = mode
+        self.history = history
+        self.tracer = tracer
+        
+        self._lock = threading.Lock()
+        self._durations = {}  # step -> deque of durations in ms
+        self._fallbacks = {}  # step -> number of networkidle fallbacks
+    
+    def wait(self, page, step, fallback=True):
+        """
+        Wait until the page is ready for a navigation step
+        
+        Args:
+            page: Playwright page
+            step: Key of STEPS
+            fallback: Wait for networkidle if the selector misses its budget;
+                      when False the timeout error is raised instead
+        """
+        # Imported here rather than at module level so that importing the
+        # browser package does not load Playwright; by the time a page is
+        # waited on it is already loaded and this is a dictionary lookup
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+        selector, timeout = self.STEPS[step]
+        start = time.perf_counter()
+        used_fallback = False
+        try:
+            if self.mode == "networkidle":
+                page.wait_for_load_state("networkidle")
+                return
+            
+            page.wait_for_load_state("domcontentloaded")
+            try:
+                page.wait_for_selector(selector, timeout=timeout)
+            except PlaywrightTimeoutError:
+                if not fallback:
+                    raise
+                print(f"[DEBUG] Wait for {step} missed {timeout} ms budget, falling back to networkidle")
+                used_fallback = True
+                page.wait_for_load_state("networkidle")
+        finally:
+            self._record(step, start, used_fallback)
+    
+    async def wait_async(self, page, step, fallback=True):
+        """Coroutine version of wait() for pages of the async Playwright API"""
+        from playwright.sync_api import TimeoutError as PlaywrightTimeoutError
+        selector, timeout = self.STEPS[step]
+        start = time.perf_counter()
+        used_fallback = False
+        try:
+            if self.mode == "networkidle":
+                await page.wait_for_load_state("networkidle")
+                return
+            
+            await page.wait_for_load_state("domcontentloaded")
+            try:
+                await page.wait_for_selector(selector, timeout=timeout)
+            except PlaywrightTimeoutError:
+                if not fallback:
+                    raise
+                print(f"[DEBUG] Wait for {step} missed {timeout} ms budget, falling back to networkidle")
+                used_fallback = True
+                await page.wait_for_load_state("networkidle")
+        finally:
+            self._record(step, start, used_fallback)
+    
+    def _record(self, step, start, used_fallback):
+        """Store the duration of one wait that began at perf_counter() value start"""
+        end = time.perf_counter()
+        duration_ms = (end - start) * 1000
+        if self.tracer:
+            self.tracer.add(f"wait {step}", start, end, "wait", fallback=used_fallback)
+        print(f"[DEBUG] Wait for {step}: {duration_ms:.0f} ms")
+        with self._lock:
+            self._durations.setdefault(step, deque(maxlen=self.history)).append(duration_ms)
+            if used_fallback:
+                self._fallbacks[step] = self._fallbacks.get(step, 0) + 1
+    
+    def stats(self):
+        """
+        Summarize recent wait times
+        
+        Returns:
+            dict: step -> {"count", "mean_ms", "max_ms", "last_ms", "fallbacks"}
+        """
+        with self._lock:
+            return {
+                step: {
+                    'count': len(durations),
+                    'mean_ms': sum(durations) / len(durations),
+                    'max_ms': max(durations),
+                    'last_ms': durations[-1],
+                    'fallbacks': self._fallbacks.get(step, 0)
+                }
+                for step, durations in self._durations.items() if durations
+            }
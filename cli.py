@@ -0,0 +1,243 @@
+"""Command-line entry point for scripted and scheduled checks (no GUI)"""
+import argparse
+import contextlib
+import json
+import os
+import sys
+import time
+from queue import Queue, Empty
+from browser.engine import create_browser_manager
+from models.app_state import AppState
+from utils.credential_manager import CredentialManager
+from utils.result_cache import ResultCache
+from utils.settings import Settings
+
+
+# Exit statuses
+EXIT_OK = 0  # every selected assignment checked, no marks missing
+EXIT_MISSING = 1  # marks are missing
+EXIT_USAGE = 2  # bad arguments or no credentials (also argparse's status)
+EXIT_LOGIN = 3  # the portal rejected the credentials
+EXIT_CONNECTION = 4  # browser, network or overall timeout
+EXIT_INCOMPLETE = 5  # some courses or assignments could not be checked
+
+
+class ScanRun:
+    """
+    Drives BrowserManager from the main thread without Tk
+
+    BrowserManager hands every callback to ui_callback; here those land in
+    a queue that the main thread drains, so callbacks run on one thread
+    just like in the GUI.
+    """
+
+    def __init__(self, settings, result_cache=None):
+        self.callbacks = Queue()
+        self.state = AppState()
+        self.browser_manager = create_browser_manager(self.state, self.ui_callback, settings, result_cache)
+        self.done = False
+        self.exit_code = EXIT_OK
+        self.results = []  # one dict per scanned course
+        self.pending = 0
+
+    def ui_callback(self, delay, func, *args):
+        """Stand-in for the GUI's safe_after: queue func for the main thread"""
+        self.callbacks.put((func, args))
+
+    def run(self, username, password, course_names, assignment_names, timeout):
+        """
+        Log in, scan the selected courses and wait for every result
+
+        Returns:
+            int: Exit status
+        """
+        self.course_names = course_names
+        self.assignment_names = assignment_names
+        self.browser_manager.queue_login(
+            username, password, self.on_login_success, self.on_login_error, self.on_status
+        )
+
+        deadline = time.monotonic() + timeout
+        try:
+            while not self.done:
+                remaining = deadline - time.monotonic()
+                if remaining <= 0:
+                    print(f"ERROR: Gave up after {timeout} s", file=sys.stderr)
+                    return EXIT_CONNECTION
+                try:
+                    func, args = self.callbacks.get(timeout=remaining)
+                except Empty:
+                    continue
+                func(*args)
+            return self.exit_code
+        finally:
+            self.browser_manager.shutdown()
+            self.browser_manager.export_trace()
+
+    def on_status(self, message):
+        print(message, file=sys.stderr)
+
+    def on_login_success(self, courses):
+        selected = select_courses(courses, self.course_names)
+        if not selected:
+            print("ERROR: No course matches --course", file=sys.stderr)
+            self.finish(EXIT_USAGE)
+            return
+
+        # Every course is queued at once, so the scans share one browser
+        # (and run side by side with CHECKMARKS_PAGE_POOL_SIZE > 1)
+        self.pending = len(selected)
+        for course in selected:
+            self.browser_manager.queue_scan_course(
+                course,
+                lambda matrix, course=course: self.on_course_scanned(course, matrix),
+                lambda error_message, course=course: self.on_course_error(course, error_message),
+                self.on_progress,
+                self.assignment_names
+            )
+
+    def on_login_error(self, error_type):
+        if self.browser_manager.startup_error:
+            print(f"ERROR: Browser did not start: {self.browser_manager.startup_error}", file=sys.stderr)
+        else:
+            print(f"ERROR: Login failed ({error_type})", file=sys.stderr)
+        self.finish(EXIT_CONNECTION if error_type == "connection" else EXIT_LOGIN)
+
+    def on_progress(self, done, total, assignment_name):
+        print(f"Checked {done}/{total}: {assignment_name}", file=sys.stderr)
+
+    def on_course_scanned(self, course, matrix):
+        for path in matrix.reports:
+            print(f"Report written to {path}", file=sys.stderr)
+        self.results.append({
+            "course": course["name"],
+            "assignments": list(matrix.assignments),
+            "unchanged": list(matrix.unchanged),
+            "missing": [
+                {"student": student_name, "assignment": assignment_name, "status": status}
+                for student_name, assignment_name, status in matrix.rows()
+            ],
+            "failures": dict(matrix.failures),
+            "reports": list(matrix.reports)
+        })
+        self._course_finished()
+
+    def on_course_error(self, course, error_message):
+        self.results.append({
+            "course": course["name"], "assignments": [], "unchanged": [], "missing": [],
+            "failures": {"": error_message}, "reports": []
+        })
+        self._course_finished()
+
+    def _course_finished(self):
+        self.pending -= 1
+        if self.pending == 0:
+            if any(result["failures"] for result in self.results):
+                self.finish(EXIT_INCOMPLETE)
+            elif any(result["missing"] for result in self.results):
+                self.finish(EXIT_MISSING)
+            else:
+                self.finish(EXIT_OK)
+
+    def finish(self, exit_code):
+        self.exit_code = exit_code
+        self.done = True
+
+
+def select_courses(courses, names):
+    """Return the courses whose name contains one of names (ignoring case); all if names is empty"""
+    if not names:
+        return courses
+    needles = [name.lower() for name in names]
+    return [course for course in courses if any(needle in course["name"].lower() for needle in needles)]
+
+
+def load_credentials(username=None):
+    """
+    Read credentials from CHECKMARKS_USERNAME / CHECKMARKS_PASSWORD, else the keyring
+
+    Returns:
+        tuple: (username, password), either of which may be None
+    """
+    username = username or os.environ.get("CHECKMARKS_USERNAME")
+    password = os.environ.get("CHECKMARKS_PASSWORD")
+    if not password:
+        saved = CredentialManager().load_saved_credentials()
+        if saved and (not username or saved["username"] == username):
+            username = saved["username"]
+            password = saved["password"]
+    return username, password
+
+
+def write_report(results, output_format, stream):
+    """Write the scan results as JSON or as one text line per missing mark"""
+    if output_format == "json":
+        json.dump({"courses": results}, stream, indent=2)
+        stream.write("\n")
+        return
+
+    for result in results:
+        for row in result["missing"]:
+            stream.write(f"{result['course']} / {row['assignment']}: {row['student']} - {row['status']}\n")
+        for assignment_name, error_message in result["failures"].items():
+            where = f"{result['course']} / {assignment_name}" if assignment_name else result["course"]
+            stream.write(f"[Not checked] {where}: {error_message}\n")
+
+
+def build_parser():
+    parser = argparse.ArgumentParser(
+        description="Check which students are missing marks on Sakai, without the GUI"
+    )
+    commands = parser.add_subparsers(dest="command", required=True)
+
+    scan = commands.add_parser("scan", help="Scan courses and report students missing marks")
+    scan.add_argument("--course", action="append", default=[],
+                      help="Course name, or part of it (repeatable; default: every course)")
+    scan.add_argument("--assignment", action="append", default=[],
+                      help="Assignment name, or part of it (repeatable; default: every assignment)")
+    scan.add_argument("--format", choices=("text", "json"), default="text", help="Report format")
+    scan.add_argument("--username", help="Login username (default: CHECKMARKS_USERNAME or saved credentials)")
+    scan.add_argument("--timeout", type=int, default=2 * 60 * 60, help="Give up after this many seconds")
+    scan.add_argument("--show-browser", action="store_true", help="Show the browser window")
+    scan.add_argument("--no-cache", action="store_true",
+                      help="Re-open every grading page instead of reusing unchanged results")
+    scan.add_argument("--max-age", type=int, default=0, metavar="SECONDS",
+                      help="Reuse an unchanged result only if it was checked within this many "
+                           "seconds (default 0: no limit)")
+    return parser
+
+
+def main(argv=None):
+    args = build_parser().parse_args(argv)
+
+    username, password = load_credentials(args.username)
+    if not username or not password:
+        print("ERROR: No credentials; set CHECKMARKS_USERNAME and CHECKMARKS_PASSWORD "
+              "or save them with Remember me in the GUI", file=sys.stderr)
+        return EXIT_USAGE
+
+    settings = Settings()
+    settings.headless = not args.show_browser
+    settings.history_max_age = max(args.max_age, 0)
+
+    report_stream = sys.stdout
+    # The browser code logs to stdout; keep stdout for the report alone
+    with contextlib.redirect_stdout(sys.stderr):
+        result_cache = None
+        if not args.no_cache:
+            try:
+                result_cache = ResultCache(os.path.join(settings.data_dir, "cache.sqlite3"))
+            except Exception as e:
+                print(f"Warning: Result cache disabled: {type(e).__name__}: {e}")
+
+        run = ScanRun(settings, result_cache)
+        exit_code = run.run(username, password, args.course, args.assignment, args.timeout)
+        if result_cache is not None:
+            result_cache.close()
+
+    write_report(run.results, args.format, report_stream)
+    return exit_code
+
+
+if __name__ == "__main__":
+    sys.exit(main())
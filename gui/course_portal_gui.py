@@ -5,14 +5,22 @@ import threading
 import traceback
 import sys
 import os
+from functools import partial
 from models.app_state import AppState
-from browser.browser_manager import BrowserManager
+from browser.engine import create_browser_manager
 from utils.credential_manager import CredentialManager
+from utils.result_cache import ResultCache, ScanHistory, course_key
+from utils.settings import Settings
+from utils import startup_timer
+from gui.virtual_table import VirtualTable
 
 
 class CoursePortalGUI:
     """Main GUI application class"""
     
+    # Seconds to wait for the browser before reporting startup timings without it
+    STARTUP_REPORT_TIMEOUT = 120
+    
     def __init__(self, root):
         self.root = root
         self.root.title("Course Portal - Missing Grades Checker")
@@ -29,8 +37,10 @@ class CoursePortalGUI:
         
         # Initialize components
         self.state = AppState()
+        self.settings = Settings()
         self.credential_manager = CredentialManager()
-        self.browser_manager = BrowserManager(self.state, self.safe_after)
+        self.result_cache = self._open_result_cache()
+        self.browser_manager = create_browser_manager(self.state, self.safe_after, self.settings, self.result_cache)
         
         # Hover state tracking for listboxes
         self.hovered_item = {}  # dict to track hovered item index for each listbox
@@ -38,6 +48,11 @@ class CoursePortalGUI:
         style = ttk.Style()
         style.theme_use('vista')
         self.create_login_widgets()
+        
+        # Paint the login window now; the browser and keyring come up behind it
+        self.root.update_idletasks()
+        startup_timer.timer.mark("first paint")
+        threading.Thread(target=self._report_startup, daemon=True, name="StartupReport").start()
     
     def create_login_widgets(self):
         """Create login window - shown initially"""
@@ -77,6 +92,9 @@ class CoursePortalGUI:
         # Bind Enter key to login
         self.username_entry.bind('<Return>', lambda e: self.on_login_clicked())
         self.password_entry.bind('<Return>', lambda e: self.on_login_clicked())
+        
+        # Launch the browser and open the login page while the user types
+        self.browser_manager.start_browser_worker()
     
     def create_main_widgets(self):
         """Create main application window - shown after successful login"""
@@ -116,17 +134,27 @@ class CoursePortalGUI:
         students_frame.columnconfigure(0, weight=1)
         students_frame.rowconfigure(0, weight=1)
         
-        students_scrollbar = ttk.Scrollbar(students_frame, orient=tk.VERTICAL)
-        self.students_listbox = tk.Listbox(students_frame, yscrollcommand=students_scrollbar.set, height=15)
-        students_scrollbar.config(command=self.students_listbox.yview)
-        self.students_listbox.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
-        students_scrollbar.grid(row=0, column=1, sticky=(tk.N, tk.S))
+        # Sweeps can list thousands of rows, so this pane is a virtualized table
+        self.results_table = VirtualTable(students_frame, height=15)
+        self.results_table.grid(row=0, column=0, sticky=(tk.W, tk.E, tk.N, tk.S))
         
         # Sign Out button at the top right
         signout_frame = ttk.Frame(self.main_frame)
         signout_frame.grid(row=0, column=0, columnspan=3, sticky=(tk.E, tk.N), padx=5, pady=5)
         self.signout_button = ttk.Button(signout_frame, text="Sign Out", command=self.on_signout_clicked)
         self.signout_button.pack(side=tk.RIGHT)
+        self.scan_course_button = ttk.Button(signout_frame, text="Scan Course", command=self.on_scan_course_clicked)
+        self.scan_course_button.pack(side=tk.RIGHT, padx=(0, 5))
+        self.sweep_button = ttk.Button(signout_frame, text="Sweep All Courses", command=self.on_sweep_clicked)
+        self.sweep_button.pack(side=tk.RIGHT, padx=(0, 5))
+        self.refresh_button = ttk.Button(signout_frame, text="Refresh", command=self.on_refresh_clicked)
+        self.refresh_button.pack(side=tk.RIGHT, padx=(0, 5))
+        self.root.bind('<F5>', self.on_refresh_clicked)
+        self.sweep_running = False
+        # A running sweep steps aside for clicks; its rows are kept here while
+        # the results table shows an assignment the user opened meanwhile
+        self.sweep_rows = []
+        self.sweep_in_view = False
         
         # Status bar at the bottom
         status_frame = ttk.Frame(self.main_frame, relief=tk.SUNKEN, borderwidth=1)
@@ -139,7 +167,6 @@ class CoursePortalGUI:
         # Set up hover effects for all listboxes
         self.setup_listbox_hover(self.courses_listbox)
         self.setup_listbox_hover(self.assignments_listbox)
-        self.setup_listbox_hover(self.students_listbox)
         
         # Configure grid weights
         self.main_frame.columnconfigure(0, weight=1)
@@ -252,11 +279,35 @@ class CoursePortalGUI:
     
     def load_saved_credentials(self):
         """Load saved credentials from system keyring and pre-fill form"""
-        creds = self.credential_manager.load_saved_credentials()
-        if creds:
+        # Loading keyring and its backend is slow, so it happens off the UI
+        # thread and the form is filled in once the credentials arrive
+        def load():
+            creds = self.credential_manager.load_saved_credentials()
+            startup_timer.timer.mark("credentials loaded")
+            if creds:
+                self.safe_after(0, self._fill_saved_credentials, creds)
+        
+        threading.Thread(target=load, daemon=True, name="LoadCredentials").start()
+    
+    def _fill_saved_credentials(self, creds):
+        """Pre-fill the login form, unless the user has already started typing"""
+        try:
+            if self.username_entry.get() or self.password_entry.get():
+                return
             self.username_entry.insert(0, creds["username"])
             self.password_entry.insert(0, creds["password"])
             self.remember_me_var.set(True)
+        except (tk.TclError, RuntimeError):
+            # Login form already gone (e.g. window closed)
+            pass
+    
+    def _report_startup(self):
+        """Print the cold-start timings once the browser is on the login page"""
+        if self.browser_manager.wait_until_ready(timeout=self.STARTUP_REPORT_TIMEOUT):
+            startup_timer.timer.mark("login ready")
+        elif self.browser_manager.startup_error:
+            print(f"[DEBUG] Browser did not start: {self.browser_manager.startup_error}")
+        print(startup_timer.timer.report(self.settings.startup_budget_ms))
     
     def on_login_clicked(self):
         """Handle login button click"""
@@ -284,7 +335,8 @@ class CoursePortalGUI:
             username, password,
             self.on_login_success,
             self.on_login_error,
-            self.update_login_status
+            self.update_login_status,
+            remember_session=self.current_remember_me
         )
     
     def update_login_status(self, message):
@@ -322,9 +374,12 @@ class CoursePortalGUI:
             self.main_frame.grid()
         
         # Populate courses list
-        self.courses_listbox.delete(0, tk.END)
-        for course in courses:
-            self.courses_listbox.insert(tk.END, course["name"])
+        self._update_listbox(self.courses_listbox, [course["name"] for course in courses])
+        self._cache_put("courses", courses, "")
+        
+        # Read ahead the courses this user opens most
+        usage = self._cache_get("course_usage", "")
+        self.browser_manager.prefetch_courses(courses, usage[0] if usage else {})
         
         self.set_status("Ready", "black")
     
@@ -366,24 +421,36 @@ class CoursePortalGUI:
             
             self.state.current_course_index = course_index
             selected_course = self.state.courses[course_index]
+            self._count_course_use(selected_course)
+            self.browser_manager.prefetcher.note_request(selected_course)
             
             # Clear assignments and students when switching courses
             self.assignments_listbox.delete(0, tk.END)
-            self.students_listbox.delete(0, tk.END)
+            self.results_table.clear()
+            self.sweep_in_view = False
             self.state.current_assignment_index = None
             self.state.assignments = []
             self.state.students_missing = []
             
-            # Show loading for assignments
-            self.state.is_loading = True
-            print("[DEBUG] Calling show_loading for assignments")
-            self.show_loading("Fetching assignments...")
+            # Show the saved list straight away and only go to the portal if it is stale
+            cached = self._cache_get("assignments", course_key(selected_course))
+            if cached:
+                assignments, is_fresh = cached
+                self._show_assignments(assignments)
+                if is_fresh:
+                    return
+                self.set_status(f"Found {len(assignments)} saved assignment(s), refreshing...", "blue")
+            else:
+                # Show loading for assignments
+                self.state.is_loading = True
+                print("[DEBUG] Calling show_loading for assignments")
+                self.show_loading("Fetching assignments...")
             
             # Queue fetch_assignments operation
             print("[DEBUG] Queueing fetch_assignments operation")
             self.browser_manager.queue_fetch_assignments(
                 selected_course,
-                self.on_assignments_fetched,
+                partial(self.on_assignments_fetched, course_index=course_index),
                 self.on_assignments_error
             )
             print("[DEBUG] Operation queued")
@@ -392,16 +459,42 @@ class CoursePortalGUI:
             traceback.print_exc()
             sys.stderr.flush()
     
-    def on_assignments_fetched(self, assignments):
+    def on_assignments_fetched(self, assignments, course_index=None):
         """Handle assignments fetched - update UI"""
+        if course_index is not None and course_index != self.state.current_course_index:
+            # The user has moved on to another course; just keep the result for later
+            self._cache_put("assignments", assignments, course_key(self.state.courses[course_index]))
+            return
+        
         self.state.is_loading = False
         self.hide_loading()
         self.set_status(f"Found {len(assignments)} assignment(s)", "black")
         
-        # Populate assignments list
-        self.assignments_listbox.delete(0, tk.END)
+        if self.state.current_course_index is not None:
+            self._cache_put(
+                "assignments", assignments, course_key(self.state.courses[self.state.current_course_index])
+            )
+        self._show_assignments(assignments)
+    
+    def _show_assignments(self, assignments):
+        """Show an assignment list, keeping the selected assignment selected"""
+        selected_id = None
+        if self.state.current_assignment_index is not None and self.state.current_assignment_index < len(self.state.assignments):
+            selected_id = self.state.assignments[self.state.current_assignment_index]["assignment_id"]
+        
+        # With a page pool other fetches may finish in between, so keep the
+        # list that belongs to this result
+        self.state.assignments = assignments
+        self.state.current_assignment_index = None
         for assignment in assignments:
-            self.assignments_listbox.insert(tk.END, assignment["name"])
+            if selected_id is not None and assignment["assignment_id"] == selected_id:
+                self.state.current_assignment_index = assignment["index"]
+        
+        # Populate assignments list
+        self._update_listbox(self.assignments_listbox, [assignment["name"] for assignment in assignments])
+        
+        # Read ahead the grading tables the user is likely to open next
+        self.browser_manager.prefetch_assignments(self.state.courses[self.state.current_course_index], assignments)
     
     def on_assignments_error(self, error_message):
         """Handle error fetching assignments"""
@@ -428,57 +521,353 @@ class CoursePortalGUI:
         selected_assignment = self.state.assignments[assignment_index]
         
         # Clear students list
-        self.students_listbox.delete(0, tk.END)
+        self.results_table.clear()
+        self.sweep_in_view = False
         self.state.students_missing = []
         
-        # Show loading for students
-        self.state.is_loading = True
-        self.show_loading("Processing assignment...")
+        # Show the saved result straight away; the grading page is opened
+        # again once the result is older than its cache TTL
+        selected_course = self.state.courses[self.state.current_course_index]
+        self.browser_manager.prefetcher.note_request(selected_course, selected_assignment)
+        history = self._scan_history()
+        stored = history.stored(selected_course, selected_assignment) if history else None
+        on_batch = None
+        if stored:
+            students_missing, is_fresh, _ = stored
+            self._show_students(students_missing)
+            if is_fresh:
+                return
+            self.set_status("Showing saved result, refreshing...", "blue")
+        else:
+            # Show loading for students, and each grading page as soon as it is read
+            self.state.is_loading = True
+            self.show_loading("Processing assignment...")
+            on_batch = partial(self.on_students_batch, assignment=selected_assignment)
         
         # Queue process_assignment operation
         self.browser_manager.queue_process_assignment(
             selected_assignment,
-            self.on_students_processed,
-            self.on_students_error
+            partial(self.on_students_processed, course=selected_course, assignment=selected_assignment),
+            self.on_students_error,
+            on_batch
+        )
+    
+    def on_refresh_clicked(self, event=None):
+        """Re-open the selected assignment's grading page, ignoring any saved result"""
+        index = self.state.current_assignment_index
+        if self.state.is_loading or index is None or index >= len(self.state.assignments):
+            return
+        
+        selected_course = self.state.courses[self.state.current_course_index]
+        selected_assignment = self.state.assignments[index]
+        self.results_table.clear()
+        self.state.students_missing = []
+        self.state.is_loading = True
+        self.show_loading("Refreshing assignment...")
+        self.browser_manager.queue_process_assignment(
+            selected_assignment,
+            partial(self.on_students_processed, course=selected_course, assignment=selected_assignment),
+            self.on_students_error,
+            partial(self.on_students_batch, assignment=selected_assignment)
         )
     
-    def on_students_processed(self, students_missing):
+    def on_students_batch(self, students_missing, assignment):
+        """Append one streamed page of students missing marks while processing continues"""
+        if not self._is_current_assignment(assignment):
+            return
+        
+        if self.state.is_loading:
+            self.state.is_loading = False
+            self.hide_loading()
+        
+        self.state.students_missing = self.state.students_missing + students_missing
+        self.results_table.append_rows(self._student_rows(students_missing, assignment))
+        self.set_status(f"Found {len(self.state.students_missing)} student(s) with missing grades so far...", "blue")
+    
+    def on_students_processed(self, students_missing, course=None, assignment=None):
         """Handle students processed - update UI"""
+        if assignment is not None:
+            history = self._scan_history()
+            if history:
+                history.record(course, assignment, students_missing)
+            if not self._is_current_assignment(assignment):
+                # The user has moved on to another assignment
+                return
+        
         self.state.is_loading = False
         self.hide_loading()
+        self._show_students(students_missing)
+    
+    def _is_current_assignment(self, assignment):
+        """Return True if assignment is the one selected in the assignments list"""
+        current = self.state.current_assignment_index
+        return current is not None and current < len(self.state.assignments) and \
+            self.state.assignments[current]["assignment_id"] == assignment["assignment_id"]
+    
+    def _show_students(self, students_missing):
+        """Show the students missing marks for the selected assignment"""
+        self.state.students_missing = students_missing
         
         # Populate students list
-        self.students_listbox.delete(0, tk.END)
         if students_missing:
-            for student in students_missing:
-                self.students_listbox.insert(tk.END, f"{student['name']} - {student['status']}")
+            assignment = self.state.assignments[self.state.current_assignment_index]
+            self.results_table.set_rows(self._student_rows(students_missing, assignment))
             count_text = f"Found {len(students_missing)} student(s) with missing grades"
             self.set_status(count_text, "orange")
         else:
-            self.students_listbox.insert(tk.END, "All students have marks entered!")
+            self.results_table.set_message("All students have marks entered!")
             self.set_status("All students have marks!", "green")
     
+    def _student_rows(self, students_missing, assignment):
+        """Turn one assignment's students missing marks into results table rows"""
+        return [(student['name'], student['status'], assignment['name']) for student in students_missing]
+    
     def on_students_error(self, error_message):
         """Handle error processing students"""
         self.state.is_loading = False
         self.hide_loading()
         self.set_status(f"Error: {error_message}", "red")
     
+    def _update_listbox(self, listbox, lines):
+        """Make a listbox show lines, touching only the rows that changed"""
+        current = listbox.get(0, tk.END)
+        for i, line in enumerate(lines):
+            if i >= len(current):
+                listbox.insert(tk.END, line)
+            elif current[i] != line:
+                listbox.delete(i)
+                listbox.insert(i, line)
+        if len(current) > len(lines):
+            listbox.delete(len(lines), tk.END)
+    
+    def _open_result_cache(self):
+        """Open the on-disk result cache, or return None if it is unavailable"""
+        try:
+            return ResultCache(os.path.join(self.settings.data_dir, "cache.sqlite3"))
+        except Exception as e:
+            print(f"Warning: Result cache disabled: {type(e).__name__}: {e}")
+            return None
+    
+    def _count_course_use(self, course):
+        """Count how often each course is opened, so the most used ones can be prefetched"""
+        cached = self._cache_get("course_usage", "")
+        usage = cached[0] if cached else {}
+        usage[course_key(course)] = usage.get(course_key(course), 0) + 1
+        self._cache_put("course_usage", usage, "")
+    
+    def _scan_history(self):
+        """Return the logged-in user's ScanHistory, or None when the cache is disabled"""
+        if self.result_cache is None:
+            return None
+        return ScanHistory(self.result_cache, self.state.username)
+    
+    def _cache_get(self, kind, course, assignment=""):
+        """Read the cache for the logged-in user, or None"""
+        if self.result_cache is None:
+            return None
+        try:
+            return self.result_cache.get(self.state.username, kind, course, assignment)
+        except Exception as e:
+            print(f"Error reading result cache: {type(e).__name__}: {e}")
+            return None
+    
+    def _cache_put(self, kind, payload, course, assignment=""):
+        """Write a fresh result to the cache for the logged-in user"""
+        if self.result_cache is None:
+            return
+        try:
+            self.result_cache.put(self.state.username, kind, payload, course, assignment)
+        except Exception as e:
+            print(f"Error writing result cache: {type(e).__name__}: {e}")
+    
+    def on_scan_course_clicked(self):
+        """Handle Scan Course button click - check every assignment of the selected course"""
+        if not self.state.browser_ready:
+            return
+        
+        if self.state.current_course_index is None:
+            self.set_status("Select a course to scan", "red")
+            return
+        
+        selected_course = self.state.courses[self.state.current_course_index]
+        
+        # Clear students list
+        self.results_table.clear()
+        self.state.current_assignment_index = None
+        self.assignments_listbox.selection_clear(0, tk.END)
+        self.scan_course_button.config(state="disabled")
+        
+        self.state.is_loading = True
+        self.show_loading(f"Scanning {selected_course['name']}")
+        
+        self.browser_manager.queue_scan_course(
+            selected_course,
+            self.on_course_scanned,
+            self.on_course_scan_error,
+            self.on_course_scan_progress
+        )
+    
+    def on_course_scan_progress(self, done, total, assignment_name):
+        """Show which assignment a course scan has reached"""
+        self.state.is_loading = False
+        self.set_status(f"Scanned {done}/{total}: {assignment_name}", "blue")
+    
+    def on_course_scanned(self, matrix):
+        """Handle course scan finished - list every student missing marks"""
+        self.state.is_loading = False
+        self.hide_loading()
+        self.scan_course_button.config(state="normal")
+        
+        rows = [(student_name, status, assignment_name) for student_name, assignment_name, status in matrix.rows()]
+        rows.extend(
+            ("[Not checked]", error_message, assignment_name)
+            for assignment_name, error_message in matrix.failures.items()
+        )
+        self.results_table.set_rows(rows)
+        
+        if matrix.statuses:
+            text = (f"{matrix.course_name}: {matrix.missing_count()} missing mark(s) for "
+                    f"{len(matrix.statuses)} student(s) across {len(matrix.assignments)} assignment(s)")
+            if matrix.unchanged:
+                text += f" ({len(matrix.unchanged)} unchanged since the last scan)"
+            self.set_status(text + self._report_note(matrix.reports), "orange")
+        elif matrix.failures:
+            self.set_status(f"{matrix.course_name}: {len(matrix.failures)} assignment(s) could not be checked", "red")
+        else:
+            self.results_table.set_message("All students have marks entered!")
+            self.set_status(f"{matrix.course_name}: all students have marks!", "green")
+    
+    def on_course_scan_error(self, error_message):
+        """Handle error scanning a course"""
+        self.state.is_loading = False
+        self.hide_loading()
+        self.scan_course_button.config(state="normal")
+        self.set_status(f"Error: {error_message}", "red")
+    
+    def on_sweep_clicked(self):
+        """Handle Sweep button click - start a semester-wide sweep, or stop the running one"""
+        if not self.state.browser_ready:
+            return
+        
+        if self.sweep_running:
+            self.browser_manager.cancel_sweep()
+            self.sweep_button.config(state="disabled")
+            self.set_status("Stopping sweep after the current assignment...", "blue")
+            return
+        
+        self.sweep_running = True
+        self.sweep_missing_count = 0
+        self.sweep_rows = []
+        self.sweep_in_view = True
+        self.sweep_button.config(text="Stop Sweep")
+        self.scan_course_button.config(state="disabled")
+        
+        # Clear students list
+        self.results_table.clear()
+        self.state.current_assignment_index = None
+        self.assignments_listbox.selection_clear(0, tk.END)
+        
+        self.set_status("Sweeping all courses...", "blue")
+        self.browser_manager.queue_sweep(
+            self.on_sweep_result,
+            self.on_sweep_complete,
+            self.on_sweep_error
+        )
+    
+    def on_sweep_result(self, course_name, assignment_name, students_missing, error_message):
+        """Append one finished assignment of a sweep to the students list"""
+        if error_message:
+            where = f"{course_name} / {assignment_name}" if assignment_name else course_name
+            rows = [("[Not checked]", error_message, where)]
+        else:
+            rows = [
+                (student['name'], student['status'], f"{course_name} / {assignment_name}")
+                for student in students_missing
+            ]
+            self.sweep_missing_count += len(students_missing)
+        self.sweep_rows.extend(rows)
+        
+        # Leave the table and status bar to an assignment opened during the sweep
+        if not self.sweep_in_view:
+            return
+        self.results_table.append_rows(rows)
+        if error_message:
+            return
+        self.set_status(
+            f"Sweeping... {course_name} / {assignment_name} done, "
+            f"{self.sweep_missing_count} missing mark(s) so far",
+            "blue"
+        )
+    
+    def on_sweep_complete(self, summary):
+        """Handle end of a sweep"""
+        self._end_sweep()
+        self._show_sweep_rows()
+        text = (f"Sweep checked {summary['checked']} assignment(s), "
+                f"{self.sweep_missing_count} missing mark(s)")
+        if summary['unchanged']:
+            text += f", {summary['unchanged']} unchanged since the last check"
+        if summary['skipped']:
+            text += f", {summary['skipped']} already done earlier"
+        if summary['failed']:
+            text += f", {summary['failed']} failed"
+        text += self._report_note(summary['reports'])
+        if summary['stopped']:
+            self.set_status(text + " - stopped early, sweep again to resume", "orange")
+        else:
+            self.set_status(text, "orange" if self.sweep_missing_count else "green")
+    
+    def on_sweep_error(self, error_message):
+        """Handle error during a sweep"""
+        self._end_sweep()
+        self._show_sweep_rows()
+        self.set_status(f"Error: {error_message} - sweep again to resume", "red")
+    
+    def _report_note(self, paths):
+        """Return a status-bar suffix naming the folder the results were exported to"""
+        if not paths:
+            return ""
+        return f" - saved to {os.path.dirname(paths[0])}"
+    
+    def _show_sweep_rows(self):
+        """Bring a finished sweep's rows back if an assignment was opened while it ran"""
+        if self.sweep_in_view or self.state.is_loading:
+            return
+        self.sweep_in_view = True
+        self.state.current_assignment_index = None
+        self.assignments_listbox.selection_clear(0, tk.END)
+        self.results_table.set_rows(self.sweep_rows)
+    
+    def _end_sweep(self):
+        """Restore the sweep controls after a sweep ends"""
+        self.sweep_running = False
+        self.sweep_button.config(text="Sweep All Courses", state="normal")
+        self.scan_course_button.config(state="normal")
+    
     def on_signout_clicked(self):
         """Handle sign out button click"""
+        # Signing out ends the saved session too
+        if self.state.username:
+            self.credential_manager.clear_session(self.state.username)
+        
         # Reset browser manager (creates new queue and thread)
         self.browser_manager.reset()
         
+        # Relaunch the browser so the next login has a worker and a login page waiting
+        self.browser_manager.start_browser_worker()
+        
         # Reset state
         self.state.reset()
+        if hasattr(self, 'sweep_button'):
+            self._end_sweep()
         
         # Clear listboxes
         if hasattr(self, 'courses_listbox'):
             self.courses_listbox.delete(0, tk.END)
         if hasattr(self, 'assignments_listbox'):
             self.assignments_listbox.delete(0, tk.END)
-        if hasattr(self, 'students_listbox'):
-            self.students_listbox.delete(0, tk.END)
+        if hasattr(self, 'results_table'):
+            self.results_table.clear()
         
         # Hide main window and show login window
         if hasattr(self, 'main_frame'):
@@ -518,4 +907,8 @@ class CoursePortalGUI:
     
     def cleanup(self):
         """Clean up browser resources - called on window close"""
+        print(f"[DEBUG] Prefetch: {self.browser_manager.prefetch_stats()}")
         self.browser_manager.shutdown()
+        self.browser_manager.export_trace()
+        if self.result_cache is not None:
+            self.result_cache.close()
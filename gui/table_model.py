@@ -0,0 +1,111 @@
+"""Rows, sort order, filter and scroll position of the results table, without any widgets"""
+
+
+class TableModel:
+    """
+    The data behind VirtualTable
+
+    Holds every row in arrival order and the filtered, sorted view of them,
+    plus the index of the first visible line. VirtualTable only copies
+    window() into its Treeview items, so ordering and scrolling can be
+    tested without a display.
+    """
+
+    def __init__(self, columns):
+        """
+        Create an empty model
+
+        Args:
+            columns: Column names, in the order of each row's values
+        """
+        self.columns = tuple(columns)
+        self.sort_column = None
+        self.sort_reverse = False
+        self._rows = []  # every row as a tuple, in arrival order
+        self._view = []  # rows passing the filter, in display order
+        self._filter = ""
+        self._offset = 0  # index in _view of the first visible line
+
+    def set_rows(self, rows):
+        """Replace every row and scroll back to the top"""
+        self._rows = [tuple(row) for row in rows]
+        self._offset = 0
+        self._refresh()
+
+    def append_rows(self, rows):
+        """Add rows, keeping the current sort and filter"""
+        rows = [tuple(row) for row in rows]
+        self._rows.extend(rows)
+        if self.sort_column is None and not self._filter:
+            # Arrival order and no filter: the new rows simply go at the end
+            self._view.extend(rows)
+        else:
+            self._refresh()
+
+    def set_filter(self, text):
+        """Keep only rows containing text (case-insensitive) in any column"""
+        self._filter = text.strip().lower()
+        self._refresh()
+
+    def sort_by(self, column):
+        """Sort by a column; sorting by the same column again reverses the order"""
+        if self.sort_column == column:
+            self.sort_reverse = not self.sort_reverse
+        else:
+            self.sort_column = column
+            self.sort_reverse = False
+        self._refresh()
+
+    def row_count(self):
+        """Return the number of rows held (including filtered-out ones)"""
+        return len(self._rows)
+
+    def view_count(self):
+        """Return the number of rows passing the filter"""
+        return len(self._view)
+
+    def window(self, lines):
+        """
+        Return the rows on the visible lines
+
+        The first visible line is clamped so the window never starts past
+        the last row or leaves blank lines while rows above are hidden.
+
+        Args:
+            lines: Number of visible lines
+
+        Returns:
+            list: Up to lines rows, starting at the first visible line
+        """
+        self._offset = max(0, min(self._offset, len(self._view) - lines))
+        return self._view[self._offset:self._offset + lines]
+
+    def first_line(self):
+        """Return the index in the view of the first visible row"""
+        return self._offset
+
+    def scroll_range(self, lines):
+        """Return the (first, last) fractions of the view on screen, as a scrollbar takes them"""
+        total = len(self._view)
+        if not total:
+            return 0.0, 1.0
+        return self._offset / total, min(1.0, (self._offset + lines) / total)
+
+    def scroll_by(self, lines):
+        """Move the view by lines (negative scrolls up); window() keeps it off the end"""
+        self._offset = max(0, self._offset + lines)
+
+    def scroll_to(self, fraction):
+        """Put the row at fraction of the view on the first line"""
+        self._offset = int(fraction * len(self._view))
+
+    def _refresh(self):
+        """Rebuild the filtered and sorted view from the rows"""
+        needle = self._filter
+        view = [row for row in self._rows if needle in " ".join(row).lower()] if needle else list(self._rows)
+
+        if self.sort_column is not None:
+            index = self.columns.index(self.sort_column)
+            view.sort(key=lambda row: row[index].lower(), reverse=self.sort_reverse)
+
+        self._view = view
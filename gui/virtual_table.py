@@ -0,0 +1,188 @@
+"""Virtualized, sortable and filterable results table"""
+import tkinter as tk
+from tkinter import ttk
+from gui.table_model import TableModel
+
+
+class VirtualTable(ttk.Frame):
+    """
+    Student / status / assignment table that only materializes the rows in view
+
+    The rows, their sort and filter and the scroll position live in a
+    TableModel. The Treeview holds a fixed number of items, one per visible
+    line, whose values are rewritten when the view scrolls, so adding,
+    sorting or filtering thousands of rows never creates or deletes
+    widgets, and hover highlighting touches two items. An informational
+    message is drawn on the first line instead of the rows and is never
+    part of the model.
+    """
+
+    COLUMNS = (
+        ("student", "Student", 200),
+        ("status", "Status", 140),
+        ("assignment", "Assignment", 200),
+    )
+    HOVER_BG = "#e0e0e0"  # Light gray, as in the listboxes
+    WHEEL_LINES = 3
+
+    def __init__(self, parent, height=15):
+        """
+        Create the table
+
+        Args:
+            parent: Parent widget
+            height: Initial number of visible lines
+        """
+        super().__init__(parent)
+        self.columnconfigure(1, weight=1)
+        self.rowconfigure(1, weight=1)
+
+        self.model = TableModel(column for column, _, _ in self.COLUMNS)
+        self._message = None  # text shown instead of the rows, if any
+        self._hovered = None
+
+        ttk.Label(self, text="Filter:").grid(row=0, column=0, sticky=tk.W, pady=(0, 5))
+        self.filter_var = tk.StringVar()
+        self.filter_var.trace_add("write", lambda *args: self._on_filter())
+        ttk.Entry(self, textvariable=self.filter_var).grid(
+            row=0, column=1, columnspan=2, sticky=(tk.W, tk.E), padx=(5, 0), pady=(0, 5)
+        )
+
+        self.tree = ttk.Treeview(
+            self, columns=[column for column, _, _ in self.COLUMNS],
+            show="headings", height=height, selectmode="none"
+        )
+        for column, heading, width in self.COLUMNS:
+            self.tree.heading(column, text=heading, command=lambda c=column: self.sort_by(c))
+            self.tree.column(column, width=width, minwidth=60, stretch=True)
+        self.tree.tag_configure("hover", background=self.HOVER_BG)
+        self.tree.grid(row=1, column=0, columnspan=2, sticky=(tk.W, tk.E, tk.N, tk.S))
+
+        self.scrollbar = ttk.Scrollbar(self, orient=tk.VERTICAL, command=self._on_scrollbar)
+        self.scrollbar.grid(row=1, column=2, sticky=(tk.N, tk.S))
+
+        # Treeview items reused for whichever rows are in view
+        self._slots = []
+        self._set_slot_count(height)
+
+        self.tree.bind('<Configure>', self._on_resize)
+        self.tree.bind('<MouseWheel>', self._on_wheel)
+        self.tree.bind('<Button-4>', lambda e: self._scroll_by(-self.WHEEL_LINES))
+        self.tree.bind('<Button-5>', lambda e: self._scroll_by(self.WHEEL_LINES))
+        self.tree.bind('<Motion>', self._on_motion)
+        self.tree.bind('<Leave>', lambda e: self._set_hover(None))
+
+    def set_rows(self, rows):
+        """Replace every row with rows of (student, status, assignment)"""
+        self._message = None
+        self.model.set_rows(rows)
+        self._render()
+
+    def append_rows(self, rows):
+        """Add rows, keeping the current sort and filter"""
+        self._message = None
+        self.model.append_rows(rows)
+        self._render()
+
+    def set_message(self, text):
+        """Show a single informational line instead of rows"""
+        self.model.set_rows([])
+        self._message = text
+        self._render()
+
+    def clear(self):
+        """Remove every row"""
+        self.set_rows([])
+
+    def row_count(self):
+        """Return the number of rows held (including filtered-out ones)"""
+        return self.model.row_count()
+
+    def sort_by(self, column):
+        """Sort by a column; sorting by the same column again reverses the order"""
+        self.model.sort_by(column)
+
+        for name, heading, _ in self.COLUMNS:
+            arrow = (" ▼" if self.model.sort_reverse else " ▲") if name == column else ""
+            self.tree.heading(name, text=heading + arrow)
+        self._render()
+
+    def _on_filter(self):
+        """Apply the filter entry's text to the rows"""
+        self.model.set_filter(self.filter_var.get())
+        self._render()
+
+    def _render(self):
+        """Write the rows in view (or the message) into the slot items and update the scrollbar"""
+        if self._message is not None:
+            shown = [(self._message, "", "")]
+        else:
+            shown = self.model.window(len(self._slots))
+        for i, slot in enumerate(self._slots):
+            values = shown[i] if i < len(shown) else ("", "", "")
+            tags = ("hover",) if slot == self._hovered and i < len(shown) and self._message is None else ()
+            self.tree.item(slot, values=values, tags=tags)
+
+        if self._message is not None:
+            self.scrollbar.set(0.0, 1.0)
+        else:
+            self.scrollbar.set(*self.model.scroll_range(len(self._slots)))
+
+    def _set_slot_count(self, count):
+        """Keep exactly count slot items in the Treeview"""
+        count = max(1, count)
+        while len(self._slots) < count:
+            self._slots.append(self.tree.insert("", tk.END, values=("", "", "")))
+        while len(self._slots) > count:
+            slot = self._slots.pop()
+            if slot == self._hovered:
+                self._hovered = None
+            self.tree.delete(slot)
+        self._render()
+
+    def _on_resize(self, event):
+        """Match the number of slots to the lines that fit in the new height"""
+        row_height = int(ttk.Style().lookup("Treeview", "rowheight") or 20)
+        heading_height = row_height + 5
+        count = (event.height - heading_height) // row_height
+        if count != len(self._slots):
+            self._set_slot_count(count)
+
+    def _on_scrollbar(self, action, amount, unit=None):
+        """Handle the scrollbar's moveto / scroll commands"""
+        if action == "moveto":
+            self.model.scroll_to(float(amount))
+            self._render()
+        elif action == "scroll":
+            step = len(self._slots) if unit == "pages" else 1
+            self._scroll_by(int(amount) * step)
+
+    def _on_wheel(self, event):
+        """Scroll a few lines per wheel notch"""
+        self._scroll_by(-self.WHEEL_LINES if event.delta > 0 else self.WHEEL_LINES)
+        return "break"
+
+    def _scroll_by(self, lines):
+        """Move the view by lines (negative scrolls up)"""
+        self.model.scroll_by(lines)
+        self._render()
+        return "break"
+
+    def _on_motion(self, event):
+        """Highlight the line under the cursor"""
+        slot = self.tree.identify_row(event.y) or None
+        if slot is not None and self._message is not None:
+            slot = None  # the message is not a row
+        elif slot is not None and self.model.first_line() + self._slots.index(slot) >= self.model.view_count():
+            slot = None  # blank line below the last row
+        self._set_hover(slot)
+
+    def _set_hover(self, slot):
+        """Move the hover highlight from the previous line to slot"""
+        if slot == self._hovered:
+            return
+        if self._hovered is not None:
+            self.tree.item(self._hovered, tags=())
+        if slot is not None:
+            self.tree.item(slot, tags=("hover",))
+        self._hovered = slot
@@ -1,8 +1,13 @@
 """Main entry point for Course Portal application"""
-import tkinter as tk
+# Imported first: the startup timer's clock starts when this module loads
+from utils import startup_timer
 import sys
 import traceback
-from gui.course_portal_gui import CoursePortalGUI
+
+with startup_timer.timer.importing("tkinter"):
+    import tkinter as tk
+with startup_timer.timer.importing("gui.course_portal_gui"):
+    from gui.course_portal_gui import CoursePortalGUI
 
 
 def exception_handler(exc_type, exc_value, exc_traceback):
@@ -26,6 +31,7 @@ def main():
     sys.excepthook = exception_handler
     
     root = tk.Tk()
+    startup_timer.timer.mark("Tk root created")
     app = CoursePortalGUI(root)
     
     def on_closing():
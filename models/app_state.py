@@ -14,12 +14,14 @@ class AppState:
         self.browser_lock = threading.Lock()
         
         # State management
+        self.username = None
         self.courses = []
         self.assignments = []
         self.students_missing = []
         self.current_course_index = None
         self.current_assignment_index = None
         self.course_list_url = "https://lms.lums.edu.pk/"
+        self.assignments_tool_urls = {}  # course index -> Assignments tool URL
         
         # Loading state
         self.is_loading = False
@@ -27,9 +29,11 @@ class AppState:
     def reset(self):
         """Reset state for new session"""
         self.browser_ready = False
+        self.username = None
         self.courses = []
         self.assignments = []
         self.students_missing = []
         self.current_course_index = None
         self.current_assignment_index = None
+        self.assignments_tool_urls = {}
         self.is_loading = False
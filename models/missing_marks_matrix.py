@@ -0,0 +1,46 @@
+"""Student x assignment matrix of missing marks for a course"""
+
+
+class MissingMarksMatrix:
+    """Collects the missing-marks results of every assignment in a course"""
+
+    def __init__(self, course_name):
+        self.course_name = course_name
+        self.assignments = []  # assignment names, in portal order
+        self.statuses = {}  # student name -> {assignment name: status}
+        self.failures = {}  # assignment name -> error message
+        self.unchanged = []  # assignment names answered from an earlier scan
+        self.reports = []  # report files the scan was exported to
+
+    def add_assignment(self, assignment_name, students_missing, unchanged=False):
+        """Record the students missing marks for one assignment"""
+        self.assignments.append(assignment_name)
+        if unchanged:
+            self.unchanged.append(assignment_name)
+        for student in students_missing:
+            self.statuses.setdefault(student["name"], {})[assignment_name] = student["status"]
+
+    def add_failure(self, assignment_name, error_message):
+        """Record an assignment that could not be processed"""
+        self.assignments.append(assignment_name)
+        self.failures[assignment_name] = error_message
+
+    def students(self):
+        """Return the names of students missing at least one mark, sorted"""
+        return sorted(self.statuses)
+
+    def status(self, student_name, assignment_name):
+        """Return the status of a missing mark, or None if the mark is not missing"""
+        return self.statuses.get(student_name, {}).get(assignment_name)
+
+    def missing_count(self):
+        """Return the total number of missing marks across all assignments"""
+        return sum(len(row) for row in self.statuses.values())
+
+    def rows(self):
+        """Yield (student, assignment, status) for every missing mark"""
+        for student_name in self.students():
+            row = self.statuses[student_name]
+            for assignment_name in self.assignments:
+                if assignment_name in row:
+                    yield student_name, assignment_name, row[assignment_name]
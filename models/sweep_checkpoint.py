@@ -0,0 +1,57 @@
+"""Resume point for semester-wide sweeps"""
+import json
+import os
+
+
+class SweepCheckpoint:
+    """Append-only record of the (course, assignment) pairs a sweep has finished"""
+
+    def __init__(self, path):
+        self.path = path
+        self.completed = set()
+        self._load()
+        self.resumed = set(self.completed)
+
+    def _load(self):
+        """Read the keys written by an earlier, interrupted sweep"""
+        if not os.path.exists(self.path):
+            return
+        try:
+            with open(self.path, encoding="utf-8") as f:
+                for line in f:
+                    line = line.strip()
+                    if line:
+                        course_name, assignment_id = json.loads(line)
+                        self.completed.add((course_name, assignment_id))
+        except (OSError, ValueError) as e:
+            # A truncated last line only costs re-checking that assignment
+            print(f"Warning: Could not fully read sweep checkpoint {self.path}: {e}")
+
+    def is_resuming(self):
+        """Return True if an earlier sweep left finished assignments behind"""
+        return bool(self.completed)
+
+    def is_done(self, course_name, assignment_id):
+        """Return True if the assignment was finished by an earlier run or by this sweep"""
+        return (course_name, assignment_id) in self.completed
+
+    def done_earlier(self, course_name, assignment_id):
+        """Return True if the assignment was finished before this sweep started"""
+        return (course_name, assignment_id) in self.resumed
+
+    def mark_done(self, course_name, assignment_id):
+        """Record a finished assignment, flushing it to disk straight away"""
+        self.completed.add((course_name, assignment_id))
+        os.makedirs(os.path.dirname(self.path) or ".", exist_ok=True)
+        with open(self.path, "a", encoding="utf-8") as f:
+            f.write(json.dumps([course_name, assignment_id]) + "\n")
+            f.flush()
+
+    def clear(self):
+        """Forget all progress once a sweep has completed"""
+        self.completed = set()
+        self.resumed = set()
+        try:
+            os.remove(self.path)
+        except FileNotFoundError:
+            pass
@@ -0,0 +1,95 @@
+"""Saved sessions in the system keyring"""
+import json
+import time
+import unittest
+from unittest import mock
+from utils.credential_manager import CredentialManager, session_cookies
+
+
+DOMAIN = "lms.lums.edu.pk"
+
+
+def cookie(name, domain, value="v", **fields):
+    return dict({"name": name, "value": value, "domain": domain, "path": "/", "expires": -1}, **fields)
+
+
+class _MemoryKeyring:
+    def __init__(self, fail=False):
+        self.passwords = {}
+        self.fail = fail
+
+    def set_password(self, service, key, password):
+        if self.fail:
+            raise OSError("The stub received bad data")
+        self.passwords[key] = password
+
+    def get_password(self, service, key):
+        return self.passwords.get(key)
+
+    def delete_password(self, service, key):
+        del self.passwords[key]
+
+
+class SessionCookiesTest(unittest.TestCase):
+
+    def test_keeps_host_and_subdomains_only(self):
+        cookies = [
+            cookie("JSESSIONID", DOMAIN),
+            cookie("sso", ".cas.lms.lums.edu.pk"),
+            cookie("lookalike", "xlms.lums.edu.pk"),
+            cookie("parent", ".lums.edu.pk"),
+            cookie("hostless", ""),
+            cookie("expired", DOMAIN, expires=time.time() - 60),
+        ]
+
+        kept = [c["name"] for c in session_cookies(cookies, DOMAIN)]
+
+        self.assertEqual(kept, ["JSESSIONID", "sso"])
+
+
+class SaveSessionTest(unittest.TestCase):
+
+    def setUp(self):
+        self.keyring = _MemoryKeyring()
+        patcher = mock.patch("utils.credential_manager._keyring", return_value=self.keyring)
+        patcher.start()
+        self.addCleanup(patcher.stop)
+        self.manager = CredentialManager()
+
+    def test_saves_only_restorable_fields(self):
+        state = {"cookies": [cookie("JSESSIONID", DOMAIN, secure=True, partitionKey="x")], "origins": [{"origin": "x"}]}
+
+        self.assertTrue(self.manager.save_session("u", state, DOMAIN))
+
+        saved = self.manager.load_session("u")
+        self.assertEqual(list(saved), ["cookies"])
+        self.assertNotIn("partitionKey", saved["cookies"][0])
+        self.assertTrue(saved["cookies"][0]["secure"])
+
+    def test_refuses_sessions_over_the_windows_limit(self):
+        state = {"cookies": [cookie("JSESSIONID", DOMAIN, value="x" * 1300)]}
+
+        with mock.patch("builtins.print") as printed:
+            self.assertFalse(self.manager.save_session("u", state, DOMAIN))
+
+        self.assertIsNone(self.manager.load_session("u"))
+        self.assertIn("Warning", printed.call_args[0][0])
+
+    def test_warns_when_the_keyring_fails(self):
+        self.keyring.fail = True
+
+        with mock.patch("builtins.print") as printed:
+            self.assertFalse(self.manager.save_session("u", {"cookies": [cookie("JSESSIONID", DOMAIN)]}, DOMAIN))
+
+        self.assertIn("Warning", printed.call_args[0][0])
+
+    def test_fits_a_typical_sakai_session(self):
+        state = {"cookies": [
+            cookie("JSESSIONID", DOMAIN, value="0f1e2d3c-4b5a-6978-8796-a5b4c3d2e1f0.server1", httpOnly=True, secure=True),
+            cookie("SAKAI_SESSION", DOMAIN, value="a" * 64, sameSite="Lax"),
+        ]}
+
+        self.assertTrue(self.manager.save_session("u", state, DOMAIN))
+        data = self.keyring.passwords["_session_u"]
+        self.assertLessEqual(len(data.encode("utf-16-le")), CredentialManager.MAX_SESSION_BYTES)
+        self.assertEqual(len(json.loads(data)["cookies"]), 2)
@@ -0,0 +1,108 @@
+"""Parsing helpers of PortalScraper"""
+import os
+import unittest
+from browser.portal_scraper import PortalScraper, filter_missing_students, find_grade_link, parse_assignment_rows
+from models.app_state import AppState
+
+
+SITE = "https://lms.example.edu/portal/site/s1/tool/t1?assignmentId=/assignment/a/s1/"
+
+SUBMISSION_LIST = os.path.join(os.path.dirname(__file__), "fixtures", "submission_list.html")
+
+
+class FindGradeLinkTest(unittest.TestCase):
+
+    def setUp(self):
+        # The unnamed second row still has a Grade link, so "index" and the
+        # position of the link on the page differ from the third row on
+        self.hrefs = [SITE + "a1", SITE + "a2", SITE + "a3"]
+        self.assignments = parse_assignment_rows([
+            {"name": "Quiz 1", "grade_href": self.hrefs[0], "columns": {}},
+            {"name": " ", "grade_href": self.hrefs[1], "columns": {}},
+            {"name": "Quiz 3", "grade_href": self.hrefs[2], "columns": {}},
+        ])
+
+    def test_matches_by_url(self):
+        self.assertEqual(self.assignments[1]["index"], 1)
+        self.assertEqual(find_grade_link(self.hrefs, self.assignments[1]), 2)
+        self.assertEqual(find_grade_link(list(reversed(self.hrefs)), self.assignments[1]), 0)
+
+    def test_keys_assignments_by_bare_id(self):
+        self.assertEqual([assignment["assignment_id"] for assignment in self.assignments], ["a1", "a3"])
+
+    def test_missing_url_is_not_clicked_by_position(self):
+        self.assertIsNone(find_grade_link(self.hrefs[:2], self.assignments[1]))
+
+    def test_falls_back_to_link_position(self):
+        assignments = parse_assignment_rows([
+            {"name": "", "grade_href": "", "columns": {}},
+            {"name": "Quiz 2", "grade_href": "", "columns": {}},
+        ])
+
+        self.assertEqual(find_grade_link(["", ""], assignments[0]), 1)
+        self.assertIsNone(find_grade_link([""], assignments[0]))
+
+
+class SubmissionCountsTest(unittest.TestCase):
+
+    def test_reads_in_and_new(self):
+        assignments = parse_assignment_rows([
+            {"name": "Quiz 1", "grade_href": SITE + "a1", "columns": {"num_submissions": "12 / 3", "dueDate": "3/4"}},
+        ])
+
+        self.assertEqual((assignments[0]["submitted"], assignments[0]["ungraded"]), (12, 3))
+
+    def test_ignores_other_columns_that_look_like_counts(self):
+        assignments = parse_assignment_rows([
+            {"name": "Quiz 1", "grade_href": SITE + "a1", "columns": {"grade": "8/10", "dueDate": "3/4"}},
+        ])
+
+        self.assertEqual((assignments[0]["submitted"], assignments[0]["ungraded"]), (None, None))
+
+
+class SubmissionRowsTest(unittest.TestCase):
+    """The in-page table read against the per-cell query loop it replaced, on a saved Sakai grading page"""
+
+    def setUp(self):
+        try:
+            from playwright.sync_api import sync_playwright
+            self.playwright = sync_playwright().start()
+        except Exception as e:
+            self.skipTest(f"Playwright unavailable: {e}")
+        self.addCleanup(self.playwright.stop)
+        try:
+            self.browser = self.playwright.chromium.launch(headless=True)
+        except Exception as e:
+            self.skipTest(f"Chromium unavailable: {type(e).__name__}")
+        self.addCleanup(self.browser.close)
+
+        self.page = self.browser.new_page()
+        with open(SUBMISSION_LIST, encoding="utf-8") as f:
+            self.page.set_content(f.read())
+
+    def _query_loop(self):
+        """Students missing marks as found before the table was read in one evaluation"""
+        table = self.page.query_selector("table#submissionList")
+        rows = table.query_selector_all("tr") if table else []
+        students_missing = []
+        for row in rows:
+            status_elem = row.query_selector('td[headers="status"]')
+            student_elem = row.query_selector('td[headers="studentname"]')
+            if status_elem and student_elem:
+                status = status_elem.inner_text().strip()
+                student_name = student_elem.inner_text().strip()
+                if status and status != "Returned" and status != "No Submission - Not Started":
+                    students_missing.append({"name": student_name, "status": status})
+        return students_missing
+
+    def test_matches_query_loop(self):
+        scraper = PortalScraper(self.page, AppState(), lambda delay, func, *args: None)
+
+        students_missing = filter_missing_students(scraper.read_submission_rows())
+
+        self.assertEqual(students_missing, self._query_loop())
+        self.assertEqual(
+            [student["status"] for student in students_missing],
+            ["Submitted Mar 2, 2026 11:48 pm", "Graded - Not Released", "Draft - In Progress",
+             "Re-submitted Mar 3, 2026 12:01 am", "Ungraded"]
+        )
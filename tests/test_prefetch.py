@@ -0,0 +1,76 @@
+"""Prefetch jobs giving way to operations queued while they run"""
+import os
+import tempfile
+import unittest
+from browser.browser_manager import BrowserManager
+from browser.portal_scraper import PortalScraper
+from models.app_state import AppState
+from utils.result_cache import ResultCache
+from utils.settings import Settings
+
+
+COURSE = {"name": "Course 0", "index": 0, "url": "https://lms.example.edu/portal/site/s0"}
+
+
+class _PagedScraper(PortalScraper):
+    """PortalScraper whose assignment list takes two page loads; on_load runs before each"""
+
+    def __init__(self, state, ui_callback, on_load):
+        super().__init__(None, state, ui_callback)
+        self.on_load = on_load
+        self.loads = 0
+
+    def _load_assignment_list(self, course_index):
+        for _ in range(2):
+            self.on_load()
+            self._before_page_load()
+            self.loads += 1
+        return [{"name": "A0", "index": 0, "assignment_id": "a0"}]
+
+
+class PrefetchPreemptionTest(unittest.TestCase):
+
+    def setUp(self):
+        settings = Settings()
+        settings.data_dir = tempfile.mkdtemp()
+        settings.prefetch = True
+        self.state = AppState()
+        self.state.username = "u"
+        self.cache = ResultCache(os.path.join(settings.data_dir, "cache.db"))
+        self.manager = BrowserManager(self.state, lambda delay, func, *args: func(*args), settings, self.cache)
+        self.manager.prefetch_courses([COURSE], {COURSE["url"]: 1})
+
+    def _run_prefetch(self, scraper):
+        operation = self.manager.browser_queue.get()
+        self.assertEqual(operation['type'], 'prefetch')
+        self.manager._handle_prefetch(operation, scraper)
+        self.manager.browser_queue.task_done(operation)
+
+    def _click(self):
+        self.manager.queue_process_assignment({"name": "Click", "assignment_id": "clicked"}, None, None)
+
+    def test_job_is_abandoned_and_put_back_for_a_click(self):
+        scraper = _PagedScraper(self.state, self.manager.ui_callback, lambda: None)
+        scraper.on_load = lambda: self._click() if scraper.loads == 1 else None
+
+        self._run_prefetch(scraper)
+
+        self.assertEqual(scraper.loads, 1)
+        self.assertIsNone(self.cache.get("u", "assignments", COURSE["url"]))
+        self.assertEqual(self.manager.prefetch_stats()["pending"], 1)
+        self.assertEqual(self.manager.browser_queue.get()['type'], 'process_assignment')
+
+        scraper.on_load = lambda: None
+        self._run_prefetch(scraper)
+
+        self.assertEqual(scraper.loads, 3)
+        self.assertEqual(self.manager.prefetch_stats()["prefetched"], 1)
+        self.assertTrue(self.cache.get("u", "assignments", COURSE["url"]))
+
+    def test_job_runs_to_the_end_when_nothing_waits(self):
+        scraper = _PagedScraper(self.state, self.manager.ui_callback, lambda: None)
+
+        self._run_prefetch(scraper)
+
+        self.assertEqual(scraper.loads, 2)
+        self.assertEqual(self.manager.prefetch_stats(), {"hits": 0, "misses": 0, "prefetched": 1, "pending": 0})
@@ -0,0 +1,257 @@
+"""
+RestPortalScraper against the bench stub's /direct endpoints
+
+Run from the repository root:
+    python -m pytest tests
+"""
+import unittest
+from unittest import mock
+from html.parser import HTMLParser
+from urllib.parse import urlencode
+from urllib.error import HTTPError
+from urllib.request import HTTPRedirectHandler, Request, build_opener
+from bench.sakai_stub import SakaiStubServer, Workload
+from browser.portal_scraper import PortalScraper, filter_missing_students
+from browser.rest_backend import (
+    RestPortalScraper, RestUnavailable, SakaiRestClient, parse_rest_assignments, parse_rest_submissions
+)
+from models.app_state import AppState
+
+
+WORKLOAD = Workload(courses=2, assignments=3, students=30, missing_ratio=0.4)
+
+
+class _NoRedirect(HTTPRedirectHandler):
+    def redirect_request(self, *args, **kwargs):
+        return None
+
+
+def sign_in(server):
+    """Post the login form and return the session cookie as Playwright would report it"""
+    opener = build_opener(_NoRedirect)
+    data = urlencode({"eid": "bench", "pw": "bench"}).encode()
+    try:
+        opener.open(Request(server.url, data=data))
+        raise AssertionError("The stub did not redirect after login")
+    except HTTPError as e:  # the unfollowed 302 to /portal
+        token = e.headers["Set-Cookie"].split(";", 1)[0].split("=", 1)[1]
+    return {"name": "JSESSIONID", "value": token, "domain": "127.0.0.1", "path": "/"}
+
+
+class _GradingTableReader(HTMLParser):
+    """Read table#submissionList cells the way dom_scripts.SUBMISSION_ROWS does"""
+
+    def __init__(self):
+        super().__init__()
+        self.rows = []
+        self._in_table = False
+        self._row = None
+        self._header = None
+
+    def handle_starttag(self, tag, attrs):
+        attrs = dict(attrs)
+        if tag == "table" and attrs.get("id") == "submissionList":
+            self._in_table = True
+        elif self._in_table and tag == "tr":
+            self._row = {}
+        elif self._row is not None and tag == "td" and "headers" in attrs:
+            self._header = attrs["headers"]
+            self._row.setdefault(self._header, "")
+
+    def handle_endtag(self, tag):
+        if tag == "td":
+            self._header = None
+        elif tag == "tr" and self._row:
+            self.rows.append(self._row)
+            self._row = None
+        elif tag == "table":
+            self._in_table = False
+
+    def handle_data(self, data):
+        if self._header is not None:
+            self._row[self._header] += data
+
+
+def read_grading_rows(server, cookie, course, assignment_id):
+    """Fetch an assignment's grading page in one page and return its rows"""
+    query = urlencode({"assignmentId": assignment_id, "selectPageSize": 200})
+    request = Request(f"{server.url}portal/site/bench-{course}/tool/grade?{query}")
+    request.add_header("Cookie", f"JSESSIONID={cookie['value']}")
+    reader = _GradingTableReader()
+    reader.feed(build_opener().open(request).read().decode("utf-8"))
+    return reader.rows
+
+
+class _Context:
+    def __init__(self, cookies):
+        self.cookie_list = cookies
+        self.reads = 0
+
+    def cookies(self, url=None):
+        self.reads += 1
+        return list(self.cookie_list)
+
+
+class _CookiePage:
+    """Stands in for the Playwright page; RestPortalScraper only reads its cookies over HTTP"""
+
+    def __init__(self, cookies):
+        self.context = _Context(cookies)
+
+
+class RestBackendTest(unittest.TestCase):
+
+    def setUp(self):
+        self.server = SakaiStubServer(WORKLOAD).start()
+        self.addCleanup(self.server.stop)
+        self.cookie = sign_in(self.server)
+        self.page = _CookiePage([self.cookie])
+        self.scraper = self._scraper(self.server, self.page)
+
+    def _scraper(self, server, page):
+        state = AppState()
+        state.courses = [
+            {"name": WORKLOAD.course_name(course), "index": course, "url": f"{server.url}portal/site/bench-{course}"}
+            for course in range(WORKLOAD.courses)
+        ]
+        client = SakaiRestClient(server.url)
+        self.addCleanup(client.close)
+        return RestPortalScraper(page, state, lambda delay, func, *args: None, client=client)
+
+    def test_assignment_list_skips_drafts(self):
+        assignments = self.scraper._load_assignment_list(1)
+
+        self.assertEqual(
+            [assignment["name"] for assignment in assignments],
+            [WORKLOAD.assignment_name(assignment) for assignment in range(WORKLOAD.assignments)]
+        )
+        self.assertTrue(all(assignment["source"] == "rest" for assignment in assignments))
+        self.assertEqual(assignments[2]["due_date"], "Jan 03, 2026 11:55 pm")
+
+    def test_missing_students_match_grading_page(self):
+        for course in range(WORKLOAD.courses):
+            for assignment in self.scraper._load_assignment_list(course):
+                self.assertNotIn("/", assignment["assignment_id"])
+                dom_id = f"/assignment/a/bench-{course}/{assignment['assignment_id']}"
+                dom_missing = filter_missing_students(read_grading_rows(self.server, self.cookie, course, dom_id))
+                rest_missing = self.scraper._find_students_missing(assignment, course)
+
+                self.assertEqual(rest_missing, dom_missing, f"{course}/{assignment['name']}")
+                self.assertEqual(len(rest_missing), WORKLOAD.missing_count(course, assignment["index"]))
+
+    def test_dom_assignment_is_matched_by_whole_id(self):
+        dom_assignments = [
+            {"name": "Quiz 11", "assignment_id": "11"},
+            {"name": "Quiz 1", "assignment_id": "1"},
+        ]
+        rest_assignment = {"name": "Renamed quiz", "assignment_id": "1", "source": "rest"}
+
+        with mock.patch.object(PortalScraper, "_load_assignment_list", return_value=dom_assignments):
+            self.assertIs(self.scraper._match_dom_assignment(rest_assignment, 0), dom_assignments[1])
+
+    def test_status_mapping(self):
+        data = {"submissions": [
+            {"status": "Submitted", "submitters": [{"sortName": "Khan, Ali (25100001)", "displayName": "Ali Khan"}]},
+            {"status": "Returned", "submitters": [{"sortName": "Raza, Sara (25100002)"}]},
+            {"status": "No Submission - Not Started", "submitters": [{"displayName": "Omar Farooq"}]},
+            {"status": " Graded - Not Released ", "submitters": [{"id": "25100004"}, {"sortName": "Group, Member"}]},
+            {"status": "", "submitters": [{"sortName": "Blank, Status"}]},
+        ]}
+
+        rows = parse_rest_submissions(data)
+
+        self.assertEqual(rows[2], {"studentname": "Omar Farooq", "status": "No Submission - Not Started"})
+        self.assertEqual(filter_missing_students(rows), [
+            {"name": "Khan, Ali (25100001)", "status": "Submitted"},
+            {"name": "25100004", "status": "Graded - Not Released"},
+            {"name": "Group, Member", "status": "Graded - Not Released"},
+        ])
+        with self.assertRaises(RestUnavailable):
+            parse_rest_submissions({"submission": []})
+        with self.assertRaises(RestUnavailable):
+            parse_rest_assignments([])
+
+    def test_missing_endpoint_is_remembered(self):
+        server = SakaiStubServer(WORKLOAD, direct_api=False).start()
+        self.addCleanup(server.stop)
+        scraper = self._scraper(server, _CookiePage([sign_in(server)]))
+        path = RestPortalScraper.SUBMISSIONS_PATH
+
+        with self.assertRaises(RestUnavailable) as raised:
+            scraper._get_json(path, path, {"gradableId": "bench-0-a0"})
+        self.assertEqual(raised.exception.status, 404)
+        requests = server.requests
+
+        with self.assertRaises(RestUnavailable) as raised:
+            scraper._get_json(path, path, {"gradableId": "bench-0-a1"})
+        self.assertIsNone(raised.exception.status)
+        self.assertEqual(server.requests, requests)
+
+    def test_stale_cookies_are_refreshed_once(self):
+        self.scraper.client.set_cookies([{"name": "JSESSIONID", "value": "expired"}])
+        self.scraper._cookies_loaded = True
+
+        assignments = self.scraper._load_assignment_list(0)
+
+        self.assertEqual(len(assignments), WORKLOAD.assignments)
+        self.assertEqual(self.page.context.reads, 1)
+
+    def test_signed_out_browser_gives_up_after_one_refresh(self):
+        self.page.context.cookie_list = []
+        path = RestPortalScraper.SUBMISSIONS_PATH
+
+        with self.assertRaises(RestUnavailable) as raised:
+            self.scraper._get_json(path, path, {"gradableId": "bench-0-a0"})
+
+        self.assertEqual(raised.exception.status, 403)
+        self.assertEqual(self.page.context.reads, 2)
+        self.assertNotIn(path, self.scraper._missing_endpoints)
+
+
+class RestMatchesBrowserTest(unittest.TestCase):
+    """The same assignments read by PortalScraper in Chromium and by RestPortalScraper"""
+
+    def setUp(self):
+        try:
+            from playwright.sync_api import sync_playwright
+            self.playwright = sync_playwright().start()
+        except Exception as e:
+            self.skipTest(f"Playwright unavailable: {e}")
+        self.addCleanup(self.playwright.stop)
+        try:
+            self.browser = self.playwright.chromium.launch(headless=True)
+        except Exception as e:
+            self.skipTest(f"Chromium unavailable: {type(e).__name__}")
+        self.addCleanup(self.browser.close)
+
+        self.server = SakaiStubServer(WORKLOAD).start()
+        self.addCleanup(self.server.stop)
+        login_url = PortalScraper.LOGIN_URL
+        PortalScraper.LOGIN_URL = self.server.url
+        self.addCleanup(setattr, PortalScraper, "LOGIN_URL", login_url)
+
+    def test_rest_matches_dom(self):
+        page = self.browser.new_page()
+        state = AppState()
+        ui_callback = lambda delay, func, *args: None
+        dom = PortalScraper(page, state, ui_callback)
+        rest = RestPortalScraper(page, state, ui_callback)
+        self.addCleanup(rest.client.close)
+
+        success, courses, _, error_type = dom.login("bench", "bench", None)
+        self.assertTrue(success, error_type)
+        for course in courses:
+            state.current_course_index = course["index"]
+            success, dom_assignments, error_message = dom.fetch_assignments(course)
+            self.assertTrue(success, error_message)
+            rest_assignments = rest._load_assignment_list(course["index"])
+            self.assertEqual([a["name"] for a in rest_assignments], [a["name"] for a in dom_assignments])
+            self.assertEqual(
+                [a["assignment_id"] for a in rest_assignments], [a["assignment_id"] for a in dom_assignments]
+            )
+
+            for dom_assignment, rest_assignment in zip(dom_assignments, rest_assignments):
+                success, dom_missing, error_message = dom.process_assignment(dom_assignment)
+                self.assertTrue(success, error_message)
+                rest_missing = rest._find_students_missing(rest_assignment, course["index"])
+                self.assertEqual(rest_missing, dom_missing, f"{course['name']}/{dom_assignment['name']}")
@@ -0,0 +1,45 @@
+"""Reuse of stored grading results"""
+import os
+import tempfile
+import unittest
+from unittest import mock
+from utils.result_cache import ResultCache, ScanHistory
+
+
+COURSE = {"name": "Course", "url": "https://lms.example.edu/portal/site/s1"}
+
+
+def assignment(submitted, ungraded):
+    return {"name": "Quiz", "assignment_id": "a1", "submitted": submitted, "ungraded": ungraded}
+
+
+class ScanHistoryTest(unittest.TestCase):
+
+    def setUp(self):
+        directory = tempfile.mkdtemp()
+        self.cache = ResultCache(os.path.join(directory, "cache.sqlite3"))
+        self.addCleanup(self.cache.close)
+        self.history = ScanHistory(self.cache, "user")
+        self.missing = [{"name": "Student", "status": "Submitted"}]
+        self.history.record(COURSE, assignment(12, 3), self.missing)
+
+    def test_reused_while_both_counters_match(self):
+        self.assertEqual(self.history.unchanged(COURSE, assignment(12, 3)), self.missing)
+
+    def test_grading_or_a_new_submission_invalidates(self):
+        self.assertIsNone(self.history.unchanged(COURSE, assignment(12, 2)))
+        self.assertIsNone(self.history.unchanged(COURSE, assignment(13, 3)))
+
+    def test_unknown_counters_are_never_reused(self):
+        self.history.record(COURSE, assignment(None, None), self.missing)
+
+        self.assertIsNone(self.history.unchanged(COURSE, assignment(None, None)))
+
+    def test_no_age_limit_by_default(self):
+        with mock.patch("utils.result_cache.time.time", return_value=10 ** 10):
+            self.assertEqual(self.history.unchanged(COURSE, assignment(12, 3)), self.missing)
+
+    def test_optional_age_limit(self):
+        capped = ScanHistory(self.cache, "user", max_age=60)
+        with mock.patch("utils.result_cache.time.time", return_value=10 ** 10):
+            self.assertIsNone(capped.unchanged(COURSE, assignment(12, 3)))
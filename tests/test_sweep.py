@@ -0,0 +1,100 @@
+"""Sweeps stepping aside for operations queued while they run"""
+import tempfile
+import unittest
+from browser.browser_manager import BrowserManager
+from browser.portal_scraper import PortalScraper
+from models.app_state import AppState
+from utils.settings import Settings
+
+
+COURSES = [{"name": f"Course {course}", "index": course, "url": None} for course in range(2)]
+
+
+class _ListedScraper(PortalScraper):
+    """PortalScraper over fixed assignment lists; on_check runs after every grading page"""
+
+    def __init__(self, state, ui_callback, on_check):
+        super().__init__(None, state, ui_callback)
+        self.on_check = on_check
+        self.checked = []
+
+    def _load_assignment_list(self, course_index):
+        return [
+            {"name": f"A{assignment}", "index": assignment, "assignment_id": f"c{course_index}a{assignment}"}
+            for assignment in range(3)
+        ]
+
+    def _find_students_missing(self, selected_assignment, course_index, on_batch=None):
+        self.checked.append(selected_assignment["assignment_id"])
+        self.on_check(selected_assignment)
+        return [{"name": "Student", "status": "Submitted"}]
+
+
+class SweepContinuationTest(unittest.TestCase):
+
+    def setUp(self):
+        settings = Settings()
+        settings.data_dir = tempfile.mkdtemp()
+        settings.export_formats = []
+        self.state = AppState()
+        self.state.courses = COURSES
+        self.manager = BrowserManager(self.state, lambda delay, func, *args: func(*args), settings)
+        self.results = []
+        self.summaries = []
+
+    def _queue_sweep(self):
+        self.manager.queue_sweep(
+            lambda course, assignment, students, error: self.results.append((course, assignment)),
+            self.summaries.append,
+            self.fail
+        )
+
+    def _click(self, assignment):
+        if assignment["assignment_id"] == "c0a1":
+            self.manager.queue_process_assignment({"name": "Click", "assignment_id": "clicked"}, None, None)
+
+    def test_sweep_steps_aside_and_continues(self):
+        scraper = _ListedScraper(self.state, self.manager.ui_callback, self._click)
+        self._queue_sweep()
+
+        operation = self.manager.browser_queue.get()
+        self.manager._handle_sweep(operation, scraper)
+        self.manager.browser_queue.task_done(operation)
+
+        self.assertEqual(self.summaries, [])
+        self.assertEqual(self.manager.browser_queue.get()['type'], 'process_assignment')
+        continuation = self.manager.browser_queue.get()
+        self.assertEqual(continuation['type'], 'sweep')
+        self.manager._handle_sweep(continuation, scraper)
+
+        expected = [f"c{course}a{assignment}" for course in range(2) for assignment in range(3)]
+        self.assertEqual(scraper.checked, expected)
+        self.assertEqual(len(self.results), 6)
+        self.assertEqual(len(self.summaries), 1)
+        summary = self.summaries[0]
+        self.assertEqual((summary['checked'], summary['skipped'], summary['failed']), (6, 0, 0))
+        self.assertFalse(summary['stopped'])
+
+    def test_resumed_sweep_counts_only_earlier_assignments_as_skipped(self):
+        def cancel(assignment):
+            if assignment["assignment_id"] == "c0a1":
+                self.manager.cancel_sweep()
+
+        def click(assignment):
+            if assignment["assignment_id"] == "c1a0":
+                self.manager.queue_process_assignment({"name": "Click", "assignment_id": "clicked"}, None, None)
+
+        scraper = _ListedScraper(self.state, self.manager.ui_callback, cancel)
+        self._queue_sweep()
+        self.manager._handle_sweep(self.manager.browser_queue.get(), scraper)
+        self.assertTrue(self.summaries.pop()['stopped'])
+
+        scraper.on_check = click
+        self._queue_sweep()
+        self.manager._handle_sweep(self.manager.browser_queue.get(), scraper)
+        self.assertEqual(self.manager.browser_queue.get()['type'], 'process_assignment')
+        self.manager._handle_sweep(self.manager.browser_queue.get(), scraper)
+
+        summary = self.summaries[0]
+        self.assertEqual((summary['checked'], summary['skipped']), (4, 2))
+        self.assertEqual(len(scraper.checked), 6)
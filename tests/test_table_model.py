@@ -0,0 +1,80 @@
+"""Sorting, filtering and scrolling of the results table's rows"""
+import unittest
+from gui.table_model import TableModel
+
+
+ROWS = [
+    ("Khan, Ali", "Submitted", "Quiz 2"),
+    ("Raza, Sara", "Ungraded", "Quiz 1"),
+    ("ahmed, Omar", "Submitted", "Quiz 3"),
+]
+
+
+class TableModelTest(unittest.TestCase):
+
+    def setUp(self):
+        self.model = TableModel(("student", "status", "assignment"))
+        self.model.set_rows(ROWS)
+
+    def test_sorts_case_insensitively_and_reverses_on_second_click(self):
+        self.model.sort_by("student")
+        self.assertEqual([row[0] for row in self.model.window(10)], ["ahmed, Omar", "Khan, Ali", "Raza, Sara"])
+
+        self.model.sort_by("student")
+        self.assertEqual([row[0] for row in self.model.window(10)], ["Raza, Sara", "Khan, Ali", "ahmed, Omar"])
+
+        self.model.sort_by("assignment")
+        self.assertFalse(self.model.sort_reverse)
+        self.assertEqual([row[2] for row in self.model.window(10)], ["Quiz 1", "Quiz 2", "Quiz 3"])
+
+    def test_filter_matches_any_column_and_keeps_hidden_rows(self):
+        self.model.set_filter("  SUBMITTED ")
+
+        self.assertEqual(self.model.window(10), [ROWS[0], ROWS[2]])
+        self.assertEqual((self.model.view_count(), self.model.row_count()), (2, 3))
+
+        self.model.set_filter("")
+        self.assertEqual(self.model.window(10), ROWS)
+
+    def test_appended_rows_follow_sort_and_filter(self):
+        self.model.append_rows([("Zafar, Hina", "Submitted", "Quiz 1")])
+        self.assertEqual(self.model.window(10)[-1][0], "Zafar, Hina")
+
+        self.model.sort_by("student")
+        self.model.set_filter("submitted")
+        self.model.append_rows([("Baig, Noor", "Submitted", "Quiz 4"), ("Ali, Zain", "Returned", "Quiz 4")])
+
+        self.assertEqual(
+            [row[0] for row in self.model.window(10)], ["ahmed, Omar", "Baig, Noor", "Khan, Ali", "Zafar, Hina"]
+        )
+        self.assertEqual(self.model.row_count(), 6)
+
+    def test_scrolling_is_clamped_to_the_rows(self):
+        self.model.set_rows([(f"Student {i:02}", "Submitted", "Quiz") for i in range(10)])
+
+        self.model.scroll_by(8)
+        self.assertEqual([row[0] for row in self.model.window(4)], ["Student 06", "Student 07", "Student 08", "Student 09"])
+        self.assertEqual(self.model.scroll_range(4), (0.6, 1.0))
+
+        self.model.scroll_by(-20)
+        self.assertEqual(self.model.first_line(), 0)
+        self.assertEqual(self.model.window(4)[0][0], "Student 00")
+
+        self.model.scroll_to(0.5)
+        self.assertEqual(self.model.window(4)[0][0], "Student 05")
+
+    def test_new_rows_scroll_back_to_the_top(self):
+        self.model.set_rows([(f"Student {i}", "", "") for i in range(10)])
+        self.model.scroll_by(5)
+        self.model.window(3)
+
+        self.model.set_rows(ROWS)
+
+        self.assertEqual(self.model.first_line(), 0)
+        self.assertEqual(self.model.scroll_range(3), (0.0, 1.0))
+
+    def test_empty_model(self):
+        self.model.set_rows([])
+
+        self.assertEqual(self.model.window(5), [])
+        self.assertEqual(self.model.scroll_range(5), (0.0, 1.0))
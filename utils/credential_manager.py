@@ -1,5 +1,7 @@
 """Credential management using system keyring"""
-import keyring
+import json
+import time
+from utils import startup_timer
 
 
 class CredentialManager:
@@ -7,16 +9,23 @@ class CredentialManager:
     
     SERVICE_NAME = "CoursePortalLMS"
     
+    # Windows Credential Manager refuses blobs over 2560 bytes, and keyring
+    # stores the text as UTF-16, so a saved session must stay under this
+    MAX_SESSION_BYTES = 2560
+    
+    # Cookie fields Playwright's add_cookies needs to restore a cookie
+    SESSION_COOKIE_FIELDS = ("name", "value", "domain", "path", "expires", "httpOnly", "secure", "sameSite")
+    
     def __init__(self):
         self.service_name = self.SERVICE_NAME
     
     def save_credentials(self, username, password):
         """Save credentials to system keyring"""
         try:
-            keyring.set_password(self.service_name, username, password)
+            _keyring().set_password(self.service_name, username, password)
             # Store that we have saved credentials
-            keyring.set_password(self.service_name, "_remember_me", "true")
-            keyring.set_password(self.service_name, "_username", username)
+            _keyring().set_password(self.service_name, "_remember_me", "true")
+            _keyring().set_password(self.service_name, "_username", username)
         except Exception as e:
             print(f"Error saving credentials: {e}")
     
@@ -24,11 +33,11 @@ class CredentialManager:
         """Load saved credentials from system keyring"""
         try:
             # Check if we have saved credentials
-            remember_me = keyring.get_password(self.service_name, "_remember_me")
+            remember_me = _keyring().get_password(self.service_name, "_remember_me")
             if remember_me == "true":
-                username = keyring.get_password(self.service_name, "_username")
+                username = _keyring().get_password(self.service_name, "_username")
                 if username:
-                    password = keyring.get_password(self.service_name, username)
+                    password = _keyring().get_password(self.service_name, username)
                     if password:
                         return {
                             "username": username,
@@ -42,10 +51,105 @@ class CredentialManager:
     def clear_saved_credentials(self):
         """Clear saved credentials from system keyring"""
         try:
-            username = keyring.get_password(self.service_name, "_username")
+            username = _keyring().get_password(self.service_name, "_username")
             if username:
-                keyring.delete_password(self.service_name, username)
-            keyring.delete_password(self.service_name, "_remember_me")
-            keyring.delete_password(self.service_name, "_username")
+                _keyring().delete_password(self.service_name, username)
+            _keyring().delete_password(self.service_name, "_remember_me")
+            _keyring().delete_password(self.service_name, "_username")
         except Exception as e:
             print(f"Error clearing credentials: {e}")
+    
+    def save_session(self, username, storage_state, domain):
+        """
+        Save a logged-in browser session to system keyring
+        
+        Only unexpired cookies of the LMS host (or its subdomains) are kept,
+        with just the fields needed to restore them, so the entry fits the
+        smallest keyring backend (see MAX_SESSION_BYTES).
+        
+        Args:
+            username: Username the session belongs to
+            storage_state: Playwright storage state of the logged-in context
+            domain: LMS host name whose cookies should be kept
+            
+        Returns:
+            bool: True if the session was saved
+        """
+        try:
+            cookies = session_cookies(storage_state.get("cookies", []), domain)
+            if not cookies:
+                print("Warning: Session not saved: the browser has no cookies for the LMS")
+                return False
+            data = json.dumps(
+                {"cookies": [
+                    {key: cookie[key] for key in self.SESSION_COOKIE_FIELDS if key in cookie} for cookie in cookies
+                ]},
+                separators=(",", ":")
+            )
+            size = len(data.encode("utf-16-le"))
+            if size > self.MAX_SESSION_BYTES:
+                print(f"Warning: Session not saved: {size} bytes of cookies exceed the "
+                      f"{self.MAX_SESSION_BYTES}-byte keyring limit")
+                return False
+            _keyring().set_password(self.service_name, f"_session_{username}", data)
+            return True
+        except Exception as e:
+            print(f"Warning: Session not saved, you will have to sign in next time: {type(e).__name__}: {e}")
+            return False
+    
+    def load_session(self, username):
+        """Load a saved browser session from system keyring, or None"""
+        try:
+            data = _keyring().get_password(self.service_name, f"_session_{username}")
+            if data:
+                return json.loads(data)
+        except Exception as e:
+            print(f"Error loading session: {e}")
+        return None
+    
+    def clear_session(self, username):
+        """Clear a saved browser session from system keyring"""
+        try:
+            if _keyring().get_password(self.service_name, f"_session_{username}") is not None:
+                _keyring().delete_password(self.service_name, f"_session_{username}")
+        except Exception as e:
+            print(f"Error clearing session: {e}")
+
+
+def session_cookies(cookies, domain):
+    """
+    Pick the cookies worth saving for a session on domain
+
+    Args:
+        cookies: Playwright cookie dicts
+        domain: LMS host name
+        
+    Returns:
+        list: Unexpired cookies set for domain itself or one of its subdomains
+              (cookies without a domain are dropped)
+    """
+    now = time.time()
+    kept = []
+    for cookie in cookies:
+        cookie_domain = (cookie.get("domain") or "").lstrip(".").lower()
+        if not cookie_domain or not (cookie_domain == domain or cookie_domain.endswith("." + domain)):
+            continue
+        # -1 marks a cookie that lasts for the browser session
+        expires = cookie.get("expires", -1)
+        if expires is not None and 0 <= expires < now:
+            continue
+        kept.append(cookie)
+    return kept
+
+
+def _keyring():
+    """
+    Import keyring on first use
+
+    Importing keyring loads its backends, which takes a noticeable part of a
+    cold start, so it is deferred until credentials are actually read or
+    written (normally on a background thread).
+    """
+    with startup_timer.timer.importing("keyring"):
+        import keyring
+    return keyring
@@ -0,0 +1,93 @@
+"""Streaming export of missing-marks results to CSV and JSON Lines"""
+import csv
+import json
+import os
+import threading
+
+
+class ReportExporter:
+    """
+    Appends course / assignment / student / status records to report files as they are produced
+
+    Each finished assignment is written and flushed straight away and
+    nothing is kept in memory, so a sweep over any number of courses uses
+    constant memory and a crash leaves a usable partial report behind.
+    Assignments that could not be checked are written with an empty
+    student and the error message.
+    """
+
+    FIELDS = ("course", "assignment", "student", "status", "error")
+    FORMATS = ("csv", "jsonl")
+
+    def __init__(self, stem, formats=FORMATS, append=False):
+        """
+        Open the report files
+
+        Args:
+            stem: Path without extension; one file per format is written next to it
+            formats: Formats to write, out of FORMATS
+            append: Continue existing files (e.g. a resumed sweep) instead of replacing them
+        """
+        unknown = [fmt for fmt in formats if fmt not in self.FORMATS]
+        if unknown:
+            raise ValueError(f"Unknown report format(s): {', '.join(unknown)}")
+
+        os.makedirs(os.path.dirname(stem) or ".", exist_ok=True)
+        self._lock = threading.Lock()  # scans on pool pages may share one exporter
+        self._files = []
+        self._csv = None
+        self._jsonl = None
+        self.paths = []
+        self.records = 0
+
+        mode = "a" if append else "w"
+        if "csv" in formats:
+            path = stem + ".csv"
+            write_header = not (append and os.path.exists(path) and os.path.getsize(path))
+            f = open(path, mode, encoding="utf-8", newline="")
+            self._files.append(f)
+            self._csv = csv.writer(f)
+            if write_header:
+                self._csv.writerow(self.FIELDS)
+                f.flush()
+            self.paths.append(path)
+        if "jsonl" in formats:
+            path = stem + ".jsonl"
+            self._jsonl = open(path, mode, encoding="utf-8")
+            self._files.append(self._jsonl)
+            self.paths.append(path)
+
+    def write_assignment(self, course_name, assignment_name, students_missing, error_message=None):
+        """
+        Write the result of one assignment as a batch and flush it
+
+        Args:
+            course_name: Course the assignment belongs to
+            assignment_name: Assignment name, or None when the whole course failed
+            students_missing: List of dicts with "name" and "status"
+            error_message: Why the assignment could not be checked, or None
+        """
+        if error_message:
+            records = [(course_name, assignment_name or "", "", "", error_message)]
+        else:
+            records = [(course_name, assignment_name, student["name"], student["status"], "")
+                       for student in students_missing]
+
+        with self._lock:
+            for record in records:
+                if self._csv is not None:
+                    self._csv.writerow(record)
+                if self._jsonl is not None:
+                    self._jsonl.write(json.dumps(dict(zip(self.FIELDS, record))) + "\n")
+            for f in self._files:
+                f.flush()
+            self.records += len(records)
+
+    def close(self):
+        """Close the report files"""
+        with self._lock:
+            for f in self._files:
+                f.close()
+            self._files = []
+            self._csv = None
+            self._jsonl = None
@@ -0,0 +1,166 @@
+"""On-disk cache of scraped courses, assignments and grading status"""
+import json
+import os
+import sqlite3
+import threading
+import time
+
+
+class ResultCache:
+    """
+    SQLite-backed cache keyed by user, course site and assignment
+    
+    One connection is shared by the GUI and the browser worker threads, so
+    every query holds the cache's lock.
+    """
+
+    # Seconds after which a cached entry is refreshed in the background
+    DEFAULT_TTLS = {
+        "courses": 24 * 60 * 60,
+        "assignments": 10 * 60,
+        "students_missing": 2 * 60,
+    }
+
+    def __init__(self, path, ttls=None):
+        """
+        Open (and create if needed) the cache database
+
+        Args:
+            path: SQLite file path
+            ttls: Optional dict overriding DEFAULT_TTLS per kind
+        """
+        self.path = path
+        self.ttls = dict(self.DEFAULT_TTLS, **(ttls or {}))
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        self.lock = threading.Lock()
+        self.conn = sqlite3.connect(path, check_same_thread=False)
+        self.conn.execute(
+            "CREATE TABLE IF NOT EXISTS results ("
+            " user TEXT NOT NULL,"
+            " kind TEXT NOT NULL,"
+            " course TEXT NOT NULL,"
+            " assignment TEXT NOT NULL,"
+            " payload TEXT NOT NULL,"
+            " fetched_at REAL NOT NULL,"
+            " PRIMARY KEY (user, kind, course, assignment))"
+        )
+        self.conn.commit()
+
+    def get(self, user, kind, course="", assignment=""):
+        """
+        Look up a cached result
+
+        Args:
+            user: Username the result was scraped for
+            kind: "courses", "assignments" or "students_missing"
+            course: Course key (see course_key)
+            assignment: Assignment id, for per-assignment kinds
+
+        Returns:
+            tuple: (payload, is_fresh: bool) or None if nothing is cached
+        """
+        with self.lock:
+            row = self.conn.execute(
+                "SELECT payload, fetched_at FROM results WHERE user = ? AND kind = ? AND course = ? AND assignment = ?",
+                (user or "", kind, course, assignment)
+            ).fetchone()
+        if row is None:
+            return None
+        payload, fetched_at = row
+        return json.loads(payload), time.time() - fetched_at < self.ttls.get(kind, 0)
+
+    def put(self, user, kind, payload, course="", assignment=""):
+        """Store a freshly scraped result, replacing any older one"""
+        with self.lock:
+            self.conn.execute(
+                "INSERT OR REPLACE INTO results (user, kind, course, assignment, payload, fetched_at)"
+                " VALUES (?, ?, ?, ?, ?, ?)",
+                (user or "", kind, course, assignment, json.dumps(payload), time.time())
+            )
+            self.conn.commit()
+
+    def close(self):
+        """Close the database"""
+        with self.lock:
+            self.conn.close()
+
+
+class ScanHistory:
+    """
+    Grading results of one user's earlier checks, stored with the assignment's counters
+    
+    The Assignments tool prints an "In/New" counter for every assignment:
+    submissions in, and how many of them are not graded yet. A new
+    submission moves the first number and entering a mark moves the second,
+    so while both are unchanged since a check the stored missing-marks list
+    is reused instead of opening the grading page again. Releasing marks
+    that were already entered moves neither; max_age optionally caps reuse
+    for that case.
+    """
+
+    KIND = "students_missing"
+
+    def __init__(self, cache, user, max_age=0):
+        """
+        Args:
+            cache: ResultCache to read and write
+            user: Username the results belong to
+            max_age: Seconds a check may be reused for while the counters
+                     stay unchanged (0 = no limit)
+        """
+        self.cache = cache
+        self.user = user
+        self.max_age = max_age
+
+    def stored(self, course, assignment):
+        """
+        Return the last check of an assignment
+        
+        Args:
+            course: Course dict
+            assignment: Assignment dict as returned by fetch_assignments
+            
+        Returns:
+            tuple: (students_missing: list, is_fresh: bool, reusable: bool) or
+                   None if the assignment was never checked; reusable means
+                   neither counter has moved (and the check is within max_age)
+        """
+        try:
+            cached = self.cache.get(self.user, self.KIND, course_key(course), assignment["assignment_id"])
+        except sqlite3.Error as e:
+            print(f"Error reading result cache: {type(e).__name__}: {e}")
+            return None
+        if cached is None or not isinstance(cached[0], dict):
+            return None
+        
+        payload, is_fresh = cached
+        counters = (assignment.get("submitted"), assignment.get("ungraded"))
+        # Checks stored with the old submitted/total counter have no "ungraded" and never match
+        counters_unchanged = None not in counters and (payload.get("submitted"), payload.get("ungraded")) == counters
+        recent = not self.max_age or time.time() - payload.get("checked_at", 0) < self.max_age
+        return payload["students_missing"], is_fresh, counters_unchanged and recent
+
+    def unchanged(self, course, assignment):
+        """Return the stored missing-marks list if it is reusable (see stored), else None"""
+        stored = self.stored(course, assignment)
+        if stored is None or not stored[2]:
+            return None
+        return stored[0]
+
+    def record(self, course, assignment, students_missing):
+        """Store a fresh check of an assignment together with its current counters"""
+        payload = {
+            "submitted": assignment.get("submitted"),
+            "ungraded": assignment.get("ungraded"),
+            "checked_at": time.time(),
+            "students_missing": students_missing
+        }
+        try:
+            self.cache.put(self.user, self.KIND, payload, course_key(course), assignment["assignment_id"])
+        except sqlite3.Error as e:
+            print(f"Error writing result cache: {type(e).__name__}: {e}")
+
+
+def course_key(course):
+    """Return the stable cache key of a course: its site URL, or its name if unknown"""
+    return course.get("url") or course["name"]
@@ -0,0 +1,101 @@
+"""Runtime settings read from environment variables"""
+import os
+
+
+class Settings:
+    """Tunable settings for the browser engine, overridable with CHECKMARKS_* variables"""
+    
+    def __init__(self):
+        # Browser engine: "thread" (sync Playwright on a worker thread) or
+        # "async" (asyncio event loop running operations concurrently)
+        self.engine = os.environ.get("CHECKMARKS_ENGINE", "thread")
+        
+        # Number of pages working through queued operations concurrently; each
+        # signs in to a Sakai session of its own (the threaded engine launches
+        # a browser per extra page, the async engine keeps them in one)
+        self.page_pool_size = self._get_int("CHECKMARKS_PAGE_POOL_SIZE", 1)
+        
+        # Let further accounts sign in next to the first one, each in its own
+        # browser contexts of the same Chromium process (see
+        # BrowserManager.add_account); this selects the async engine
+        self.multi_account = self._get_bool("CHECKMARKS_MULTI_ACCOUNT", False)
+        
+        # Run Chromium without a window (needed on machines without a display)
+        self.headless = self._get_bool("CHECKMARKS_HEADLESS", False)
+        
+        # Abort images, media, fonts and third-party requests; extra hosts
+        # listed here (comma separated) are never blocked
+        self.block_resources = self._get_bool("CHECKMARKS_BLOCK_RESOURCES", True)
+        self.allowed_hosts = self._get_list("CHECKMARKS_ALLOWED_HOSTS")
+        
+        # How page loads are awaited: "selector" (wait for the element each
+        # step needs) or "networkidle" (wait for the network to go quiet)
+        self.wait_mode = os.environ.get("CHECKMARKS_WAIT_MODE", "selector")
+        
+        # Read assignment lists and submissions from Sakai's /direct JSON
+        # endpoints with the browser's cookies, scraping pages only as a fallback
+        self.rest_fast_path = self._get_bool("CHECKMARKS_REST_FAST_PATH", False)
+        
+        # Where checkpoints and other local data are kept
+        self.data_dir = os.environ.get(
+            "CHECKMARKS_DATA_DIR", os.path.join(os.path.expanduser("~"), ".checkmarks")
+        )
+        
+        # Wall-clock budget for a semester-wide sweep in seconds (0 = unlimited)
+        self.sweep_time_limit = self._get_int("CHECKMARKS_SWEEP_TIME_LIMIT", 2 * 60 * 60, minimum=0)
+        
+        # Read ahead while idle: assignment lists of the most-used courses
+        # after login, and grading tables of the assignments due closest to
+        # now once a course is opened
+        self.prefetch = self._get_bool("CHECKMARKS_PREFETCH", True)
+        self.prefetch_courses = self._get_int("CHECKMARKS_PREFETCH_COURSES", 3, minimum=0)
+        self.prefetch_assignments = self._get_int("CHECKMARKS_PREFETCH_ASSIGNMENTS", 3, minimum=0)
+        
+        # Scans, sweeps and prefetches reuse a stored grading result while the
+        # assignment's In/New counters have not moved; this caps that reuse in
+        # seconds (0 = no limit), for marks released after they were entered
+        self.history_max_age = self._get_int("CHECKMARKS_HISTORY_MAX_AGE", 0, minimum=0)
+        
+        # Cold-start budget in milliseconds from process start to the login
+        # window's first paint; the startup report warns when it is exceeded
+        # (0 = no check)
+        self.startup_budget_ms = self._get_int("CHECKMARKS_STARTUP_BUDGET_MS", 1000, minimum=0)
+        
+        # Scans and sweeps stream their results to report files in these
+        # formats ("csv", "jsonl"; empty to turn the export off)
+        self.export_formats = self._get_list("CHECKMARKS_EXPORT_FORMATS", ("csv", "jsonl"))
+        self.export_dir = os.environ.get("CHECKMARKS_EXPORT_DIR", os.path.join(self.data_dir, "reports"))
+        
+        # Record timing spans of every operation and navigation step; on exit
+        # a p50/p95 summary is logged and a Chrome trace is written to
+        # <data_dir>/traces
+        self.trace = self._get_bool("CHECKMARKS_TRACE", False)
+    
+    @staticmethod
+    def _get_int(name, default, minimum=1):
+        """Read an integer setting, ignoring values that are malformed or too small"""
+        value = os.environ.get(name)
+        if value is None:
+            return default
+        try:
+            number = int(value)
+        except ValueError:
+            print(f"Warning: Ignoring invalid {name}={value!r}")
+            return default
+        return max(number, minimum)
+    
+    @staticmethod
+    def _get_bool(name, default):
+        """Read a boolean setting such as 1/0, true/false or yes/no"""
+        value = os.environ.get(name)
+        if value is None:
+            return default
+        return value.strip().lower() in ("1", "true", "yes", "on")
+    
+    @staticmethod
+    def _get_list(name, default=()):
+        """Read a comma-separated setting as a list of non-empty strings"""
+        value = os.environ.get(name)
+        if value is None:
+            return list(default)
+        return [item.strip() for item in value.split(",") if item.strip()]
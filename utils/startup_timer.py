@@ -0,0 +1,88 @@
+"""Cold-start timing: module import times and milestones since process start"""
+import sys
+import threading
+import time
+from contextlib import contextmanager
+
+
+class StartupTimer:
+    """
+    Records how long startup steps take, measured from when this module was imported
+
+    main.py imports this module first, so its import time is the process's
+    start as far as our code can tell. Heavy modules that are imported
+    lazily (Playwright, keyring) are timed where they are imported, on
+    whichever thread that happens.
+    """
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self._lock = threading.Lock()
+        self.imports = []  # (module name, milliseconds)
+        self.milestones = []  # (name, milliseconds since start)
+
+    @contextmanager
+    def importing(self, name):
+        """
+        Time the imports in the with block, recorded under the module name
+
+        Nothing is recorded when the module is already loaded, so lazy
+        imports can be wrapped at every call site.
+        """
+        if name in sys.modules:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            with self._lock:
+                self.imports.append((name, (time.perf_counter() - start) * 1000))
+
+    def mark(self, name):
+        """Record a milestone (e.g. "first paint") at the current time"""
+        with self._lock:
+            self.milestones.append((name, (time.perf_counter() - self.started) * 1000))
+
+    def elapsed(self, name):
+        """Return the milliseconds from start to the first milestone called name, or None"""
+        with self._lock:
+            for milestone, ms in self.milestones:
+                if milestone == name:
+                    return ms
+        return None
+
+    def report(self, budget_ms=None, budget_milestone="first paint"):
+        """
+        Format the timings recorded so far
+
+        Args:
+            budget_ms: Cold-start budget in milliseconds, or None for no check
+            budget_milestone: Milestone the budget applies to
+
+        Returns:
+            str: Multi-line report, ending with whether the budget was met
+        """
+        with self._lock:
+            imports = sorted(self.imports, key=lambda item: -item[1])
+            milestones = list(self.milestones)
+
+        lines = ["Startup timing:"]
+        for name, ms in imports:
+            lines.append(f"  import {name}: {ms:.0f} ms")
+        for name, ms in milestones:
+            lines.append(f"  {name}: {ms:.0f} ms")
+
+        if budget_ms:
+            elapsed = self.elapsed(budget_milestone)
+            if elapsed is None:
+                lines.append(f"  {budget_milestone} not reached")
+            elif elapsed > budget_ms:
+                lines.append(f"  WARNING: {budget_milestone} took {elapsed:.0f} ms, over the {budget_ms} ms budget")
+            else:
+                lines.append(f"  {budget_milestone} within the {budget_ms} ms budget")
+        return "\n".join(lines)
+
+
+# The process-wide timer, started when main.py first imports this module
+timer = StartupTimer()
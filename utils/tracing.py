@@ -0,0 +1,154 @@
+"""Timing spans for browser operations, exportable as Chrome trace events"""
+import json
+import os
+import sys
+import threading
+import time
+from collections import deque
+from contextlib import contextmanager
+
+
+class Tracer:
+    """
+    Records named, timed spans from any thread
+
+    Spans are kept in a bounded buffer, so a long session uses constant
+    memory and the trace covers its most recent operations. The buffer can
+    be written as Chrome trace-event JSON (open it in chrome://tracing or
+    https://ui.perfetto.dev) and summarized as p50/p95 per span name.
+
+    A disabled tracer records nothing and its span() is a bare yield.
+    """
+
+    def __init__(self, enabled=True, max_events=20000):
+        """
+        Args:
+            enabled: Record spans; when False every method is a cheap no-op
+            max_events: Number of most recent spans kept
+        """
+        self.enabled = enabled
+        self._lock = threading.Lock()
+        self._events = deque(maxlen=max_events)
+        self._origin = time.perf_counter()
+        self._pid = os.getpid()
+        self._threads = {}  # track id -> name, for the trace's metadata events
+
+    @contextmanager
+    def span(self, name, category="step", **args):
+        """
+        Time the with block as a span
+
+        Args:
+            name: Span name; spans with the same name are summarized together
+            category: "operation", "queue", "step", "wait", "extract" or "ui"
+            **args: Extra details shown with the span in the trace viewer
+        """
+        if not self.enabled:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.add(name, start, time.perf_counter(), category, **args)
+
+    def add(self, name, start, end, category="step", **args):
+        """Record a span measured elsewhere, from time.perf_counter() values"""
+        if not self.enabled:
+            return
+        track, track_name = _current_track()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": (start - self._origin) * 1e6,
+            "dur": max(0.0, end - start) * 1e6,
+            "pid": self._pid,
+            "tid": track,
+        }
+        if args:
+            event["args"] = args
+        with self._lock:
+            self._events.append(event)
+            self._threads.setdefault(track, track_name)
+
+    def summary(self):
+        """
+        Return duration statistics per span name
+
+        Returns:
+            dict: name -> {"count", "p50", "p95", "max"}, durations in milliseconds
+        """
+        with self._lock:
+            events = list(self._events)
+
+        durations = {}
+        for event in events:
+            durations.setdefault(event["name"], []).append(event["dur"] / 1000)
+
+        stats = {}
+        for name, values in durations.items():
+            values.sort()
+            stats[name] = {
+                "count": len(values),
+                "p50": _percentile(values, 50),
+                "p95": _percentile(values, 95),
+                "max": values[-1],
+            }
+        return stats
+
+    def format_summary(self):
+        """Format summary() as one line per span name, slowest p95 first"""
+        stats = self.summary()
+        if not stats:
+            return "Trace summary: no spans recorded"
+        lines = ["Trace summary (ms):"]
+        for name, s in sorted(stats.items(), key=lambda item: -item[1]["p95"]):
+            lines.append(f"  {name}: n={s['count']} p50={s['p50']:.0f} p95={s['p95']:.0f} max={s['max']:.0f}")
+        return "\n".join(lines)
+
+    def export_chrome(self, path):
+        """
+        Write the recorded spans as a Chrome trace-event JSON file
+
+        Returns:
+            str: The path written
+        """
+        with self._lock:
+            events = list(self._events)
+            threads = dict(self._threads)
+
+        metadata = [
+            {"name": "thread_name", "ph": "M", "pid": self._pid, "tid": track, "args": {"name": track_name}}
+            for track, track_name in threads.items()
+        ]
+        os.makedirs(os.path.dirname(path) or ".", exist_ok=True)
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump({"traceEvents": metadata + events, "displayTimeUnit": "ms"}, f)
+        return path
+
+
+def _current_track():
+    """
+    Return (id, name) of the timeline a span belongs on
+
+    Spans of the async engine all run on the event loop thread, so each
+    asyncio task gets its own timeline there; otherwise it is the thread.
+    """
+    # Only look at asyncio when something already imported it
+    asyncio = sys.modules.get("asyncio")
+    if asyncio is not None:
+        try:
+            task = asyncio.current_task()
+        except RuntimeError:
+            task = None
+        if task is not None:
+            return id(task), task.get_name()
+    thread = threading.current_thread()
+    return thread.ident, thread.name
+
+
+def _percentile(sorted_values, percent):
+    """Return the nearest-rank percentile of an already sorted, non-empty list"""
+    index = max(0, int(round(percent / 100 * len(sorted_values))) - 1)
+    return sorted_values[min(index, len(sorted_values) - 1)]